@@ -7,12 +7,17 @@ to interact with nanobot's core functionality.
 """
 
 import asyncio
+import hashlib
 import json
+import time
+import uuid
+from collections import OrderedDict
 from pathlib import Path
 from typing import List, Optional, Dict, Any, Union
 
-from fastapi import FastAPI, HTTPException, Request
+from fastapi import FastAPI, Header, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
 import uvicorn
 from loguru import logger
@@ -24,7 +29,14 @@ sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 from nanobot.bus.queue import MessageBus
 from nanobot.config.loader import load_config
 from nanobot.providers.litellm_provider import LiteLLMProvider
+from nanobot.providers.admission import AdmissionController
+from nanobot.providers.resilience import ModelRoute, RetryPolicy
 from nanobot.agent.loop import AgentLoop
+from nanobot.utils.extract import ExtractionPool
+from nanobot.agent.tools.web import WebCache
+from nanobot.session.manager import SessionManager
+from nanobot.utils.http import HttpClientPool
+from nanobot.providers.base import ToolCallRequest
 
 # Create FastAPI app
 app = FastAPI(
@@ -46,9 +58,14 @@ app.add_middleware(
 config = load_config()
 
 # Create message bus
-bus = MessageBus()
+bus = MessageBus.from_config(config.bus)
 
-# Create LLM provider
+# Create LLM provider (retries, fallback models and admission limits apply either way)
+resilience = {
+    "fallbacks": [ModelRoute.from_config(config, m) for m in config.agents.defaults.fallback_models],
+    "retry": RetryPolicy.from_config(config.resilience),
+    "admission": AdmissionController.from_config(config.admission),
+}
 provider = None
 if config.get_provider() and config.get_provider().api_key:
     provider = LiteLLMProvider(
@@ -56,13 +73,18 @@ if config.get_provider() and config.get_provider().api_key:
         api_base=config.get_api_base(),
         default_model=config.agents.defaults.model,
         extra_headers=config.get_provider().extra_headers if config.get_provider() else None,
+        **resilience,
     )
 else:
     # Fallback to default provider if no API key configured
     provider = LiteLLMProvider(
         default_model=config.agents.defaults.model,
+        **resilience,
     )
 
+# Shared HTTP connections for the agent's web tools
+http_pool = HttpClientPool.from_config(config.http)
+
 # Create agent loop
 agent = AgentLoop(
     bus=bus,
@@ -70,9 +92,25 @@ agent = AgentLoop(
     workspace=config.workspace_path,
     model=config.agents.defaults.model,
     max_iterations=config.agents.defaults.max_tool_iterations,
+    max_tokens=config.agents.defaults.max_tokens,
+    temperature=config.agents.defaults.temperature,
     brave_api_key=config.tools.web.search.api_key or None,
     exec_config=config.tools.exec,
     restrict_to_workspace=config.tools.restrict_to_workspace,
+    max_concurrent_sessions=config.agents.defaults.max_concurrent_sessions,
+    max_parallel_tools=config.agents.defaults.max_parallel_tools,
+    summary_model=config.agents.defaults.summary_model,
+    summary_threshold=config.agents.defaults.summary_threshold,
+    session_manager=SessionManager(
+        config.workspace_path,
+        history_tail=config.sessions.history_tail,
+        max_sessions=config.sessions.max_cached,
+        idle_ttl=config.sessions.idle_ttl,
+        backend=config.sessions.backend,
+    ),
+    http_pool=http_pool,
+    web_cache=WebCache.from_config(config.tools.web.cache),
+    web_extractor=ExtractionPool.from_config(config.tools.web.extract),
 )
 
 # Start agent loop in background
@@ -140,6 +178,10 @@ async def shutdown_event():
     agent.stop()
     if agent_task:
         agent_task.cancel()
+    await http_pool.aclose()
+    agent.web_extractor.shutdown()
+    # Flush queued session appends and sidecar updates before the writer thread goes away
+    agent.sessions.close()
 
 @app.get("/v1/models")
 async def list_models():
@@ -174,10 +216,196 @@ async def list_models():
         ]
     }
 
+# Conversation tracking
+# OpenAI clients resend the whole transcript on every turn. Each conversation gets
+# its own nanobot session, and only the newest user turn is sent to the agent.
+SESSION_HEADER = "X-Session-Id"
+MAX_TRACKED_CONVERSATIONS = 10000
+
+# Digest of (owner, transcript as the client will resend it next turn) -> session key
+_conversations: "OrderedDict[str, str]" = OrderedDict()
+
+def _conversation_owner(request: ChatCompletionRequest, http_request: Request) -> str:
+    """Who a conversation belongs to: the `user` field, else the client address."""
+    if request.user:
+        return f"user:{request.user}"
+    return http_request.client.host if http_request.client else ""
+
+def _transcript_digest(messages: List[Message], owner: str) -> str:
+    """
+    Hash the user/assistant turns of a transcript (system prompts are ignored).
+
+    The digest is salted with the conversation owner, so two clients whose
+    conversations happen to read the same never map to one session.
+    """
+    h = hashlib.sha256(owner.encode("utf-8"))
+    for msg in messages:
+        if msg.role in ("user", "assistant"):
+            h.update(json.dumps([msg.role, msg.content], ensure_ascii=False).encode("utf-8"))
+    return h.hexdigest()
+
+def _resolve_session_key(request: ChatCompletionRequest, session_id: Optional[str], owner: str) -> str:
+    """
+    Derive the session key for a request.
+
+    An explicit `X-Session-Id` header wins. Otherwise the conversation prefix
+    (every message before the new user turn) is matched against transcripts
+    this server has answered for the same owner (see `_conversation_owner`),
+    so each of a user's conversations keeps its own session. A conversation
+    with no earlier turns, or an unknown prefix, always starts a new session.
+    """
+    if session_id:
+        return f"api:{session_id}"
+    history = request.messages[:-1]
+    if any(msg.role in ("user", "assistant") for msg in history):
+        digest = _transcript_digest(history, owner)
+        key = _conversations.get(digest)
+        if key:
+            _conversations.move_to_end(digest)
+            return key
+    prefix = f"api:user:{request.user}:" if request.user else "api:"
+    return f"{prefix}{uuid.uuid4().hex[:16]}"
+
+def _remember_conversation(request: ChatCompletionRequest, reply: str, session_key: str, owner: str) -> None:
+    """
+    Index the transcript the client will send next turn, so it maps back to this session.
+
+    `reply` must be exactly the assistant text the client received.
+    """
+    transcript = request.messages + [Message(role="assistant", content=reply)]
+    _conversations[_transcript_digest(transcript, owner)] = session_key
+    while len(_conversations) > MAX_TRACKED_CONVERSATIONS:
+        _conversations.popitem(last=False)
+
+def _prepare_turn(request: ChatCompletionRequest, session_key: str) -> str:
+    """
+    Return the new user turn for the agent.
+
+    If the session has no history yet (new conversation, or the server restarted),
+    it is seeded from the client transcript and client system prompts are
+    prepended to the turn, so no context is lost.
+    """
+    if not request.messages:
+        raise HTTPException(status_code=400, detail="messages must not be empty")
+    *earlier, current = request.messages
+    content = current.content
+
+    session = agent.sessions.get_or_create(session_key)
+    if not session.messages:
+        for msg in earlier:
+            if msg.role in ("user", "assistant"):
+                session.add_message(msg.role, msg.content)
+        system = "\n\n".join(m.content for m in request.messages if m.role == "system")
+        if system:
+            content = f"System: {system}\n\n{content}"
+    return content
+
+def _sse(data: Dict[str, Any] | str) -> str:
+    """Format one server-sent event line."""
+    payload = data if isinstance(data, str) else json.dumps(data, ensure_ascii=False)
+    return f"data: {payload}\n\n"
+
+def _stream_chat_completion(
+    request: ChatCompletionRequest,
+    prompt: str,
+    session_key: str,
+    owner: str,
+    request_id: str,
+    start_time: float,
+) -> StreamingResponse:
+    """
+    Run the agent and stream its output as OpenAI-style `chat.completion.chunk` events.
+
+    LLM content deltas are forwarded as they arrive. Tool calls are reported as
+    chunks with an empty delta and a `nanobot` progress field, which standard
+    OpenAI clients ignore.
+    """
+    completion_id = f"chatcmpl-{int(time.time() * 1000)}"
+    created = int(time.time())
+    queue: asyncio.Queue[Dict[str, Any] | None] = asyncio.Queue()
+
+    def chunk(delta: Dict[str, Any], finish_reason: Optional[str] = None, **extra: Any) -> Dict[str, Any]:
+        return {
+            "id": completion_id,
+            "object": "chat.completion.chunk",
+            "created": created,
+            "model": request.model,
+            "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+            **extra,
+        }
+
+    streamed = False
+    sent: List[str] = []  # Every piece of text the client receives, to index the transcript it will resend
+
+    async def send_text(text: str) -> None:
+        sent.append(text)
+        await queue.put(chunk({"content": text}))
+
+    async def on_delta(text: str) -> None:
+        nonlocal streamed
+        streamed = True
+        await send_text(text)
+
+    async def on_tool_call(tool_call: ToolCallRequest) -> None:
+        nonlocal streamed
+        if streamed:
+            # Separate text from the next LLM turn
+            await send_text("\n\n")
+            streamed = False
+        await queue.put(chunk({}, nanobot={
+            "type": "tool_call",
+            "name": tool_call.name,
+            "arguments": tool_call.arguments,
+        }))
+
+    async def run_agent() -> None:
+        try:
+            response_content = await agent.process_direct(
+                content=prompt,
+                session_key=session_key,
+                channel="api",
+                chat_id=session_key.split(":", 1)[1],
+                on_delta=on_delta,
+                on_tool_call=on_tool_call,
+            )
+            # Non-streamed answers (fallback text, provider errors) still reach the client
+            if not streamed and response_content:
+                await send_text(response_content)
+            _remember_conversation(request, "".join(sent), session_key, owner)
+            await queue.put(chunk({}, "stop"))
+            logger.info(f"[{request_id}] Stream completed in {time.time() - start_time:.2f} seconds")
+        except Exception as e:
+            logger.error(f"[{request_id}] Error while streaming: {str(e)}")
+            await queue.put({"error": {"message": f"Error processing request: {str(e)}", "type": "server_error"}})
+        finally:
+            await queue.put(None)
+
+    async def event_stream():
+        task = asyncio.create_task(run_agent())
+        try:
+            yield _sse(chunk({"role": "assistant", "content": ""}))
+            while (item := await queue.get()) is not None:
+                yield _sse(item)
+            yield _sse("[DONE]")
+        finally:
+            # Client disconnected before the agent finished
+            if not task.done():
+                logger.info(f"[{request_id}] Client disconnected, cancelling agent run")
+                task.cancel()
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
 @app.post("/v1/chat/completions", response_model=ChatCompletionResponse)
-async def create_chat_completion(request: ChatCompletionRequest):
+async def create_chat_completion(
+    request: ChatCompletionRequest,
+    http_request: Request,
+    session_id: Optional[str] = Header(default=None, alias=SESSION_HEADER),
+):
     """Create chat completion (OpenAI-compatible endpoint)."""
-    import time
     start_time = time.time()
     request_id = f"req-{int(time.time() * 1000)}"
     
@@ -185,30 +413,26 @@ async def create_chat_completion(request: ChatCompletionRequest):
         # Log request start
         logger.info(f"[{request_id}] Received chat completion request: model={request.model}, messages_count={len(request.messages)}")
         
-        # Build conversation history from request
-        # Format messages as a single prompt for nanobot agent
-        conversation = []
-        for msg in request.messages:
-            if msg.role == "system":
-                conversation.append(f"System: {msg.content}")
-            elif msg.role == "user":
-                conversation.append(f"User: {msg.content}")
-            elif msg.role == "assistant":
-                conversation.append(f"Assistant: {msg.content}")
+        # Route the conversation to its own session and send only the new user turn
+        owner = _conversation_owner(request, http_request)
+        session_key = _resolve_session_key(request, session_id, owner)
+        prompt = _prepare_turn(request, session_key)
+        logger.debug(f"[{request_id}] Session {session_key}, new turn: {prompt[:200]}..." if len(prompt) > 200 else f"[{request_id}] Session {session_key}, new turn: {prompt}")
         
-        # Combine messages into a single prompt
-        prompt = "\n".join(conversation)
-        logger.debug(f"[{request_id}] Built prompt: {prompt[:200]}..." if len(prompt) > 200 else f"[{request_id}] Built prompt: {prompt}")
+        if request.stream:
+            logger.info(f"[{request_id}] Streaming response from nanobot agent...")
+            return _stream_chat_completion(request, prompt, session_key, owner, request_id, start_time)
         
         # Process message with nanobot agent
         # This will use nanobot's full agent capabilities, including tools and memory
         logger.info(f"[{request_id}] Processing message with nanobot agent...")
         response_content = await agent.process_direct(
             content=prompt,
-            session_key="openai:default",
+            session_key=session_key,
             channel="api",
-            chat_id="default"
+            chat_id=session_key.split(":", 1)[1],
         )
+        _remember_conversation(request, response_content, session_key, owner)
         logger.info(f"[{request_id}] Received response from nanobot agent")
         logger.debug(f"[{request_id}] Agent response: {response_content[:200]}..." if len(response_content) > 200 else f"[{request_id}] Agent response: {response_content}")
         
@@ -241,6 +465,8 @@ async def create_chat_completion(request: ChatCompletionRequest):
         
         return response
         
+    except HTTPException:
+        raise
     except Exception as e:
         # Calculate processing time
         processing_time = time.time() - start_time
@@ -249,6 +475,16 @@ async def create_chat_completion(request: ChatCompletionRequest):
         traceback.print_exc()
         raise HTTPException(status_code=500, detail=f"Error processing request: {str(e)}")
 
+@app.get("/stats")
+async def stats():
+    """Token usage, prompt cache, LLM admission, message bus and web cache statistics."""
+    return {
+        "usage": provider.usage_stats(),
+        "admission": provider.admission.stats(),
+        "bus": bus.stats(),
+        "web_cache": agent.web_cache.stats() if agent.web_cache else None,
+    }
+
 @app.get("/")
 async def root():
     """Root endpoint."""
@@ -257,7 +493,8 @@ async def root():
         "version": "1.0.0",
         "endpoints": {
             "/v1/models": "List available models",
-            "/v1/chat/completions": "Create chat completions"
+            "/v1/chat/completions": "Create chat completions",
+            "/stats": "Token usage, prompt cache, LLM admission, message queue and web cache statistics"
         }
     }
 
@@ -8,6 +8,7 @@ from typing import Any
 
 from nanobot.agent.memory import MemoryStore
 from nanobot.agent.skills import SkillsLoader
+from nanobot.utils.tokens import count_tokens
 
 
 class ContextBuilder:
@@ -24,17 +25,60 @@ class ContextBuilder:
         self.workspace = workspace
         self.memory = MemoryStore(workspace)
         self.skills = SkillsLoader(workspace)
+        self._prompt_cache: tuple[tuple, str] | None = None  # (file signature, prompt)
+        self._prompt_tokens: tuple[str, int] | None = None  # (prompt, token count)
     
     def build_system_prompt(self, skill_names: list[str] | None = None) -> str:
         """
         Build the system prompt from bootstrap files, memory, and skills.
         
+        The prompt is cached until one of the files it was built from changes.
+        It holds nothing per-turn (time, channel), so it stays byte-identical
+        across turns and sessions and providers can cache it as a prefix.
+        
         Args:
             skill_names: Optional list of skills to include.
         
         Returns:
             Complete system prompt.
         """
+        return self._get_cached_prompt()
+    
+    def system_prompt_tokens(self) -> int:
+        """Token count of the system prompt, recounted only when the prompt is rebuilt."""
+        prompt = self._get_cached_prompt()
+        if self._prompt_tokens is None or self._prompt_tokens[0] is not prompt:
+            self._prompt_tokens = (prompt, count_tokens(prompt))
+        return self._prompt_tokens[1]
+    
+    def _get_cached_prompt(self) -> str:
+        """Get the time-independent part of the system prompt, rebuilding it only on file changes."""
+        signature = self._prompt_signature()
+        if self._prompt_cache and self._prompt_cache[0] == signature:
+            return self._prompt_cache[1]
+        
+        prompt = self._build_static_prompt()
+        self._prompt_cache = (signature, prompt)
+        return prompt
+    
+    def _prompt_signature(self) -> tuple:
+        """Stat every file the static prompt depends on (path, mtime, size), plus the skills index version."""
+        paths = [self.workspace / filename for filename in self.BOOTSTRAP_FILES]
+        paths += [self.memory.memory_file, self.memory.get_today_file()]
+        
+        # The skills index tracks its own files; its version changes with them
+        self.skills.refresh()
+        signature: list[tuple] = [("skills", self.skills.version)]
+        for path in paths:
+            try:
+                st = path.stat()
+                signature.append((str(path), st.st_mtime_ns, st.st_size))
+            except OSError:
+                signature.append((str(path), None, None))
+        return tuple(signature)
+    
+    def _build_static_prompt(self) -> str:
+        """Assemble identity, bootstrap files, memory and skills."""
         parts = []
         
         # Core identity
@@ -70,10 +114,16 @@ Skills with available="false" need dependencies installed first - you can try in
         
         return "\n\n---\n\n".join(parts)
     
+    def _get_turn_header(self, channel: str | None, chat_id: str | None) -> str:
+        """Get the per-turn context line (current time and session) for the user message."""
+        from datetime import datetime
+        parts = [f"Current time: {datetime.now().strftime('%Y-%m-%d %H:%M (%A)')}"]
+        if channel and chat_id:
+            parts += [f"Channel: {channel}", f"Chat ID: {chat_id}"]
+        return f"[{' | '.join(parts)}]"
+    
     def _get_identity(self) -> str:
         """Get the core identity section."""
-        from datetime import datetime
-        now = datetime.now().strftime("%Y-%m-%d %H:%M (%A)")
         workspace_path = str(self.workspace.expanduser().resolve())
         system = platform.system()
         runtime = f"{'macOS' if system == 'Darwin' else system} {platform.machine()}, Python {platform.python_version()}"
@@ -87,9 +137,6 @@ You are nanobot, a helpful AI assistant. You have access to tools that allow you
 - Send messages to users on chat channels
 - Spawn subagents for complex background tasks
 
-## Current Time
-{now}
-
 ## Runtime
 {runtime}
 
@@ -126,6 +173,7 @@ When remembering something, write to {workspace_path}/memory/MEMORY.md"""
         media: list[str] | None = None,
         channel: str | None = None,
         chat_id: str | None = None,
+        summary: str | None = None,
     ) -> list[dict[str, Any]]:
         """
         Build the complete message list for an LLM call.
@@ -137,23 +185,25 @@ When remembering something, write to {workspace_path}/memory/MEMORY.md"""
             media: Optional list of local file paths for images/media.
             channel: Current channel (telegram, feishu, etc.).
             chat_id: Current chat/user ID.
+            summary: Optional summary of earlier turns no longer in history.
 
         Returns:
             List of messages including system prompt.
         """
         messages = []
 
-        # System prompt
+        # System prompt (stable prefix; the summary changes only when it's rolled forward)
         system_prompt = self.build_system_prompt(skill_names)
-        if channel and chat_id:
-            system_prompt += f"\n\n## Current Session\nChannel: {channel}\nChat ID: {chat_id}"
+        if summary:
+            system_prompt += f"\n\n## Earlier Conversation (summary)\n{summary}"
         messages.append({"role": "system", "content": system_prompt})
 
         # History
         messages.extend(history)
 
-        # Current message (with optional image attachments)
-        user_content = self._build_user_content(current_message, media)
+        # Current message (with optional image attachments), led by the time/session line
+        turn_text = f"{self._get_turn_header(channel, chat_id)}\n\n{current_message}"
+        user_content = self._build_user_content(turn_text, media)
         messages.append({"role": "user", "content": user_content})
 
         return messages
@@ -2,24 +2,37 @@
 
 import asyncio
 import json
+from contextlib import asynccontextmanager
 from pathlib import Path
-from typing import Any
+from typing import Any, AsyncIterator, Awaitable, Callable
 
 from loguru import logger
 
 from nanobot.bus.events import InboundMessage, OutboundMessage
 from nanobot.bus.queue import MessageBus
-from nanobot.providers.base import LLMProvider
+from nanobot.providers.base import LLMProvider, ToolCallRequest
 from nanobot.agent.context import ContextBuilder
 from nanobot.agent.tools.registry import ToolRegistry
 from nanobot.agent.tools.filesystem import ReadFileTool, WriteFileTool, EditFileTool, ListDirTool
 from nanobot.agent.tools.shell import ExecTool
-from nanobot.agent.tools.web import WebSearchTool, WebFetchTool
+from nanobot.agent.tools.web import WebCache, WebSearchTool, WebFetchTool
 from nanobot.agent.tools.message import MessageTool
 from nanobot.agent.tools.spawn import SpawnTool
 from nanobot.agent.tools.cron import CronTool
+from nanobot.agent.streaming import ReplyStream
 from nanobot.agent.subagent import SubagentManager
-from nanobot.session.manager import SessionManager
+from nanobot.agent.summarizer import HistorySummarizer
+from nanobot.session.manager import Session, SessionManager
+from nanobot.utils.extract import ExtractionPool
+from nanobot.utils.http import HttpClientPool
+from nanobot.utils.tokens import count_tokens
+
+# Assumed context size when the model's isn't known
+DEFAULT_CONTEXT_WINDOW = 32_000
+
+
+class ModelCallError(Exception):
+    """The LLM call failed after the provider's retries and fallbacks."""
 
 
 class AgentLoop:
@@ -41,11 +54,20 @@ class AgentLoop:
         workspace: Path,
         model: str | None = None,
         max_iterations: int = 100,
+        max_tokens: int = 4096,
+        temperature: float = 0.7,
         brave_api_key: str | None = None,
         exec_config: "ExecToolConfig | None" = None,
         cron_service: "CronService | None" = None,
         restrict_to_workspace: bool = False,
         session_manager: SessionManager | None = None,
+        max_concurrent_sessions: int = 4,
+        max_parallel_tools: int = 4,
+        summary_model: str | None = None,
+        summary_threshold: int = 16000,
+        http_pool: HttpClientPool | None = None,
+        web_cache: WebCache | None = None,
+        web_extractor: ExtractionPool | None = None,
     ):
         from nanobot.config.schema import ExecToolConfig
         from nanobot.cron.service import CronService
@@ -54,10 +76,17 @@ class AgentLoop:
         self.workspace = workspace
         self.model = model or provider.get_default_model()
         self.max_iterations = max_iterations
+        self.max_tokens = max_tokens
+        self.temperature = temperature
         self.brave_api_key = brave_api_key
         self.exec_config = exec_config or ExecToolConfig()
         self.cron_service = cron_service
         self.restrict_to_workspace = restrict_to_workspace
+        self.max_concurrent_sessions = max(1, max_concurrent_sessions)
+        self.max_parallel_tools = max_parallel_tools
+        self.http_pool = http_pool or HttpClientPool()
+        self.web_cache = web_cache
+        self.web_extractor = web_extractor or ExtractionPool()
         
         self.context = ContextBuilder(workspace)
         self.sessions = session_manager or SessionManager(workspace)
@@ -70,9 +99,25 @@ class AgentLoop:
             brave_api_key=brave_api_key,
             exec_config=self.exec_config,
             restrict_to_workspace=restrict_to_workspace,
+            max_parallel_tools=max_parallel_tools,
+            http_pool=self.http_pool,
+            web_cache=web_cache,
+            web_extractor=self.web_extractor,
+        )
+        self.summarizer = HistorySummarizer(
+            provider=provider,
+            sessions=self.sessions,
+            model=summary_model or self.model,
+            threshold=summary_threshold,
         )
         
         self._running = False
+        self._run_task: asyncio.Task[None] | None = None
+        self._slots = asyncio.Semaphore(self.max_concurrent_sessions)
+        self._intake = asyncio.Semaphore(self.max_concurrent_sessions)  # Bus messages taken but not finished
+        self._session_locks: dict[str, asyncio.Lock] = {}
+        self._session_refs: dict[str, int] = {}
+        self._tasks: set[asyncio.Task[None]] = set()
         self._register_default_tools()
     
     def _register_default_tools(self) -> None:
@@ -92,8 +137,8 @@ class AgentLoop:
         ))
         
         # Web tools
-        self.tools.register(WebSearchTool(api_key=self.brave_api_key))
-        self.tools.register(WebFetchTool())
+        self.tools.register(WebSearchTool(api_key=self.brave_api_key, http_pool=self.http_pool, cache=self.web_cache))
+        self.tools.register(WebFetchTool(http_pool=self.http_pool, cache=self.web_cache, extractor=self.web_extractor))
         
         # Message tool
         message_tool = MessageTool(send_callback=self.bus.publish_outbound)
@@ -108,45 +153,131 @@ class AgentLoop:
             self.tools.register(CronTool(self.cron_service))
     
     async def run(self) -> None:
-        """Run the agent loop, processing messages from the bus."""
+        """
+        Run the agent loop, processing messages from the bus.
+        
+        Messages for different sessions run concurrently (up to
+        max_concurrent_sessions); messages within a session run in arrival order.
+        A message is only taken from the bus when a slot is free, so a backlog
+        stays in the bus queue, where its size limit, overflow policy and
+        per-session fairness apply. The loop sleeps until messages arrive and
+        `stop()` cancels the wait.
+        """
         self._running = True
-        logger.info("Agent loop started")
+        self._run_task = asyncio.current_task()
+        logger.info(f"Agent loop started (max {self.max_concurrent_sessions} concurrent sessions)")
         
-        while self._running:
-            try:
-                # Wait for next message
-                msg = await asyncio.wait_for(
-                    self.bus.consume_inbound(),
-                    timeout=1.0
-                )
-                
-                # Process it
+        try:
+            while True:
+                await self._intake.acquire()
                 try:
+                    msg = await self.bus.consume_inbound()
+                except BaseException:
+                    self._intake.release()
+                    raise
+                # Process it in the background so other sessions aren't blocked
+                task = asyncio.create_task(self._dispatch(msg))
+                self._tasks.add(task)
+                task.add_done_callback(self._dispatch_done)
+        except asyncio.CancelledError:
+            if self._running:
+                raise  # Cancelled from outside, not by stop()
+        finally:
+            self._run_task = None
+    
+    def _dispatch_done(self, task: asyncio.Task[None]) -> None:
+        self._tasks.discard(task)
+        self._intake.release()
+    
+    async def _dispatch(self, msg: InboundMessage) -> None:
+        """
+        Process one bus message inside its session slot and publish the reply.
+        
+        If the channel asked for streaming (`stream_interval` in the message
+        metadata), partial replies are published while the LLM generates.
+        """
+        stream = None
+        if interval := msg.metadata.get("stream_interval"):
+            stream = ReplyStream(self.bus, msg, interval)
+        
+        async with self._session_slot(self._effective_session_key(msg)):
+            try:
+                if stream:
+                    response = await self._process_message(msg, stream.on_delta, stream.on_tool_call)
+                else:
                     response = await self._process_message(msg)
-                    if response:
-                        await self.bus.publish_outbound(response)
-                except Exception as e:
-                    logger.error(f"Error processing message: {e}")
-                    # Send error response
-                    await self.bus.publish_outbound(OutboundMessage(
-                        channel=msg.channel,
-                        chat_id=msg.chat_id,
-                        content=f"Sorry, I encountered an error: {str(e)}"
-                    ))
-            except asyncio.TimeoutError:
-                continue
+                if response:
+                    await self.bus.publish_outbound(stream.finish(response) if stream else response)
+            except Exception as e:
+                logger.error(f"Error processing message: {e}")
+                # Send error response
+                error = OutboundMessage(
+                    channel=msg.channel,
+                    chat_id=msg.chat_id,
+                    content=f"Sorry, I encountered an error: {str(e)}"
+                )
+                await self.bus.publish_outbound(stream.finish(error) if stream else error)
+    
+    @asynccontextmanager
+    async def _session_slot(self, session_key: str) -> AsyncIterator[None]:
+        """
+        Serialise turns within one session and bound concurrency across sessions.
+        
+        The per-session lock is taken first: asyncio.Lock wakes waiters in FIFO
+        order, so a session's messages keep their arrival order, and queued
+        messages don't hold a concurrency slot while they wait.
+        """
+        lock = self._session_locks.setdefault(session_key, asyncio.Lock())
+        self._session_refs[session_key] = self._session_refs.get(session_key, 0) + 1
+        try:
+            async with lock, self._slots:
+                yield
+        finally:
+            self._session_refs[session_key] -= 1
+            if not self._session_refs[session_key]:
+                del self._session_refs[session_key]
+                del self._session_locks[session_key]
+    
+    @staticmethod
+    def _effective_session_key(msg: InboundMessage) -> str:
+        """Session a message will read and write (system messages use their origin's)."""
+        if msg.channel == "system":
+            return msg.chat_id if ":" in msg.chat_id else f"cli:{msg.chat_id}"
+        return msg.session_key
     
     def stop(self) -> None:
         """Stop the agent loop."""
         self._running = False
+        if self._run_task and not self._run_task.done():
+            self._run_task.cancel()
         logger.info("Agent loop stopping")
     
-    async def _process_message(self, msg: InboundMessage) -> OutboundMessage | None:
+    async def _reset_session(self, msg: InboundMessage) -> OutboundMessage:
+        """Clear a session's history on a channel's request (e.g. Telegram /reset)."""
+        session = self.sessions.get_or_create(msg.session_key)
+        msg_count = len(session.messages)
+        session.clear()
+        await self.sessions.save_async(session)
+        logger.info(f"Session reset for {msg.session_key} (cleared {msg_count} messages)")
+        return OutboundMessage(
+            channel=msg.channel,
+            chat_id=msg.chat_id,
+            content="🔄 Conversation history cleared. Let's start fresh!",
+        )
+    
+    async def _process_message(
+        self,
+        msg: InboundMessage,
+        on_delta: Callable[[str], Awaitable[None]] | None = None,
+        on_tool_call: Callable[[ToolCallRequest], Awaitable[None]] | None = None,
+    ) -> OutboundMessage | None:
         """
         Process a single inbound message.
         
         Args:
             msg: The inbound message to process.
+            on_delta: Optional callback receiving LLM content deltas as they stream.
+            on_tool_call: Optional callback invoked before each tool call executes.
         
         Returns:
             The response message, or None if no response needed.
@@ -156,6 +287,9 @@ class AgentLoop:
         if msg.channel == "system":
             return await self._process_system_message(msg)
         
+        if msg.metadata.get("command") == "reset":
+            return await self._reset_session(msg)
+        
         preview = msg.content[:80] + "..." if len(msg.content) > 80 else msg.content
         logger.info(f"Processing message from {msg.channel}:{msg.sender_id}: {preview}")
         
@@ -177,57 +311,21 @@ class AgentLoop:
         
         # Build initial messages (use get_history for LLM-formatted messages)
         messages = self.context.build_messages(
-            history=session.get_history(),
+            history=session.get_history(max_messages=None, max_tokens=self._history_budget(msg.content, session)),
             current_message=msg.content,
             media=msg.media if msg.media else None,
             channel=msg.channel,
             chat_id=msg.chat_id,
+            summary=session.metadata.get("summary"),
         )
         
         # Agent loop
-        iteration = 0
-        final_content = None
-        
-        while iteration < self.max_iterations:
-            iteration += 1
-            
-            # Call LLM
-            response = await self.provider.chat(
-                messages=messages,
-                tools=self.tools.get_definitions(),
-                model=self.model
-            )
-            
-            # Handle tool calls
-            if response.has_tool_calls:
-                # Add assistant message with tool calls
-                tool_call_dicts = [
-                    {
-                        "id": tc.id,
-                        "type": "function",
-                        "function": {
-                            "name": tc.name,
-                            "arguments": json.dumps(tc.arguments)  # Must be JSON string
-                        }
-                    }
-                    for tc in response.tool_calls
-                ]
-                messages = self.context.add_assistant_message(
-                    messages, response.content, tool_call_dicts
-                )
-                
-                # Execute tools
-                for tool_call in response.tool_calls:
-                    args_str = json.dumps(tool_call.arguments, ensure_ascii=False)
-                    logger.info(f"Tool call: {tool_call.name}({args_str[:200]})")
-                    result = await self.tools.execute(tool_call.name, tool_call.arguments)
-                    messages = self.context.add_tool_result(
-                        messages, tool_call.id, tool_call.name, result
-                    )
-            else:
-                # No tool calls, we're done
-                final_content = response.content
-                break
+        try:
+            final_content = await self._run_agent_loop(messages, on_delta, on_tool_call)
+        except ModelCallError as e:
+            # Tell the user, but keep the failed turn out of the session history
+            logger.error(f"LLM call failed for {msg.session_key}: {e}")
+            return OutboundMessage(channel=msg.channel, chat_id=msg.chat_id, content=str(e))
         
         if final_content is None:
             final_content = "I've completed processing but have no response to give."
@@ -239,7 +337,8 @@ class AgentLoop:
         # Save to session
         session.add_message("user", msg.content)
         session.add_message("assistant", final_content)
-        self.sessions.save(session)
+        await self.sessions.save_async(session)
+        self.summarizer.schedule(session)
         
         return OutboundMessage(
             channel=msg.channel,
@@ -247,6 +346,100 @@ class AgentLoop:
             content=final_content
         )
     
+    async def _run_agent_loop(
+        self,
+        messages: list[dict[str, Any]],
+        on_delta: Callable[[str], Awaitable[None]] | None = None,
+        on_tool_call: Callable[[ToolCallRequest], Awaitable[None]] | None = None,
+    ) -> str | None:
+        """
+        Run the LLM/tool iteration loop until the model stops calling tools.
+        
+        Args:
+            messages: Initial message list (system prompt, history, user turn).
+            on_delta: Optional callback receiving LLM content deltas as they stream.
+            on_tool_call: Optional callback invoked before each tool call executes.
+        
+        Returns:
+            The final assistant content, or None if the iteration limit was hit.
+        
+        Raises:
+            ModelCallError: If the provider reports an error.
+        """
+        iteration = 0
+        
+        while iteration < self.max_iterations:
+            iteration += 1
+            
+            # Call LLM
+            response = await self.provider.chat(
+                messages=messages,
+                tools=self.tools.get_definitions(),
+                model=self.model,
+                max_tokens=self.max_tokens,
+                temperature=self.temperature,
+                on_delta=on_delta,
+            )
+            
+            if response.finish_reason == "error":
+                raise ModelCallError(response.content or "Error calling LLM")
+            
+            # No tool calls, we're done
+            if not response.has_tool_calls:
+                return response.content
+            
+            # Add assistant message with tool calls
+            tool_call_dicts = [
+                {
+                    "id": tc.id,
+                    "type": "function",
+                    "function": {
+                        "name": tc.name,
+                        "arguments": json.dumps(tc.arguments)  # Must be JSON string
+                    }
+                }
+                for tc in response.tool_calls
+            ]
+            messages = self.context.add_assistant_message(
+                messages, response.content, tool_call_dicts
+            )
+            
+            # Execute tools (independent calls run concurrently)
+            for tool_call in response.tool_calls:
+                args_str = json.dumps(tool_call.arguments, ensure_ascii=False)
+                logger.info(f"Tool call: {tool_call.name}({args_str[:200]})")
+                if on_tool_call:
+                    await on_tool_call(tool_call)
+            results = await self.tools.execute_many(
+                [(tc.name, tc.arguments) for tc in response.tool_calls],
+                max_concurrency=self.max_parallel_tools,
+            )
+            
+            # Results go back in the order the LLM issued the calls
+            for tool_call, result in zip(response.tool_calls, results):
+                messages = self.context.add_tool_result(
+                    messages, tool_call.id, tool_call.name, result
+                )
+        
+        return None
+    
+    def _history_budget(self, current_message: str, session: Session) -> int:
+        """
+        Tokens left for conversation history.
+        
+        The model's context window minus the reply allowance, the system
+        prompt, the tool definitions, the rolling summary and the current message.
+        """
+        window = self.provider.get_context_window(self.model) or DEFAULT_CONTEXT_WINDOW
+        reserved = (
+            self.max_tokens
+            + self.context.system_prompt_tokens()
+            + self.tools.definition_tokens()
+            + count_tokens(session.metadata.get("summary", ""))
+            + count_tokens(current_message)
+        )
+        return max(0, window - reserved)
+    
     async def _process_system_message(self, msg: InboundMessage) -> OutboundMessage | None:
         """
         Process a system message (e.g., subagent announce).
@@ -285,51 +478,19 @@ class AgentLoop:
         
         # Build messages with the announce content
         messages = self.context.build_messages(
-            history=session.get_history(),
+            history=session.get_history(max_messages=None, max_tokens=self._history_budget(msg.content, session)),
             current_message=msg.content,
             channel=origin_channel,
             chat_id=origin_chat_id,
+            summary=session.metadata.get("summary"),
         )
         
         # Agent loop (limited for announce handling)
-        iteration = 0
-        final_content = None
-        
-        while iteration < self.max_iterations:
-            iteration += 1
-            
-            response = await self.provider.chat(
-                messages=messages,
-                tools=self.tools.get_definitions(),
-                model=self.model
-            )
-            
-            if response.has_tool_calls:
-                tool_call_dicts = [
-                    {
-                        "id": tc.id,
-                        "type": "function",
-                        "function": {
-                            "name": tc.name,
-                            "arguments": json.dumps(tc.arguments)
-                        }
-                    }
-                    for tc in response.tool_calls
-                ]
-                messages = self.context.add_assistant_message(
-                    messages, response.content, tool_call_dicts
-                )
-                
-                for tool_call in response.tool_calls:
-                    args_str = json.dumps(tool_call.arguments, ensure_ascii=False)
-                    logger.info(f"Tool call: {tool_call.name}({args_str[:200]})")
-                    result = await self.tools.execute(tool_call.name, tool_call.arguments)
-                    messages = self.context.add_tool_result(
-                        messages, tool_call.id, tool_call.name, result
-                    )
-            else:
-                final_content = response.content
-                break
+        try:
+            final_content = await self._run_agent_loop(messages)
+        except ModelCallError as e:
+            logger.error(f"LLM call failed for {session_key}: {e}")
+            return OutboundMessage(channel=origin_channel, chat_id=origin_chat_id, content=str(e))
         
         if final_content is None:
             final_content = "Background task completed."
@@ -337,7 +498,8 @@ class AgentLoop:
         # Save to session (mark as system message in history)
         session.add_message("user", f"[System: {msg.sender_id}] {msg.content}")
         session.add_message("assistant", final_content)
-        self.sessions.save(session)
+        await self.sessions.save_async(session)
+        self.summarizer.schedule(session)
         
         return OutboundMessage(
             channel=origin_channel,
@@ -351,15 +513,19 @@ class AgentLoop:
         session_key: str = "cli:direct",
         channel: str = "cli",
         chat_id: str = "direct",
+        on_delta: Callable[[str], Awaitable[None]] | None = None,
+        on_tool_call: Callable[[ToolCallRequest], Awaitable[None]] | None = None,
     ) -> str:
         """
-        Process a message directly (for CLI or cron usage).
+        Process a message directly (for CLI, cron or API usage).
         
         Args:
             content: The message content.
             session_key: Session identifier.
             channel: Source channel (for context).
             chat_id: Source chat ID (for context).
+            on_delta: Optional callback receiving LLM content deltas as they stream.
+            on_tool_call: Optional callback invoked before each tool call executes.
         
         Returns:
             The agent's response.
@@ -368,8 +534,10 @@ class AgentLoop:
             channel=channel,
             sender_id="user",
             chat_id=chat_id,
-            content=content
+            content=content,
+            session_key_override=session_key,
         )
         
-        response = await self._process_message(msg)
+        async with self._session_slot(msg.session_key):
+            response = await self._process_message(msg, on_delta, on_tool_call)
         return response.content if response else ""
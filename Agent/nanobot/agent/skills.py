@@ -4,11 +4,31 @@ import json
 import os
 import re
 import shutil
+import time
+from dataclasses import dataclass, field
 from pathlib import Path
 
 # Default builtin skills directory (relative to this file)
 BUILTIN_SKILLS_DIR = Path(__file__).parent.parent / "skills"
 
+# Seconds between re-checks of skill requirements (binaries on PATH, env vars)
+AVAILABILITY_TTL = 30.0
+
+
+@dataclass
+class SkillEntry:
+    """A parsed SKILL.md, held in the loader's index."""
+    name: str
+    source: str  # workspace, builtin
+    path: Path
+    signature: tuple[int, int]  # SKILL.md (mtime_ns, size) when parsed
+    content: str
+    metadata: dict[str, str] | None  # Raw frontmatter
+    nanobot_meta: dict = field(default_factory=dict)  # Parsed "nanobot" metadata JSON
+    always: bool = False
+    available: bool = True
+    missing: str = ""  # Description of unmet requirements
+
 
 class SkillsLoader:
     """
@@ -22,6 +42,116 @@ class SkillsLoader:
         self.workspace = workspace
         self.workspace_skills = workspace / "skills"
         self.builtin_skills = builtin_skills_dir or BUILTIN_SKILLS_DIR
+        # In-memory index: each SKILL.md is parsed once and re-parsed only when it changes
+        self._index: dict[str, SkillEntry] = {}
+        self._dir_listings: dict[Path, tuple[tuple, list[tuple[str, Path]]]] = {}
+        self._checked_at = 0.0  # When requirements were last checked
+        self.version = 0  # Bumped whenever the index changes
+    
+    def refresh(self) -> bool:
+        """
+        Bring the skill index up to date.
+        
+        Skills directories are relisted only when their mtimes change, and a
+        SKILL.md is re-parsed only when its mtime or size changes. Requirements
+        are re-checked every AVAILABILITY_TTL seconds, so a skill becomes
+        available soon after its missing binary is installed.
+        
+        Returns:
+            True if any skill was added, removed or re-parsed.
+        """
+        index: dict[str, SkillEntry] = {}
+        changed = False
+        
+        # Workspace skills (highest priority), then built-in
+        roots = [(self.workspace_skills, "workspace"), (self.builtin_skills, "builtin")]
+        for root, source in roots:
+            for name, skill_file in self._list_skill_dirs(root):
+                if name in index:
+                    continue
+                try:
+                    st = skill_file.stat()
+                except OSError:
+                    continue
+                signature = (st.st_mtime_ns, st.st_size)
+                entry = self._index.get(name)
+                if not entry or entry.path != skill_file or entry.signature != signature:
+                    entry = self._parse_skill(name, source, skill_file, signature)
+                    changed = True
+                index[name] = entry
+        
+        now = time.monotonic()
+        if now - self._checked_at >= AVAILABILITY_TTL:
+            self._checked_at = now
+            for entry in index.values():
+                changed |= self._update_availability(entry)
+        
+        if changed or index.keys() != self._index.keys():
+            self._index = index
+            self.version += 1
+            return True
+        return False
+    
+    def _list_skill_dirs(self, root: Path | None) -> list[tuple[str, Path]]:
+        """
+        List (name, SKILL.md path) under a skills root.
+        
+        Cached on the mtimes of the root and of each skill directory, so a
+        SKILL.md added to an existing directory is noticed too.
+        """
+        if not root:
+            return []
+        try:
+            with os.scandir(root) as entries:
+                dirs = sorted((e.name, e.stat().st_mtime_ns) for e in entries if e.is_dir())
+            signature = (root.stat().st_mtime_ns, tuple(dirs))
+        except OSError:
+            self._dir_listings.pop(root, None)
+            return []
+        
+        cached = self._dir_listings.get(root)
+        if cached and cached[0] == signature:
+            return cached[1]
+        
+        listing = []
+        for name, _ in dirs:
+            skill_file = root / name / "SKILL.md"
+            if skill_file.exists():
+                listing.append((name, skill_file))
+        self._dir_listings[root] = (signature, listing)
+        return listing
+    
+    def _parse_skill(self, name: str, source: str, path: Path, signature: tuple[int, int]) -> SkillEntry:
+        """Read and parse one SKILL.md, including its requirement status."""
+        content = path.read_text(encoding="utf-8")
+        metadata = self._parse_frontmatter(content)
+        nanobot_meta = self._parse_nanobot_metadata((metadata or {}).get("metadata", ""))
+        entry = SkillEntry(
+            name=name,
+            source=source,
+            path=path,
+            signature=signature,
+            content=content,
+            metadata=metadata,
+            nanobot_meta=nanobot_meta,
+            always=bool(nanobot_meta.get("always") or (metadata or {}).get("always")),
+        )
+        self._update_availability(entry)
+        return entry
+    
+    def _update_availability(self, entry: SkillEntry) -> bool:
+        """Re-check a skill's requirements; True if its status changed."""
+        available = self._check_requirements(entry.nanobot_meta)
+        missing = "" if available else self._get_missing_requirements(entry.nanobot_meta)
+        if (available, missing) == (entry.available, entry.missing):
+            return False
+        entry.available, entry.missing = available, missing
+        return True
+    
+    def _entries(self) -> list[SkillEntry]:
+        """Get all indexed skills, refreshing the index first."""
+        self.refresh()
+        return list(self._index.values())
     
     def list_skills(self, filter_unavailable: bool = True) -> list[dict[str, str]]:
         """
@@ -33,28 +163,11 @@ class SkillsLoader:
         Returns:
             List of skill info dicts with 'name', 'path', 'source'.
         """
-        skills = []
-        
-        # Workspace skills (highest priority)
-        if self.workspace_skills.exists():
-            for skill_dir in self.workspace_skills.iterdir():
-                if skill_dir.is_dir():
-                    skill_file = skill_dir / "SKILL.md"
-                    if skill_file.exists():
-                        skills.append({"name": skill_dir.name, "path": str(skill_file), "source": "workspace"})
-        
-        # Built-in skills
-        if self.builtin_skills and self.builtin_skills.exists():
-            for skill_dir in self.builtin_skills.iterdir():
-                if skill_dir.is_dir():
-                    skill_file = skill_dir / "SKILL.md"
-                    if skill_file.exists() and not any(s["name"] == skill_dir.name for s in skills):
-                        skills.append({"name": skill_dir.name, "path": str(skill_file), "source": "builtin"})
-        
-        # Filter by requirements
-        if filter_unavailable:
-            return [s for s in skills if self._check_requirements(self._get_skill_meta(s["name"]))]
-        return skills
+        return [
+            {"name": e.name, "path": str(e.path), "source": e.source}
+            for e in self._entries()
+            if e.available or not filter_unavailable
+        ]
     
     def load_skill(self, name: str) -> str | None:
         """
@@ -66,18 +179,9 @@ class SkillsLoader:
         Returns:
             Skill content or None if not found.
         """
-        # Check workspace first
-        workspace_skill = self.workspace_skills / name / "SKILL.md"
-        if workspace_skill.exists():
-            return workspace_skill.read_text(encoding="utf-8")
-        
-        # Check built-in
-        if self.builtin_skills:
-            builtin_skill = self.builtin_skills / name / "SKILL.md"
-            if builtin_skill.exists():
-                return builtin_skill.read_text(encoding="utf-8")
-        
-        return None
+        self.refresh()
+        entry = self._index.get(name)
+        return entry.content if entry else None
     
     def load_skills_for_context(self, skill_names: list[str]) -> str:
         """
@@ -108,31 +212,26 @@ class SkillsLoader:
         Returns:
             XML-formatted skills summary.
         """
-        all_skills = self.list_skills(filter_unavailable=False)
-        if not all_skills:
+        entries = self._entries()
+        if not entries:
             return ""
         
         def escape_xml(s: str) -> str:
             return s.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
         
         lines = ["<skills>"]
-        for s in all_skills:
-            name = escape_xml(s["name"])
-            path = s["path"]
-            desc = escape_xml(self._get_skill_description(s["name"]))
-            skill_meta = self._get_skill_meta(s["name"])
-            available = self._check_requirements(skill_meta)
+        for e in entries:
+            name = escape_xml(e.name)
+            desc = escape_xml((e.metadata or {}).get("description") or e.name)
             
-            lines.append(f"  <skill available=\"{str(available).lower()}\">")
+            lines.append(f"  <skill available=\"{str(e.available).lower()}\">")
             lines.append(f"    <name>{name}</name>")
             lines.append(f"    <description>{desc}</description>")
-            lines.append(f"    <location>{path}</location>")
+            lines.append(f"    <location>{e.path}</location>")
             
             # Show missing requirements for unavailable skills
-            if not available:
-                missing = self._get_missing_requirements(skill_meta)
-                if missing:
-                    lines.append(f"    <requires>{escape_xml(missing)}</requires>")
+            if not e.available and e.missing:
+                lines.append(f"    <requires>{escape_xml(e.missing)}</requires>")
             
             lines.append(f"  </skill>")
         lines.append("</skills>")
@@ -151,13 +250,6 @@ class SkillsLoader:
                 missing.append(f"ENV: {env}")
         return ", ".join(missing)
     
-    def _get_skill_description(self, name: str) -> str:
-        """Get the description of a skill from its frontmatter."""
-        meta = self.get_skill_metadata(name)
-        if meta and meta.get("description"):
-            return meta["description"]
-        return name  # Fallback to skill name
-    
     def _strip_frontmatter(self, content: str) -> str:
         """Remove YAML frontmatter from markdown content."""
         if content.startswith("---"):
@@ -186,19 +278,14 @@ class SkillsLoader:
         return True
     
     def _get_skill_meta(self, name: str) -> dict:
-        """Get nanobot metadata for a skill (cached in frontmatter)."""
-        meta = self.get_skill_metadata(name) or {}
-        return self._parse_nanobot_metadata(meta.get("metadata", ""))
+        """Get nanobot metadata for a skill (parsed once, from the index)."""
+        self.refresh()
+        entry = self._index.get(name)
+        return entry.nanobot_meta if entry else {}
     
     def get_always_skills(self) -> list[str]:
         """Get skills marked as always=true that meet requirements."""
-        result = []
-        for s in self.list_skills(filter_unavailable=True):
-            meta = self.get_skill_metadata(s["name"]) or {}
-            skill_meta = self._parse_nanobot_metadata(meta.get("metadata", ""))
-            if skill_meta.get("always") or meta.get("always"):
-                result.append(s["name"])
-        return result
+        return [e.name for e in self._entries() if e.always and e.available]
     
     def get_skill_metadata(self, name: str) -> dict | None:
         """
@@ -210,10 +297,12 @@ class SkillsLoader:
         Returns:
             Metadata dict or None.
         """
-        content = self.load_skill(name)
-        if not content:
-            return None
-        
+        self.refresh()
+        entry = self._index.get(name)
+        return dict(entry.metadata) if entry and entry.metadata is not None else None
+    
+    def _parse_frontmatter(self, content: str) -> dict | None:
+        """Parse the simple key: value YAML frontmatter of a SKILL.md."""
         if content.startswith("---"):
             match = re.match(r"^---\n(.*?)\n---", content, re.DOTALL)
             if match:
@@ -0,0 +1,65 @@
+"""Progressive delivery of replies to chat channels."""
+
+import time
+import uuid
+
+from nanobot.bus.events import InboundMessage, OutboundMessage
+from nanobot.bus.queue import MessageBus
+from nanobot.providers.base import ToolCallRequest
+
+
+class ReplyStream:
+    """
+    Publishes a reply to the bus while it is still being generated.
+
+    Each snapshot is an `OutboundMessage` carrying the text so far, with
+    `metadata["stream_id"]` identifying the reply and `metadata["partial"]`
+    set. Snapshots are published at most once per `interval` seconds (the
+    first one immediately), so the channel can turn them into message edits
+    without hitting platform rate limits. The final reply carries the same
+    `stream_id` without `partial`, and replaces the streamed text.
+    """
+
+    def __init__(self, bus: MessageBus, msg: InboundMessage, interval: float):
+        self.bus = bus
+        self.channel = msg.channel
+        self.chat_id = msg.chat_id
+        self.interval = interval
+        self.id = uuid.uuid4().hex[:12]
+        self._parts: list[str] = []
+        self._published = ""
+        self._last_publish = 0.0
+        self._new_turn = False
+
+    async def on_delta(self, text: str) -> None:
+        """Collect a content delta, publishing a snapshot when one is due."""
+        if self._new_turn:
+            # The model is answering again after tool calls: start over
+            self._parts.clear()
+            self._new_turn = False
+        self._parts.append(text)
+        if time.monotonic() - self._last_publish >= self.interval:
+            await self._publish()
+
+    async def on_tool_call(self, call: ToolCallRequest) -> None:
+        """Show the text so far while tools run; the next answer replaces it."""
+        await self._publish()
+        self._new_turn = True
+
+    def finish(self, msg: OutboundMessage) -> OutboundMessage:
+        """Mark the final reply as the end of this stream."""
+        msg.metadata["stream_id"] = self.id
+        return msg
+
+    async def _publish(self) -> None:
+        text = "".join(self._parts)
+        if not text.strip() or text == self._published:
+            return
+        self._published = text
+        self._last_publish = time.monotonic()
+        await self.bus.publish_outbound(OutboundMessage(
+            channel=self.channel,
+            chat_id=self.chat_id,
+            content=text,
+            metadata={"stream_id": self.id, "partial": True},
+        ))
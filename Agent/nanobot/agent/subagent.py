@@ -10,11 +10,14 @@ from loguru import logger
 
 from nanobot.bus.events import InboundMessage
 from nanobot.bus.queue import MessageBus
+from nanobot.providers.admission import Priority, set_request_priority
 from nanobot.providers.base import LLMProvider
 from nanobot.agent.tools.registry import ToolRegistry
 from nanobot.agent.tools.filesystem import ReadFileTool, WriteFileTool, ListDirTool
 from nanobot.agent.tools.shell import ExecTool
-from nanobot.agent.tools.web import WebSearchTool, WebFetchTool
+from nanobot.utils.extract import ExtractionPool
+from nanobot.agent.tools.web import WebCache, WebSearchTool, WebFetchTool
+from nanobot.utils.http import HttpClientPool
 
 
 class SubagentManager:
@@ -35,6 +38,10 @@ class SubagentManager:
         brave_api_key: str | None = None,
         exec_config: "ExecToolConfig | None" = None,
         restrict_to_workspace: bool = False,
+        max_parallel_tools: int = 4,
+        http_pool: HttpClientPool | None = None,
+        web_cache: WebCache | None = None,
+        web_extractor: ExtractionPool | None = None,
     ):
         from nanobot.config.schema import ExecToolConfig
         self.provider = provider
@@ -44,6 +51,10 @@ class SubagentManager:
         self.brave_api_key = brave_api_key
         self.exec_config = exec_config or ExecToolConfig()
         self.restrict_to_workspace = restrict_to_workspace
+        self.max_parallel_tools = max_parallel_tools
+        self.http_pool = http_pool or HttpClientPool()
+        self.web_cache = web_cache
+        self.web_extractor = web_extractor or ExtractionPool()
         self._running_tasks: dict[str, asyncio.Task[None]] = {}
     
     async def spawn(
@@ -94,6 +105,8 @@ class SubagentManager:
     ) -> None:
         """Execute the subagent task and announce the result."""
         logger.info(f"Subagent [{task_id}] starting task: {label}")
+        # Runs in its own task: users waiting on a reply go first
+        set_request_priority(Priority.BACKGROUND)
         
         try:
             # Build subagent tools (no message tool, no spawn tool)
@@ -107,8 +120,8 @@ class SubagentManager:
                 timeout=self.exec_config.timeout,
                 restrict_to_workspace=self.restrict_to_workspace,
             ))
-            tools.register(WebSearchTool(api_key=self.brave_api_key))
-            tools.register(WebFetchTool())
+            tools.register(WebSearchTool(api_key=self.brave_api_key, http_pool=self.http_pool, cache=self.web_cache))
+            tools.register(WebFetchTool(http_pool=self.http_pool, cache=self.web_cache, extractor=self.web_extractor))
             
             # Build messages with subagent-specific prompt
             system_prompt = self._build_subagent_prompt(task)
@@ -150,11 +163,15 @@ class SubagentManager:
                         "tool_calls": tool_call_dicts,
                     })
                     
-                    # Execute tools
+                    # Execute tools (independent calls run concurrently)
                     for tool_call in response.tool_calls:
                         args_str = json.dumps(tool_call.arguments)
                         logger.debug(f"Subagent [{task_id}] executing: {tool_call.name} with arguments: {args_str}")
-                        result = await tools.execute(tool_call.name, tool_call.arguments)
+                    results = await tools.execute_many(
+                        [(tc.name, tc.arguments) for tc in response.tool_calls],
+                        max_concurrency=self.max_parallel_tools,
+                    )
+                    for tool_call, result in zip(response.tool_calls, results):
                         messages.append({
                             "role": "tool",
                             "tool_call_id": tool_call.id,
@@ -0,0 +1,107 @@
+"""Rolling summarization of long conversations."""
+
+import asyncio
+from typing import Any
+
+from loguru import logger
+
+from nanobot.providers.admission import Priority, set_request_priority
+from nanobot.providers.base import LLMProvider
+from nanobot.session.manager import Session, SessionManager
+from nanobot.utils.tokens import message_tokens
+
+SUMMARY_PROMPT = """You maintain a running summary of a conversation between a user and an AI assistant.
+Merge the existing summary (if any) with the new messages into one updated summary.
+Keep facts, decisions, user preferences, names, open tasks and anything the assistant promised.
+Drop greetings and small talk. Write in the conversation's language, as concise bullet points.
+Reply with the summary only."""
+
+
+class HistorySummarizer:
+    """
+    Folds the oldest turns of long sessions into a rolling summary.
+
+    When the unsummarized history of a session grows past `threshold` tokens,
+    the oldest turns are summarized in the background with a (cheaper)
+    summary model until about half the threshold remains. The summary is
+    stored in `session.metadata["summary"]`, and `summary_seq` holds the
+    sequence number of the last summarized message so `Session.get_history`
+    skips those turns. A summary finished after the session was cleared is
+    discarded.
+    """
+
+    def __init__(
+        self,
+        provider: LLMProvider,
+        sessions: SessionManager,
+        model: str | None = None,
+        threshold: int = 16000,
+        max_tokens: int = 1024,
+    ):
+        self.provider = provider
+        self.sessions = sessions
+        self.model = model or provider.get_default_model()
+        self.threshold = threshold
+        self.max_tokens = max_tokens
+        self._running: dict[str, asyncio.Task[None]] = {}
+
+    def schedule(self, session: Session) -> None:
+        """Start summarizing a session in the background if it needs it."""
+        if self.threshold <= 0 or session.key in self._running:
+            return
+        if sum(message_tokens(m) for m in session.unsummarized()) <= self.threshold:
+            return
+
+        task = asyncio.create_task(self._summarize(session))
+        self._running[session.key] = task
+        task.add_done_callback(lambda _: self._running.pop(session.key, None))
+
+    async def _summarize(self, session: Session) -> None:
+        """Summarize the oldest unsummarized turns of a session."""
+        set_request_priority(Priority.BACKGROUND)
+        generation = session.generation
+        block = self._oldest_block(session.unsummarized())
+        if not block:
+            return
+
+        previous = session.metadata.get("summary", "")
+        transcript = "\n".join(f"{m['role']}: {m['content']}" for m in block)
+        content = f"## Existing summary\n{previous or '(none)'}\n\n## New messages\n{transcript}"
+
+        response = await self.provider.chat(
+            messages=[
+                {"role": "system", "content": SUMMARY_PROMPT},
+                {"role": "user", "content": content},
+            ],
+            model=self.model,
+            max_tokens=self.max_tokens,
+            temperature=0.2,
+        )
+        if response.finish_reason == "error" or not response.content:
+            logger.warning(f"Summarizing {session.key} failed: {response.content}")
+            return
+        if session.generation != generation:
+            logger.info(f"Discarding summary of {session.key}: the session was cleared meanwhile")
+            return
+
+        session.metadata["summary"] = response.content.strip()
+        session.metadata["summary_seq"] = block[-1]["seq"]
+        session.metadata.pop("summary_until", None)
+        await self.sessions.save_async(session)
+        logger.info(f"Summarized {len(block)} messages of {session.key}")
+
+    def _oldest_block(self, messages: list[dict[str, Any]]) -> list[dict[str, Any]]:
+        """
+        Pick the oldest messages to summarize, leaving about half the
+        threshold unsummarized. The block always ends on a numbered assistant
+        reply so turns are never split.
+        """
+        remaining = sum(message_tokens(m) for m in messages)
+        end = 0
+        for i, msg in enumerate(messages):
+            if remaining <= self.threshold // 2:
+                break
+            remaining -= message_tokens(msg)
+            if msg["role"] == "assistant" and "seq" in msg:
+                end = i + 1
+        return messages[:end]
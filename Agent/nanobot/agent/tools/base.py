@@ -3,6 +3,9 @@
 from abc import ABC, abstractmethod
 from typing import Any
 
+# Concurrency key for calls that must not overlap any other call (see Tool.concurrency_key)
+EXCLUSIVE = "*"
+
 
 class Tool(ABC):
     """
@@ -52,6 +55,24 @@ class Tool(ABC):
         """
         pass
 
+    def concurrency_key(self, params: dict[str, Any]) -> str | None:
+        """
+        Key for calls that must not run in parallel with each other.
+        
+        When the LLM requests several tool calls in one turn, calls that return
+        the same key run one after another in their original order. None (the
+        default) lets the call run alongside any other. EXCLUSIVE makes the
+        call a barrier: calls issued before it finish first, and calls issued
+        after it wait until it is done.
+        
+        Args:
+            params: The call's parameters (not yet validated).
+        
+        Returns:
+            A key string, or None if the call is safe to run in parallel.
+        """
+        return None
+
     def validate_params(self, params: dict[str, Any]) -> list[str]:
         """Validate tool parameters against JSON schema. Returns error list (empty if valid)."""
         schema = self.parameters or {}
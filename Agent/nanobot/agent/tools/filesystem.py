@@ -14,6 +14,11 @@ def _resolve_path(path: str, allowed_dir: Path | None = None) -> Path:
     return resolved
 
 
+def _path_key(params: dict[str, Any]) -> str:
+    """Concurrency key for calls touching a file: one call per path at a time."""
+    return f"path:{Path(params['path']).expanduser().resolve()}"
+
+
 class ReadFileTool(Tool):
     """Tool to read file contents."""
     
@@ -41,6 +46,9 @@ class ReadFileTool(Tool):
             "required": ["path"]
         }
     
+    def concurrency_key(self, params: dict[str, Any]) -> str | None:
+        return _path_key(params)
+    
     async def execute(self, path: str, **kwargs: Any) -> str:
         try:
             file_path = _resolve_path(path, self._allowed_dir)
@@ -88,6 +96,9 @@ class WriteFileTool(Tool):
             "required": ["path", "content"]
         }
     
+    def concurrency_key(self, params: dict[str, Any]) -> str | None:
+        return _path_key(params)
+    
     async def execute(self, path: str, content: str, **kwargs: Any) -> str:
         try:
             file_path = _resolve_path(path, self._allowed_dir)
@@ -135,6 +146,9 @@ class EditFileTool(Tool):
             "required": ["path", "old_text", "new_text"]
         }
     
+    def concurrency_key(self, params: dict[str, Any]) -> str | None:
+        return _path_key(params)
+    
     async def execute(self, path: str, old_text: str, new_text: str, **kwargs: Any) -> str:
         try:
             file_path = _resolve_path(path, self._allowed_dir)
@@ -1,8 +1,11 @@
 """Tool registry for dynamic tool management."""
 
+import asyncio
+import json
 from typing import Any
 
-from nanobot.agent.tools.base import Tool
+from nanobot.agent.tools.base import EXCLUSIVE, Tool
+from nanobot.utils.tokens import count_tokens
 
 
 class ToolRegistry:
@@ -14,14 +17,17 @@ class ToolRegistry:
     
     def __init__(self):
         self._tools: dict[str, Tool] = {}
+        self._definition_tokens: int | None = None
     
     def register(self, tool: Tool) -> None:
         """Register a tool."""
         self._tools[tool.name] = tool
+        self._definition_tokens = None
     
     def unregister(self, name: str) -> None:
         """Unregister a tool by name."""
         self._tools.pop(name, None)
+        self._definition_tokens = None
     
     def get(self, name: str) -> Tool | None:
         """Get a tool by name."""
@@ -35,6 +41,12 @@ class ToolRegistry:
         """Get all tool definitions in OpenAI format."""
         return [tool.to_schema() for tool in self._tools.values()]
     
+    def definition_tokens(self) -> int:
+        """Token count of the tool definitions, cached until a tool is (un)registered."""
+        if self._definition_tokens is None:
+            self._definition_tokens = count_tokens(json.dumps(self.get_definitions()))
+        return self._definition_tokens
+    
     async def execute(self, name: str, params: dict[str, Any]) -> str:
         """
         Execute a tool by name with given parameters.
@@ -61,6 +73,68 @@ class ToolRegistry:
         except Exception as e:
             return f"Error executing {name}: {str(e)}"
     
+    async def execute_many(
+        self,
+        calls: list[tuple[str, dict[str, Any]]],
+        max_concurrency: int = 1,
+    ) -> list[str]:
+        """
+        Execute several tool calls, running independent ones concurrently.
+        
+        Calls sharing a concurrency key (see Tool.concurrency_key) run in their
+        original order, and EXCLUSIVE calls run alone, after everything issued
+        before them; everything else runs in parallel, at most max_concurrency
+        at a time.
+        
+        Args:
+            calls: (tool name, parameters) pairs in the order the LLM issued them.
+            max_concurrency: Maximum calls in flight. 1 runs them sequentially.
+        
+        Returns:
+            Tool results, in the same order as calls.
+        """
+        if max_concurrency <= 1 or len(calls) <= 1:
+            return [await self.execute(name, params) for name, params in calls]
+        
+        semaphore = asyncio.Semaphore(max_concurrency)
+        results: list[str] = [""] * len(calls)
+        keys = [self._concurrency_key(name, params) for name, params in calls]
+        
+        async def run_group(indices: list[int]) -> None:
+            for i in indices:
+                async with semaphore:
+                    results[i] = await self.execute(*calls[i])
+        
+        async def run_segment(indices: list[int]) -> None:
+            # Group calls that must not overlap; each group runs in order
+            groups: dict[Any, list[int]] = {}
+            for i in indices:
+                groups.setdefault(keys[i] if keys[i] is not None else ("call", i), []).append(i)
+            await asyncio.gather(*(run_group(group) for group in groups.values()))
+        
+        # Exclusive calls split the turn into segments that run one after another
+        segment: list[int] = []
+        for i, key in enumerate(keys):
+            if key == EXCLUSIVE:
+                await run_segment(segment)
+                segment = []
+                results[i] = await self.execute(*calls[i])
+            else:
+                segment.append(i)
+        await run_segment(segment)
+        return results
+    
+    def _concurrency_key(self, name: str, params: dict[str, Any]) -> str | None:
+        """Get a call's concurrency key. Keys are shared across tools (e.g. a file path)."""
+        tool = self._tools.get(name)
+        if not tool:
+            return None
+        try:
+            return tool.concurrency_key(params)
+        except Exception:
+            # Malformed params: serialise with other calls to the same tool
+            return f"tool:{name}"
+    
     @property
     def tool_names(self) -> list[str]:
         """Get list of registered tool names."""
@@ -6,7 +6,7 @@ import re
 from pathlib import Path
 from typing import Any
 
-from nanobot.agent.tools.base import Tool
+from nanobot.agent.tools.base import EXCLUSIVE, Tool
 
 
 class ExecTool(Tool):
@@ -60,6 +60,11 @@ class ExecTool(Tool):
             "required": ["command"]
         }
     
+    def concurrency_key(self, params: dict[str, Any]) -> str | None:
+        # Commands can read or write anything in the workspace (e.g. run a file
+        # written earlier in the same turn), so keep them in order with every call
+        return EXCLUSIVE
+    
     async def execute(self, command: str, working_dir: str | None = None, **kwargs: Any) -> str:
         cwd = working_dir or self.working_dir or os.getcwd()
         guard_error = self._guard_command(command, cwd)
@@ -1,33 +1,41 @@
 """Web tools: web_search and web_fetch."""
 
-import html
+import asyncio
+import hashlib
 import json
 import os
-import re
-from typing import Any
-from urllib.parse import urlparse
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Mapping
+from urllib.parse import parse_qsl, urlencode, urlparse, urlunparse
 
-import httpx
+from loguru import logger
 
 from nanobot.agent.tools.base import Tool
+from nanobot.utils.extract import ExtractionPool
+from nanobot.utils.http import HttpClientPool
+
+if TYPE_CHECKING:
+    from nanobot.config.schema import WebCacheConfig
 
 # Shared constants
 USER_AGENT = "Mozilla/5.0 (Macintosh; Intel Mac OS X 14_7_2) AppleWebKit/537.36"
-MAX_REDIRECTS = 5  # Limit redirects to prevent DoS attacks
-
+MAX_FETCH_BYTES = 5 * 1024 * 1024  # Stop reading a response body past this size
 
-def _strip_tags(text: str) -> str:
-    """Remove HTML tags and decode entities."""
-    text = re.sub(r'<script[\s\S]*?</script>', '', text, flags=re.I)
-    text = re.sub(r'<style[\s\S]*?</style>', '', text, flags=re.I)
-    text = re.sub(r'<[^>]+>', '', text)
-    return html.unescape(text).strip()
+# Content types web_fetch reads; anything else (PDF, images, archives...) is skipped
+TEXT_TYPES = ("text/", "application/json", "application/xml", "application/xhtml+xml",
+              "application/javascript", "+json", "+xml")
+BINARY_SIGNATURES = (b"%PDF", b"\x89PNG", b"GIF8", b"\xff\xd8\xff", b"PK\x03\x04", b"\x1f\x8b")
 
 
-def _normalize(text: str) -> str:
-    """Normalize whitespace."""
-    text = re.sub(r'[ \t]+', ' ', text)
-    return re.sub(r'\n{3,}', '\n\n', text).strip()
+def _is_text(ctype: str, head: bytes) -> bool:
+    """Decide from the Content-Type, or by sniffing the first chunk, whether a body is text."""
+    ctype = ctype.split(";")[0].strip().lower()
+    if ctype and ctype != "application/octet-stream":
+        return any(t in ctype for t in TEXT_TYPES)
+    return not head.startswith(BINARY_SIGNATURES) and b"\x00" not in head[:1024]
 
 
 def _validate_url(url: str) -> tuple[bool, str]:
@@ -43,6 +51,219 @@ def _validate_url(url: str) -> tuple[bool, str]:
         return False, str(e)
 
 
+def _normalize_url(url: str) -> str:
+    """Normalize a URL for cache keys: lowercase scheme/host, default port, sorted query, no fragment."""
+    p = urlparse(url.strip())
+    scheme, netloc = p.scheme.lower(), p.netloc.lower()
+    if (scheme, netloc.rpartition(":")[2]) in (("http", "80"), ("https", "443")):
+        netloc = netloc.rpartition(":")[0]
+    query = urlencode(sorted(parse_qsl(p.query, keep_blank_values=True)))
+    return urlunparse((scheme, netloc, p.path or "/", "", query, ""))
+
+
+def _cache_ttl(headers: Mapping[str, str], default: float) -> float | None:
+    """Seconds a response may be reused per Cache-Control, or None if it must not be stored."""
+    directives = {}
+    for part in headers.get("cache-control", "").lower().split(","):
+        name, _, value = part.strip().partition("=")
+        if name:
+            directives[name] = value.strip('"')
+    if "no-store" in directives:
+        return None
+    if "no-cache" in directives:
+        return 0.0  # Keep it, but revalidate before every use
+    try:
+        return float(directives["max-age"])
+    except (KeyError, ValueError):
+        return default
+
+
+@dataclass
+class CachedResponse:
+    """An extracted web result plus its freshness and revalidation info."""
+    data: dict[str, Any]
+    expires_at: float  # Unix time
+    etag: str | None = None
+    last_modified: str | None = None
+    
+    @property
+    def fresh(self) -> bool:
+        return time.time() < self.expires_at
+    
+    def validators(self) -> dict[str, str]:
+        """Conditional request headers for revalidating a stale entry."""
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class WebCache:
+    """
+    Cache for web_fetch and web_search results.
+    
+    Holds extracted text (not raw HTML) in an in-memory LRU, optionally
+    backed by one JSON file per entry on disk. Fetched pages follow the
+    response's Cache-Control max-age (default `ttl` otherwise) and are
+    revalidated with ETag / Last-Modified once stale; search results are
+    kept for `search_ttl` seconds.
+    """
+    
+    def __init__(
+        self,
+        max_entries: int = 256,
+        ttl: float = 300,
+        search_ttl: float = 600,
+        disk_dir: Path | None = None,
+        max_disk_entries: int = 2000,
+    ):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.search_ttl = search_ttl
+        self.disk_dir = disk_dir
+        self.max_disk_entries = max_disk_entries
+        self._memory: OrderedDict[str, CachedResponse] = OrderedDict()
+        self._disk_writes = 0
+        self._stats = {"hits": 0, "misses": 0, "stale": 0, "revalidated": 0}
+        if disk_dir:
+            disk_dir.mkdir(parents=True, exist_ok=True)
+    
+    @classmethod
+    def from_config(cls, config: "WebCacheConfig") -> "WebCache | None":
+        """Create a cache from the `tools.web.cache` config section (None if disabled)."""
+        if not config.enabled:
+            return None
+        return cls(
+            max_entries=config.max_entries,
+            ttl=config.ttl,
+            search_ttl=config.search_ttl,
+            disk_dir=Path.home() / ".nanobot" / "cache" / "web" if config.disk else None,
+            max_disk_entries=config.max_disk_entries,
+        )
+    
+    async def get(self, key: str) -> CachedResponse | None:
+        """Look up an entry; stale entries are returned too so they can be revalidated."""
+        entry = self._memory.get(key)
+        if entry is not None:
+            self._memory.move_to_end(key)
+        elif self.disk_dir:
+            entry = await asyncio.to_thread(self._read_disk, key)
+            if entry is not None:
+                self._remember(key, entry)
+        
+        if entry is None:
+            self._stats["misses"] += 1
+        elif entry.fresh:
+            self._stats["hits"] += 1
+        else:
+            self._stats["stale"] += 1
+        return entry
+    
+    async def put(
+        self,
+        key: str,
+        data: dict[str, Any],
+        headers: Mapping[str, str] | None = None,
+        ttl: float | None = None,
+    ) -> None:
+        """Store a result; `headers` supply Cache-Control and validators when given."""
+        headers = headers or {}
+        if ttl is None:
+            ttl = _cache_ttl(headers, self.ttl)
+        entry = CachedResponse(
+            data=data,
+            expires_at=time.time() + (ttl or 0),
+            etag=headers.get("etag"),
+            last_modified=headers.get("last-modified"),
+        )
+        if ttl is None or (not ttl and not entry.validators()):
+            return  # Not reusable
+        self._remember(key, entry)
+        if self.disk_dir:
+            await asyncio.to_thread(self._write_disk, key, entry)
+    
+    async def refresh(self, key: str, entry: CachedResponse, headers: Mapping[str, str]) -> None:
+        """Extend an entry after a 304 Not Modified."""
+        self._stats["revalidated"] += 1
+        entry.expires_at = time.time() + (_cache_ttl(headers, self.ttl) or 0)
+        entry.etag = headers.get("etag", entry.etag)
+        self._remember(key, entry)
+        if self.disk_dir:
+            await asyncio.to_thread(self._write_disk, key, entry)
+    
+    def stats(self) -> dict[str, Any]:
+        """Get hit/miss counters and the current size."""
+        lookups = self._stats["hits"] + self._stats["misses"] + self._stats["stale"]
+        served = self._stats["hits"] + self._stats["revalidated"]
+        return {
+            **self._stats,
+            "size": len(self._memory),
+            "hit_rate": round(served / lookups, 4) if lookups else 0.0,
+        }
+    
+    def _remember(self, key: str, entry: CachedResponse) -> None:
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+    
+    def _disk_path(self, key: str) -> Path:
+        return self.disk_dir / f"{hashlib.sha256(key.encode()).hexdigest()}.json"
+    
+    def _read_disk(self, key: str) -> CachedResponse | None:
+        path = self._disk_path(key)
+        try:
+            raw = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        if raw.get("key") != key:
+            return None
+        return CachedResponse(
+            data=raw["data"],
+            expires_at=raw["expires_at"],
+            etag=raw.get("etag"),
+            last_modified=raw.get("last_modified"),
+        )
+    
+    def _write_disk(self, key: str, entry: CachedResponse) -> None:
+        path = self._disk_path(key)
+        try:
+            tmp = path.with_suffix(".tmp")
+            tmp.write_text(json.dumps({
+                "key": key,
+                "data": entry.data,
+                "expires_at": entry.expires_at,
+                "etag": entry.etag,
+                "last_modified": entry.last_modified,
+            }), encoding="utf-8")
+            os.replace(tmp, path)
+        except OSError as e:
+            logger.warning(f"Failed to write web cache entry: {e}")
+            return
+        
+        # Trim the oldest files now and then
+        self._disk_writes += 1
+        if self._disk_writes % 100 == 0:
+            self._trim_disk()
+    
+    def _trim_disk(self) -> None:
+        """Delete the oldest files past `max_disk_entries`; a failed trim never fails a write."""
+        files = []
+        for path in self.disk_dir.glob("*.json"):
+            try:
+                files.append((path.stat().st_mtime, path))
+            except OSError:
+                continue  # Removed by another process (or trim) since the glob
+        files.sort()
+        for _, old in files[:max(0, len(files) - self.max_disk_entries)]:
+            try:
+                old.unlink(missing_ok=True)
+            except OSError as e:
+                logger.debug(f"Failed to trim web cache entry {old.name}: {e}")
+
+
 class WebSearchTool(Tool):
     """Search the web using Brave Search API."""
     
@@ -57,24 +278,46 @@ class WebSearchTool(Tool):
         "required": ["query"]
     }
     
-    def __init__(self, api_key: str | None = None, max_results: int = 5):
+    def __init__(
+        self,
+        api_key: str | None = None,
+        max_results: int = 5,
+        http_pool: HttpClientPool | None = None,
+        cache: WebCache | None = None,
+    ):
         self.api_key = api_key or os.environ.get("BRAVE_API_KEY", "")
         self.max_results = max_results
+        self.http = http_pool or HttpClientPool()
+        self.cache = cache
     
     async def execute(self, query: str, count: int | None = None, **kwargs: Any) -> str:
         n = min(max(count or self.max_results, 1), 10)
         
+        if not self.cache:
+            return await self._search(query, n)
+        
+        key = f"search:{n}:{' '.join(query.lower().split())}"
+        cached = await self.cache.get(key)
+        if cached and cached.fresh:
+            return cached.data["text"]
+        
+        result = await self._search(query, n)
+        if result.startswith("Results for:"):
+            await self.cache.put(key, {"text": result}, ttl=self.cache.search_ttl)
+        return result
+    
+    async def _search(self, query: str, n: int) -> str:
+        """Run the search against Brave, or Bing with a Baidu fallback."""
         try:
             if self.api_key:
                 # Use Brave Search API if API key is configured
-                async with httpx.AsyncClient() as client:
-                    r = await client.get(
-                        "https://api.search.brave.com/res/v1/web/search",
-                        params={"q": query, "count": n},
-                        headers={"Accept": "application/json", "X-Subscription-Token": self.api_key},
-                        timeout=10.0
-                    )
-                    r.raise_for_status()
+                r = await self.http.get(
+                    "https://api.search.brave.com/res/v1/web/search",
+                    params={"q": query, "count": n},
+                    headers={"Accept": "application/json", "X-Subscription-Token": self.api_key},
+                    timeout=10.0
+                )
+                r.raise_for_status()
                 
                 results = r.json().get("web", {}).get("results", [])
                 if not results:
@@ -88,48 +331,46 @@ class WebSearchTool(Tool):
                 return "\n".join(lines)
             else:
                 # Use Bing Search API as alternative when no Brave API key
-                async with httpx.AsyncClient() as client:
-                    r = await client.get(
-                        "https://api.bing.microsoft.com/v7.0/search",
-                        params={"q": query, "count": n},
-                        headers={"Ocp-Apim-Subscription-Key": ""},  # Empty key for free tier
+                r = await self.http.get(
+                    "https://api.bing.microsoft.com/v7.0/search",
+                    params={"q": query, "count": n},
+                    headers={"Ocp-Apim-Subscription-Key": ""},  # Empty key for free tier
+                    timeout=10.0
+                )
+                # If Bing API fails (likely due to missing key), use Baidu
+                if r.status_code != 200:
+                    r = await self.http.get(
+                        "https://www.baidu.com/s",
+                        params={"wd": query},
+                        headers={"User-Agent": USER_AGENT},
                         timeout=10.0
                     )
-                    # If Bing API fails (likely due to missing key), use Baidu
-                    if r.status_code != 200:
-                        async with httpx.AsyncClient() as client:
-                            r = await client.get(
-                                "https://www.baidu.com/s",
-                                params={"wd": query},
-                                headers={"User-Agent": USER_AGENT},
-                                timeout=10.0
-                            )
-                            r.raise_for_status()
-                        
-                        # Parse Baidu results (simplified)
-                        from bs4 import BeautifulSoup
-                        soup = BeautifulSoup(r.text, 'html.parser')
-                        results = []
-                        for item in soup.select('.result'):
-                            title_elem = item.select_one('h3.t a')
-                            url_elem = item.select_one('a')
-                            desc_elem = item.select_one('.c-abstract')
-                            if title_elem and url_elem:
-                                results.append({
-                                    'title': title_elem.get_text(strip=True),
-                                    'url': url_elem.get('href', ''),
-                                    'description': desc_elem.get_text(strip=True) if desc_elem else ''
-                                })
-                    else:
-                        # Parse Bing results
-                        bing_results = r.json().get('webPages', {}).get('value', [])
-                        results = []
-                        for item in bing_results:
+                    r.raise_for_status()
+                    
+                    # Parse Baidu results (simplified)
+                    from bs4 import BeautifulSoup
+                    soup = BeautifulSoup(r.text, 'html.parser')
+                    results = []
+                    for item in soup.select('.result'):
+                        title_elem = item.select_one('h3.t a')
+                        url_elem = item.select_one('a')
+                        desc_elem = item.select_one('.c-abstract')
+                        if title_elem and url_elem:
                             results.append({
-                                'title': item.get('name', ''),
-                                'url': item.get('url', ''),
-                                'description': item.get('snippet', '')
+                                'title': title_elem.get_text(strip=True),
+                                'url': url_elem.get('href', ''),
+                                'description': desc_elem.get_text(strip=True) if desc_elem else ''
                             })
+                else:
+                    # Parse Bing results
+                    bing_results = r.json().get('webPages', {}).get('value', [])
+                    results = []
+                    for item in bing_results:
+                        results.append({
+                            'title': item.get('name', ''),
+                            'url': item.get('url', ''),
+                            'description': item.get('snippet', '')
+                        })
                 
                 if not results:
                     return f"No results for: {query}"
@@ -161,12 +402,21 @@ class WebFetchTool(Tool):
         "required": ["url"]
     }
     
-    def __init__(self, max_chars: int = 50000):
+    def __init__(
+        self,
+        max_chars: int = 50000,
+        http_pool: HttpClientPool | None = None,
+        cache: WebCache | None = None,
+        max_bytes: int = MAX_FETCH_BYTES,
+        extractor: ExtractionPool | None = None,
+    ):
         self.max_chars = max_chars
+        self.http = http_pool or HttpClientPool()
+        self.cache = cache
+        self.max_bytes = max_bytes
+        self.extractor = extractor or ExtractionPool()
     
     async def execute(self, url: str, extractMode: str = "markdown", maxChars: int | None = None, **kwargs: Any) -> str:
-        from readability import Document
-
         max_chars = maxChars or self.max_chars
 
         # Validate URL before fetching
@@ -174,46 +424,57 @@ class WebFetchTool(Tool):
         if not is_valid:
             return json.dumps({"error": f"URL validation failed: {error_msg}", "url": url})
 
+        # Cached extraction: fresh entries are served without any network I/O
+        key = f"fetch:{extractMode}:{_normalize_url(url)}"
+        cached = await self.cache.get(key) if self.cache else None
+        if cached and cached.fresh:
+            return self._result(url, cached.data, max_chars)
+
         try:
-            async with httpx.AsyncClient(
-                follow_redirects=True,
-                max_redirects=MAX_REDIRECTS,
-                timeout=30.0
-            ) as client:
-                r = await client.get(url, headers={"User-Agent": USER_AGENT})
-                r.raise_for_status()
+            headers = {"User-Agent": USER_AGENT}
+            if cached:
+                headers.update(cached.validators())
             
-            ctype = r.headers.get("content-type", "")
+            # Stream the body so huge or endless responses stop at max_bytes.
+            # The pool caps redirects (HttpClientPool.max_redirects)
+            async with self.http.stream("GET", url, headers=headers, follow_redirects=True, timeout=30.0) as r:
+                if cached and r.status_code == 304:
+                    await self.cache.refresh(key, cached, r.headers)
+                    return self._result(url, cached.data, max_chars)
+                r.raise_for_status()
+                
+                ctype = r.headers.get("content-type", "")
+                chunks: list[bytes] = []
+                size = 0
+                capped = False
+                async for chunk in r.aiter_bytes():
+                    if not chunks and not _is_text(ctype, chunk):
+                        return json.dumps({"error": f"Skipped non-text content ({ctype or 'binary'})", "url": url})
+                    chunks.append(chunk)
+                    size += len(chunk)
+                    if size >= self.max_bytes:
+                        capped = True
+                        break
             
-            # JSON
-            if "application/json" in ctype:
-                text, extractor = json.dumps(r.json(), indent=2), "json"
-            # HTML
-            elif "text/html" in ctype or r.text[:256].lower().startswith(("<!doctype", "<html")):
-                doc = Document(r.text)
-                content = self._to_markdown(doc.summary()) if extractMode == "markdown" else _strip_tags(doc.summary())
-                text = f"# {doc.title()}\n\n{content}" if doc.title() else content
-                extractor = "readability"
-            else:
-                text, extractor = r.text, "raw"
+            body = b"".join(chunks)[:self.max_bytes].decode(r.encoding or "utf-8", errors="replace")
             
-            truncated = len(text) > max_chars
-            if truncated:
-                text = text[:max_chars]
+            # Parsing large pages is CPU-bound: keep it off the event loop
+            text, extractor = await self.extractor.extract(body, ctype, extractMode)
             
-            return json.dumps({"url": url, "finalUrl": str(r.url), "status": r.status_code,
-                              "extractor": extractor, "truncated": truncated, "length": len(text), "text": text})
+            data = {"finalUrl": str(r.url), "status": r.status_code, "extractor": extractor, "text": text,
+                    "capped": capped}
+            if self.cache:
+                await self.cache.put(key, data, r.headers)
+            return self._result(url, data, max_chars)
         except Exception as e:
             return json.dumps({"error": str(e), "url": url})
     
-    def _to_markdown(self, html: str) -> str:
-        """Convert HTML to markdown."""
-        # Convert links, headings, lists before stripping tags
-        text = re.sub(r'<a\s+[^>]*href=["\']([^"\']+)["\'][^>]*>([\s\S]*?)</a>',
-                      lambda m: f'[{_strip_tags(m[2])}]({m[1]})', html, flags=re.I)
-        text = re.sub(r'<h([1-6])[^>]*>([\s\S]*?)</h\1>',
-                      lambda m: f'\n{"#" * int(m[1])} {_strip_tags(m[2])}\n', text, flags=re.I)
-        text = re.sub(r'<li[^>]*>([\s\S]*?)</li>', lambda m: f'\n- {_strip_tags(m[1])}', text, flags=re.I)
-        text = re.sub(r'</(p|div|section|article)>', '\n\n', text, flags=re.I)
-        text = re.sub(r'<(br|hr)\s*/?>', '\n', text, flags=re.I)
-        return _normalize(_strip_tags(text))
+    @staticmethod
+    def _result(url: str, data: dict[str, Any], max_chars: int) -> str:
+        """Format an extraction result, truncating the text to max_chars."""
+        text = data["text"]
+        truncated = len(text) > max_chars or data.get("capped", False)
+        if len(text) > max_chars:
+            text = text[:max_chars]
+        return json.dumps({"url": url, "finalUrl": data["finalUrl"], "status": data["status"],
+                          "extractor": data["extractor"], "truncated": truncated, "length": len(text), "text": text})
@@ -2,5 +2,23 @@
 
 from nanobot.bus.events import InboundMessage, OutboundMessage
 from nanobot.bus.queue import MessageBus
+from nanobot.bus.transport import (
+    BusTransport,
+    IpcTransport,
+    LocalTransport,
+    RedisStreamsTransport,
+    create_transport,
+)
+from nanobot.bus.bridge import BusBridge
 
-__all__ = ["MessageBus", "InboundMessage", "OutboundMessage"]
+__all__ = [
+    "MessageBus",
+    "InboundMessage",
+    "OutboundMessage",
+    "BusTransport",
+    "LocalTransport",
+    "IpcTransport",
+    "RedisStreamsTransport",
+    "create_transport",
+    "BusBridge",
+]
@@ -0,0 +1,96 @@
+"""Connect a process-local MessageBus to a BusTransport."""
+
+import asyncio
+from typing import Awaitable, Callable
+
+from loguru import logger
+
+from nanobot.bus.queue import MessageBus
+from nanobot.bus.transport import BusTransport
+
+
+class BusBridge:
+    """
+    Forwards messages between the local bus and a transport.
+
+    As a "front" (the process running the channels) it sends channel
+    messages to the transport and puts the workers' replies on the local
+    outbound queue, where the ChannelManager delivers them.
+
+    As a "worker" (a process running an AgentLoop) it feeds the local
+    inbound queue from the shards it owns and sends the agent's replies to
+    the transport. Subagent results stay on the worker's local bus. A
+    worker must name its shards when there are several: two workers reading
+    the same shard would split one session's messages between processes.
+    """
+
+    def __init__(
+        self,
+        bus: MessageBus,
+        transport: BusTransport,
+        role: str,
+        shards: list[int] | None = None,
+    ):
+        if role not in ("front", "worker"):
+            raise ValueError(f"Unknown bus role: {role}")
+        self.bus = bus
+        self.transport = transport
+        self.role = role
+        if role == "worker" and shards is None and transport.shards > 1:
+            raise ValueError(f"A worker must name the shards it owns (the transport has {transport.shards})")
+        self.shards = list(range(transport.shards)) if shards is None else shards
+        for shard in self.shards:
+            if not 0 <= shard < transport.shards:
+                raise ValueError(f"Shard {shard} out of range (transport has {transport.shards})")
+        self._tasks: list[asyncio.Task[None]] = []
+        self._stopping = False
+
+    async def run(self) -> None:
+        """Forward messages until `stop()` is called."""
+        if self.role == "front":
+            pumps = [
+                self._pump("inbound", self.bus.consume_inbound_batch, self.transport.publish_inbound),
+                self._pump("outbound", self.transport.consume_outbound, self.bus.publish_outbound),
+            ]
+        else:
+            pumps = [
+                self._pump(f"shard {shard}", lambda s=shard: self.transport.consume_inbound(s), self.bus.publish_inbound)
+                for shard in self.shards
+            ]
+            pumps.append(self._pump("outbound", self.bus.consume_outbound_batch, self.transport.publish_outbound))
+        self._stopping = False
+        self._tasks = [asyncio.create_task(p) for p in pumps]
+        logger.info(f"Bus bridge started as {self.role}" + (f" for shards {self.shards}" if self.role == "worker" else ""))
+        try:
+            await asyncio.gather(*self._tasks)
+        except asyncio.CancelledError:
+            if not self._stopping:
+                raise  # Cancelled from outside, not by stop()
+        finally:
+            for task in self._tasks:
+                task.cancel()
+
+    def stop(self) -> None:
+        """Stop forwarding."""
+        self._stopping = True
+        for task in self._tasks:
+            task.cancel()
+
+    async def _pump(
+        self,
+        name: str,
+        receive: Callable[[], Awaitable[list]],
+        send: Callable[[object], Awaitable[object]],
+    ) -> None:
+        while True:
+            try:
+                batch = await receive()
+            except Exception as e:
+                logger.error(f"Bus bridge {name} receive failed: {e}")
+                await asyncio.sleep(1)  # Back off while the transport recovers
+                continue
+            for msg in batch:
+                try:
+                    await send(msg)
+                except Exception as e:
+                    logger.error(f"Bus bridge {name} failed to forward a message: {e}")
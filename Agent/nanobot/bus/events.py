@@ -1,6 +1,6 @@
 """Event types for the message bus."""
 
-from dataclasses import dataclass, field
+from dataclasses import asdict, dataclass, field
 from datetime import datetime
 from typing import Any
 
@@ -16,11 +16,26 @@ class InboundMessage:
     timestamp: datetime = field(default_factory=datetime.now)
     media: list[str] = field(default_factory=list)  # Media URLs
     metadata: dict[str, Any] = field(default_factory=dict)  # Channel-specific data
+    session_key_override: str | None = None  # Explicit session key (API, cron, heartbeat)
     
     @property
     def session_key(self) -> str:
         """Unique key for session identification."""
-        return f"{self.channel}:{self.chat_id}"
+        return self.session_key_override or f"{self.channel}:{self.chat_id}"
+    
+    def to_dict(self) -> dict[str, Any]:
+        """Serialize for a bus transport (JSON-safe as long as metadata is)."""
+        data = asdict(self)
+        data["timestamp"] = self.timestamp.isoformat()
+        return data
+    
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "InboundMessage":
+        """Rebuild a message serialized with `to_dict`."""
+        data = dict(data)
+        if isinstance(data.get("timestamp"), str):
+            data["timestamp"] = datetime.fromisoformat(data["timestamp"])
+        return cls(**data)
 
 
 @dataclass
@@ -33,5 +48,14 @@ class OutboundMessage:
     reply_to: str | None = None
     media: list[str] = field(default_factory=list)
     metadata: dict[str, Any] = field(default_factory=dict)
+    
+    def to_dict(self) -> dict[str, Any]:
+        """Serialize for a bus transport."""
+        return asdict(self)
+    
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "OutboundMessage":
+        """Rebuild a message serialized with `to_dict`."""
+        return cls(**data)
 
 
@@ -0,0 +1,154 @@
+"""Bounded queue with round-robin fairness across keys."""
+
+import asyncio
+import time
+from collections import deque
+from typing import Any, Callable, Generic, TypeVar
+
+T = TypeVar("T")
+
+OVERFLOW_POLICIES = ("block", "drop_oldest", "reject")
+
+
+class FairQueue(Generic[T]):
+    """
+    An asyncio queue that keeps one FIFO per key and serves keys round-robin.
+
+    Items with the same key (e.g. a session) come out in order, but a key
+    with a thousand pending items gets no more turns than a key with one, so
+    a flooding chat can't starve the others.
+
+    When `maxsize` items are pending, `overflow` decides what `put` does:
+    "block" waits for room, "drop_oldest" discards the oldest item of the
+    longest subqueue, and "reject" refuses the new item.
+    """
+
+    def __init__(self, key: Callable[[T], str], maxsize: int = 0, overflow: str = "block"):
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown overflow policy: {overflow}")
+        self.key = key
+        self.maxsize = maxsize
+        self.overflow = overflow
+        self._queues: dict[str, deque[tuple[float, T]]] = {}
+        self._ring: deque[str] = deque()  # Keys with pending items, in serving order
+        self._size = 0
+        self._getters: deque[asyncio.Future[None]] = deque()
+        self._putters: deque[asyncio.Future[None]] = deque()
+        self.dropped = 0
+        self.rejected = 0
+
+    def qsize(self) -> int:
+        return self._size
+
+    def empty(self) -> bool:
+        return self._size == 0
+
+    def full(self) -> bool:
+        return 0 < self.maxsize <= self._size
+
+    async def put(self, item: T) -> bool:
+        """
+        Add an item, applying the overflow policy when full.
+
+        Returns:
+            False if the item was rejected, True otherwise.
+        """
+        while self.full():
+            if self.overflow == "drop_oldest":
+                self._drop_oldest()
+                break
+            if self.overflow == "reject":
+                self.rejected += 1
+                return False
+            putter = asyncio.get_running_loop().create_future()
+            self._putters.append(putter)
+            try:
+                await putter
+            except asyncio.CancelledError:
+                putter.cancel()
+                if not self.full():
+                    self._wake(self._putters)  # Pass our turn on
+                raise
+        self._put(item)
+        return True
+
+    async def get(self) -> T:
+        """Remove and return the next item, waiting until one is available."""
+        while self.empty():
+            getter = asyncio.get_running_loop().create_future()
+            self._getters.append(getter)
+            try:
+                await getter
+            except asyncio.CancelledError:
+                getter.cancel()
+                if not self.empty():
+                    self._wake(self._getters)
+                raise
+        return self.get_nowait()
+
+    async def get_batch(self, max_items: int = 64) -> list[T]:
+        """
+        Wait for at least one item, then take whatever else is already queued.
+
+        Draining a burst in one wakeup keeps the round-robin order of
+        `get_nowait`.
+        """
+        items = [await self.get()]
+        while len(items) < max_items and not self.empty():
+            items.append(self.get_nowait())
+        return items
+
+    def get_nowait(self) -> T:
+        """Remove and return the next item from the next key in turn."""
+        if self.empty():
+            raise asyncio.QueueEmpty
+        key = self._ring.popleft()
+        queue = self._queues[key]
+        _, item = queue.popleft()
+        if queue:
+            self._ring.append(key)
+        else:
+            del self._queues[key]
+        self._size -= 1
+        self._wake(self._putters)
+        return item
+
+    def stats(self) -> dict[str, Any]:
+        """Depth, number of keys, age of the oldest item and overflow counters."""
+        oldest = min((q[0][0] for q in self._queues.values()), default=None)
+        return {
+            "size": self._size,
+            "maxsize": self.maxsize,
+            "keys": len(self._queues),
+            "oldest_age": round(time.monotonic() - oldest, 3) if oldest is not None else 0.0,
+            "dropped": self.dropped,
+            "rejected": self.rejected,
+        }
+
+    def _put(self, item: T) -> None:
+        key = self.key(item)
+        if key not in self._queues:
+            self._queues[key] = deque()
+            self._ring.append(key)
+        self._queues[key].append((time.monotonic(), item))
+        self._size += 1
+        self._wake(self._getters)
+
+    def _drop_oldest(self) -> None:
+        """Discard the oldest item of the longest subqueue (the flooding key)."""
+        key = max(self._queues, key=lambda k: len(self._queues[k]))
+        queue = self._queues[key]
+        queue.popleft()
+        if not queue:
+            del self._queues[key]
+            self._ring.remove(key)
+        self._size -= 1
+        self.dropped += 1
+
+    @staticmethod
+    def _wake(waiters: deque[asyncio.Future[None]]) -> None:
+        while waiters:
+            waiter = waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
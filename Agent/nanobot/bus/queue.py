@@ -1,11 +1,17 @@
 """Async message queue for decoupled channel-agent communication."""
 
 import asyncio
-from typing import Callable, Awaitable
+from typing import TYPE_CHECKING, Any, Callable, Awaitable
 
 from loguru import logger
 
 from nanobot.bus.events import InboundMessage, OutboundMessage
+from nanobot.bus.fair import FairQueue
+
+if TYPE_CHECKING:
+    from nanobot.config.schema import BusConfig
+
+BUSY_NOTICE = "I'm receiving too many messages right now. Please try again in a moment."
 
 
 class MessageBus:
@@ -14,22 +20,62 @@ class MessageBus:
     
     Channels push messages to the inbound queue, and the agent processes
     them and pushes responses to the outbound queue.
+    
+    Both queues are bounded (0 = unbounded) and served round-robin across
+    sessions (inbound) or chats (outbound), so one busy chat can't starve
+    the rest. See `FairQueue` for the overflow policies.
     """
     
-    def __init__(self):
-        self.inbound: asyncio.Queue[InboundMessage] = asyncio.Queue()
-        self.outbound: asyncio.Queue[OutboundMessage] = asyncio.Queue()
+    def __init__(
+        self,
+        inbound_maxsize: int = 0,
+        outbound_maxsize: int = 0,
+        inbound_overflow: str = "block",
+        outbound_overflow: str = "block",
+    ):
+        self.inbound: FairQueue[InboundMessage] = FairQueue(
+            key=lambda m: m.session_key, maxsize=inbound_maxsize, overflow=inbound_overflow
+        )
+        self.outbound: FairQueue[OutboundMessage] = FairQueue(
+            key=lambda m: f"{m.channel}:{m.chat_id}", maxsize=outbound_maxsize, overflow=outbound_overflow
+        )
         self._outbound_subscribers: dict[str, list[Callable[[OutboundMessage], Awaitable[None]]]] = {}
         self._running = False
+        self._dispatch_task: asyncio.Task[None] | None = None
     
-    async def publish_inbound(self, msg: InboundMessage) -> None:
-        """Publish a message from a channel to the agent."""
-        await self.inbound.put(msg)
+    @classmethod
+    def from_config(cls, config: "BusConfig") -> "MessageBus":
+        """Create a bus from the `bus` config section."""
+        return cls(
+            inbound_maxsize=config.inbound_maxsize,
+            outbound_maxsize=config.outbound_maxsize,
+            inbound_overflow=config.inbound_overflow,
+            outbound_overflow=config.outbound_overflow,
+        )
+    
+    async def publish_inbound(self, msg: InboundMessage) -> bool:
+        """
+        Publish a message from a channel to the agent.
+        
+        Returns:
+            False if the inbound queue was full and rejected the message; the
+            sender is then told to try again later.
+        """
+        if await self.inbound.put(msg):
+            return True
+        logger.warning(f"Inbound queue full, rejected message from {msg.channel}:{msg.chat_id}")
+        if msg.channel != "system":
+            await self.outbound.put(OutboundMessage(channel=msg.channel, chat_id=msg.chat_id, content=BUSY_NOTICE))
+        return False
     
     async def consume_inbound(self) -> InboundMessage:
         """Consume the next inbound message (blocks until available)."""
         return await self.inbound.get()
     
+    async def consume_inbound_batch(self, max_items: int = 64) -> list[InboundMessage]:
+        """Consume every pending inbound message (up to `max_items`), waiting for at least one."""
+        return await self.inbound.get_batch(max_items)
+    
     async def publish_outbound(self, msg: OutboundMessage) -> None:
         """Publish a response from the agent to channels."""
         await self.outbound.put(msg)
@@ -38,6 +84,10 @@ class MessageBus:
         """Consume the next outbound message (blocks until available)."""
         return await self.outbound.get()
     
+    async def consume_outbound_batch(self, max_items: int = 64) -> list[OutboundMessage]:
+        """Consume every pending outbound message (up to `max_items`), waiting for at least one."""
+        return await self.outbound.get_batch(max_items)
+    
     def subscribe_outbound(
         self, 
         channel: str, 
@@ -51,24 +101,29 @@ class MessageBus:
     async def dispatch_outbound(self) -> None:
         """
         Dispatch outbound messages to subscribed channels.
-        Run this as a background task.
+        Run this as a background task; `stop()` cancels it.
         """
         self._running = True
-        while self._running:
-            try:
-                msg = await asyncio.wait_for(self.outbound.get(), timeout=1.0)
-                subscribers = self._outbound_subscribers.get(msg.channel, [])
-                for callback in subscribers:
-                    try:
-                        await callback(msg)
-                    except Exception as e:
-                        logger.error(f"Error dispatching to {msg.channel}: {e}")
-            except asyncio.TimeoutError:
-                continue
+        self._dispatch_task = asyncio.current_task()
+        try:
+            while True:
+                for msg in await self.consume_outbound_batch():
+                    for callback in self._outbound_subscribers.get(msg.channel, []):
+                        try:
+                            await callback(msg)
+                        except Exception as e:
+                            logger.error(f"Error dispatching to {msg.channel}: {e}")
+        except asyncio.CancelledError:
+            if self._running:
+                raise  # Cancelled from outside, not by stop()
+        finally:
+            self._dispatch_task = None
     
     def stop(self) -> None:
         """Stop the dispatcher loop."""
         self._running = False
+        if self._dispatch_task and not self._dispatch_task.done():
+            self._dispatch_task.cancel()
     
     @property
     def inbound_size(self) -> int:
@@ -79,3 +134,7 @@ class MessageBus:
     def outbound_size(self) -> int:
         """Number of pending outbound messages."""
         return self.outbound.qsize()
+    
+    def stats(self) -> dict[str, Any]:
+        """Depth, oldest message age and overflow counters of both queues."""
+        return {"inbound": self.inbound.stats(), "outbound": self.outbound.stats()}
@@ -0,0 +1,274 @@
+"""Bus transports: carry bus messages between a channel front-end and agent workers."""
+
+import asyncio
+import hashlib
+import json
+import multiprocessing
+import threading
+from abc import ABC, abstractmethod
+from typing import TYPE_CHECKING, Any
+
+from loguru import logger
+
+from nanobot.bus.events import InboundMessage, OutboundMessage
+from nanobot.bus.fair import FairQueue
+
+if TYPE_CHECKING:
+    from nanobot.config.schema import BusConfig
+
+
+def shard_for(session_key: str, shards: int) -> int:
+    """
+    Map a session key to a shard with jump consistent hashing.
+
+    Every message of a session lands on the same shard, and changing the
+    shard count only moves about 1/N of the sessions.
+    """
+    key = int.from_bytes(hashlib.blake2b(session_key.encode(), digest_size=8).digest(), "big")
+    bucket, j = -1, 0
+    while j < shards:
+        bucket = j
+        key = (key * 2862933555777941757 + 1) & 0xFFFFFFFFFFFFFFFF
+        j = int((bucket + 1) * (2 ** 31 / ((key >> 33) + 1)))
+    return bucket
+
+
+class BusTransport(ABC):
+    """
+    Moves bus messages between processes.
+
+    Inbound messages are split into `shards` by session key, so all messages
+    of a session reach the same worker in order. Replies from all workers
+    go to a single outbound stream read by the channel front-end.
+    """
+
+    def __init__(self, shards: int = 1):
+        if shards < 1:
+            raise ValueError("A transport needs at least one shard")
+        self.shards = shards
+
+    def shard_for(self, msg: InboundMessage) -> int:
+        return shard_for(msg.session_key, self.shards)
+
+    @abstractmethod
+    async def publish_inbound(self, msg: InboundMessage) -> None:
+        """Send a channel message to the worker owning its session."""
+        pass
+
+    @abstractmethod
+    async def consume_inbound(self, shard: int) -> list[InboundMessage]:
+        """Wait for the next batch of messages on a shard."""
+        pass
+
+    @abstractmethod
+    async def publish_outbound(self, msg: OutboundMessage) -> None:
+        """Send a reply back to the front-end."""
+        pass
+
+    @abstractmethod
+    async def consume_outbound(self) -> list[OutboundMessage]:
+        """Wait for the next batch of replies."""
+        pass
+
+    async def close(self) -> None:
+        """Release connections."""
+        pass
+
+
+class LocalTransport(BusTransport):
+    """In-process transport, for a front-end and workers sharing one event loop."""
+
+    def __init__(self, shards: int = 1):
+        super().__init__(shards)
+        self._inbound: list[FairQueue[InboundMessage]] = [
+            FairQueue(key=lambda m: m.session_key) for _ in range(shards)
+        ]
+        self._outbound: FairQueue[OutboundMessage] = FairQueue(key=lambda m: f"{m.channel}:{m.chat_id}")
+
+    async def publish_inbound(self, msg: InboundMessage) -> None:
+        await self._inbound[self.shard_for(msg)].put(msg)
+
+    async def consume_inbound(self, shard: int) -> list[InboundMessage]:
+        return await self._inbound[shard].get_batch()
+
+    async def publish_outbound(self, msg: OutboundMessage) -> None:
+        await self._outbound.put(msg)
+
+    async def consume_outbound(self) -> list[OutboundMessage]:
+        return await self._outbound.get_batch()
+
+
+class IpcTransport(BusTransport):
+    """
+    Transport over multiprocessing queues, for worker processes on one host.
+
+    Create it in the parent and pass it to each worker `Process`. Each shard
+    has its own inbound queue, and all workers share one outbound queue.
+    A process reads a queue through a background thread that blocks on
+    `get()` and hands items to the event loop, so an idle reader needs no
+    polling. `close()` ends the reader threads with a sentinel.
+    """
+
+    def __init__(self, shards: int = 1, context: Any = None):
+        super().__init__(shards)
+        ctx = context or multiprocessing.get_context("spawn")
+        self._inbound = [ctx.Queue() for _ in range(shards)]
+        self._outbound = ctx.Queue()
+        self._buffers: dict[int, asyncio.Queue[dict[str, Any]]] = {}
+
+    def __getstate__(self) -> dict[str, Any]:
+        state = self.__dict__.copy()
+        state["_buffers"] = {}  # Reader threads and buffers belong to the process that started them
+        return state
+
+    async def publish_inbound(self, msg: InboundMessage) -> None:
+        self._inbound[self.shard_for(msg)].put(msg.to_dict())
+
+    async def consume_inbound(self, shard: int) -> list[InboundMessage]:
+        return [InboundMessage.from_dict(data) for data in await self._receive(self._inbound[shard])]
+
+    async def publish_outbound(self, msg: OutboundMessage) -> None:
+        self._outbound.put(msg.to_dict())
+
+    async def consume_outbound(self) -> list[OutboundMessage]:
+        return [OutboundMessage.from_dict(data) for data in await self._receive(self._outbound)]
+
+    async def close(self) -> None:
+        for queue in [*self._inbound, self._outbound]:
+            if id(queue) in self._buffers:
+                queue.put(None)  # Wakes our reader thread so it can exit
+
+    async def _receive(self, queue: Any) -> list[dict[str, Any]]:
+        buffer = self._buffers.get(id(queue))
+        if buffer is None:
+            buffer = self._buffers[id(queue)] = asyncio.Queue()
+            loop = asyncio.get_running_loop()
+            threading.Thread(target=self._read, args=(queue, buffer, loop), daemon=True).start()
+        items = [await buffer.get()]
+        while not buffer.empty():
+            items.append(buffer.get_nowait())
+        return items
+
+    @staticmethod
+    def _read(queue: Any, buffer: asyncio.Queue, loop: asyncio.AbstractEventLoop) -> None:
+        while (item := queue.get()) is not None:
+            try:
+                loop.call_soon_threadsafe(buffer.put_nowait, item)
+            except RuntimeError:  # The event loop has closed
+                return
+
+
+class RedisStreamsTransport(BusTransport):
+    """
+    Transport over Redis Streams, for workers in other processes or hosts.
+
+    Inbound shards are the streams `{prefix}:inbound:{n}`, read by the
+    "workers" consumer group; replies go to `{prefix}:outbound`, read by the
+    "front" group. Entries are acknowledged once read, so each one is
+    delivered once. Run one worker per shard to keep each session's
+    messages in order.
+
+    `client` is a `redis.asyncio.Redis` or anything with the same
+    `xadd` / `xgroup_create` / `xreadgroup` / `xack` methods.
+    """
+
+    INBOUND_GROUP = "workers"
+    OUTBOUND_GROUP = "front"
+
+    def __init__(
+        self,
+        client: Any,
+        shards: int = 1,
+        prefix: str = "nanobot",
+        consumer: str = "nanobot",
+        maxlen: int = 10000,
+        block_ms: int = 5000,
+        batch_size: int = 64,
+    ):
+        super().__init__(shards)
+        self.client = client
+        self.prefix = prefix
+        self.consumer = consumer
+        self.maxlen = maxlen
+        self.block_ms = block_ms
+        self.batch_size = batch_size
+        self._groups: set[tuple[str, str]] = set()
+
+    @classmethod
+    def from_url(cls, url: str, **kwargs: Any) -> "RedisStreamsTransport":
+        """Connect with the optional `redis` package."""
+        try:
+            import redis.asyncio as redis
+        except ImportError as e:
+            raise ImportError("The redis bus transport needs the redis package: pip install redis") from e
+        return cls(redis.from_url(url), **kwargs)
+
+    def inbound_stream(self, shard: int) -> str:
+        return f"{self.prefix}:inbound:{shard}"
+
+    @property
+    def outbound_stream(self) -> str:
+        return f"{self.prefix}:outbound"
+
+    async def publish_inbound(self, msg: InboundMessage) -> None:
+        await self._add(self.inbound_stream(self.shard_for(msg)), msg.to_dict())
+
+    async def consume_inbound(self, shard: int) -> list[InboundMessage]:
+        entries = await self._read(self.inbound_stream(shard), self.INBOUND_GROUP)
+        return [InboundMessage.from_dict(data) for data in entries]
+
+    async def publish_outbound(self, msg: OutboundMessage) -> None:
+        await self._add(self.outbound_stream, msg.to_dict())
+
+    async def consume_outbound(self) -> list[OutboundMessage]:
+        entries = await self._read(self.outbound_stream, self.OUTBOUND_GROUP)
+        return [OutboundMessage.from_dict(data) for data in entries]
+
+    async def close(self) -> None:
+        close = getattr(self.client, "aclose", None) or getattr(self.client, "close", None)
+        if close:
+            await close()
+
+    async def _add(self, stream: str, data: dict[str, Any]) -> None:
+        await self.client.xadd(stream, {"data": json.dumps(data)}, maxlen=self.maxlen, approximate=True)
+
+    async def _ensure_group(self, stream: str, group: str) -> None:
+        if (stream, group) in self._groups:
+            return
+        try:
+            await self.client.xgroup_create(stream, group, id="0", mkstream=True)
+        except Exception as e:
+            if "BUSYGROUP" not in str(e):  # The group already exists
+                raise
+        self._groups.add((stream, group))
+
+    async def _read(self, stream: str, group: str) -> list[dict[str, Any]]:
+        """Block until entries arrive on a stream, then acknowledge and decode them."""
+        await self._ensure_group(stream, group)
+        while True:
+            response = await self.client.xreadgroup(
+                group, self.consumer, {stream: ">"}, count=self.batch_size, block=self.block_ms
+            )
+            entries = [entry for _, stream_entries in response or [] for entry in stream_entries]
+            if entries:
+                break
+        await self.client.xack(stream, group, *[entry_id for entry_id, _ in entries])
+        decoded = []
+        for entry_id, fields in entries:
+            raw = fields.get(b"data", fields.get("data"))
+            try:
+                decoded.append(json.loads(raw))
+            except (TypeError, ValueError) as e:
+                logger.warning(f"Skipping malformed bus entry {entry_id!r} on {stream}: {e}")
+        return decoded
+
+
+def create_transport(config: "BusConfig", consumer: str = "nanobot") -> BusTransport:
+    """Create the transport named by the `bus` config section."""
+    if config.transport == "local":
+        return LocalTransport(config.shards)
+    if config.transport == "redis":
+        return RedisStreamsTransport.from_url(
+            config.redis_url, shards=config.shards, prefix=config.stream_prefix, consumer=consumer
+        )
+    raise ValueError(f"Unknown bus transport: {config.transport}")
@@ -94,7 +94,9 @@ class BaseChannel(ABC):
         """
         Handle an incoming message from the chat platform.
         
-        This method checks permissions and forwards to the bus.
+        This method checks permissions and forwards to the bus. Channels
+        configured with a `stream_interval` ask for the reply to be streamed
+        as partial messages (see `OutboundMessage.metadata`).
         
         Args:
             sender_id: The sender's identifier.
@@ -110,13 +112,18 @@ class BaseChannel(ABC):
             )
             return
         
+        metadata = metadata or {}
+        stream_interval = getattr(self.config, "stream_interval", 0)
+        if stream_interval:
+            metadata["stream_interval"] = stream_interval
+        
         msg = InboundMessage(
             channel=self.name,
             sender_id=str(sender_id),
             chat_id=str(chat_id),
             content=content,
             media=media or [],
-            metadata=metadata or {}
+            metadata=metadata
         )
         
         await self.bus.publish_inbound(msg)
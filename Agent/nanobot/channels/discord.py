@@ -13,10 +13,12 @@ from nanobot.bus.events import OutboundMessage
 from nanobot.bus.queue import MessageBus
 from nanobot.channels.base import BaseChannel
 from nanobot.config.schema import DiscordConfig
+from nanobot.utils.http import HttpClientPool
 
 
 DISCORD_API_BASE = "https://discord.com/api/v10"
 MAX_ATTACHMENT_BYTES = 20 * 1024 * 1024  # 20MB
+MAX_MESSAGE_LENGTH = 2000  # Discord rejects longer message content
 
 
 class DiscordChannel(BaseChannel):
@@ -24,14 +26,17 @@ class DiscordChannel(BaseChannel):
 
     name = "discord"
 
-    def __init__(self, config: DiscordConfig, bus: MessageBus):
+    def __init__(self, config: DiscordConfig, bus: MessageBus, http_pool: HttpClientPool | None = None):
         super().__init__(config, bus)
         self.config: DiscordConfig = config
         self._ws: websockets.WebSocketClientProtocol | None = None
         self._seq: int | None = None
         self._heartbeat_task: asyncio.Task | None = None
         self._typing_tasks: dict[str, asyncio.Task] = {}
-        self._http: httpx.AsyncClient | None = None
+        self._streams: dict[str, str] = {}  # stream_id -> id of the message being streamed
+        self._owns_http = http_pool is None
+        self._pool = http_pool or HttpClientPool()
+        self._http: HttpClientPool | None = None
 
     async def start(self) -> None:
         """Start the Discord gateway connection."""
@@ -40,7 +45,7 @@ class DiscordChannel(BaseChannel):
             return
 
         self._running = True
-        self._http = httpx.AsyncClient(timeout=30.0)
+        self._http = self._pool
 
         while self._running:
             try:
@@ -69,44 +74,78 @@ class DiscordChannel(BaseChannel):
             await self._ws.close()
             self._ws = None
         if self._http:
-            await self._http.aclose()
+            # A shared pool is closed by its owner
+            if self._owns_http:
+                await self._http.aclose()
             self._http = None
 
     async def send(self, msg: OutboundMessage) -> None:
-        """Send a message through Discord REST API."""
+        """
+        Send a message through Discord REST API.
+
+        Partial replies (see `ReplyStream`) create one message and then PATCH
+        it; the final reply edits that message in place.
+        """
         if not self._http:
             logger.warning("Discord HTTP client not initialized")
             return
 
         url = f"{DISCORD_API_BASE}/channels/{msg.chat_id}/messages"
-        payload: dict[str, Any] = {"content": msg.content}
-
-        if msg.reply_to:
-            payload["message_reference"] = {"message_id": msg.reply_to}
-            payload["allowed_mentions"] = {"replied_user": False}
-
-        headers = {"Authorization": f"Bot {self.config.token}"}
+        stream_id = msg.metadata.get("stream_id")
 
         try:
-            for attempt in range(3):
-                try:
-                    response = await self._http.post(url, headers=headers, json=payload)
-                    if response.status_code == 429:
-                        data = response.json()
-                        retry_after = float(data.get("retry_after", 1.0))
-                        logger.warning(f"Discord rate limited, retrying in {retry_after}s")
-                        await asyncio.sleep(retry_after)
-                        continue
-                    response.raise_for_status()
-                    return
-                except Exception as e:
-                    if attempt == 2:
-                        logger.error(f"Error sending Discord message: {e}")
-                    else:
-                        await asyncio.sleep(1)
+            if stream_id and msg.metadata.get("partial"):
+                await self._send_partial(url, msg.content, stream_id)
+                return
+
+            payload: dict[str, Any] = {"content": msg.content}
+            message_id = self._streams.pop(stream_id, None) if stream_id else None
+            if message_id:
+                await self._request("PATCH", f"{url}/{message_id}", payload)
+                return
+
+            if msg.reply_to:
+                payload["message_reference"] = {"message_id": msg.reply_to}
+                payload["allowed_mentions"] = {"replied_user": False}
+            await self._request("POST", url, payload)
         finally:
             await self._stop_typing(msg.chat_id)
 
+    async def _send_partial(self, url: str, content: str, stream_id: str) -> None:
+        """Create or update the message showing a reply as it streams in."""
+        if len(content) > MAX_MESSAGE_LENGTH:
+            content = content[:MAX_MESSAGE_LENGTH - 1] + "…"
+        message_id = self._streams.get(stream_id)
+        if message_id:
+            await self._request("PATCH", f"{url}/{message_id}", {"content": content}, attempts=1)
+            return
+        response = await self._request("POST", url, {"content": content}, attempts=1)
+        if response is not None:
+            self._streams[stream_id] = str(response.json().get("id", ""))
+
+    async def _request(
+        self, method: str, url: str, payload: dict[str, Any], attempts: int = 3
+    ) -> httpx.Response | None:
+        """Send a REST request, honouring rate limits; returns None if it failed."""
+        headers = {"Authorization": f"Bot {self.config.token}"}
+        for attempt in range(attempts):
+            try:
+                response = await self._http.request(method, url, headers=headers, json=payload)
+                if response.status_code == 429:
+                    data = response.json()
+                    retry_after = float(data.get("retry_after", 1.0))
+                    logger.warning(f"Discord rate limited, retrying in {retry_after}s")
+                    await asyncio.sleep(retry_after)
+                    continue
+                response.raise_for_status()
+                return response
+            except Exception as e:
+                if attempt == attempts - 1:
+                    logger.error(f"Error sending Discord message: {e}")
+                else:
+                    await asyncio.sleep(1)
+        return None
+
     async def _gateway_loop(self) -> None:
         """Main gateway loop: identify, heartbeat, dispatch events."""
         if not self._ws:
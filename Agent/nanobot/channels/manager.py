@@ -14,6 +14,7 @@ from nanobot.config.schema import Config
 
 if TYPE_CHECKING:
     from nanobot.session.manager import SessionManager
+    from nanobot.utils.http import HttpClientPool
 
 
 class ChannelManager:
@@ -26,10 +27,17 @@ class ChannelManager:
     - Route outbound messages
     """
     
-    def __init__(self, config: Config, bus: MessageBus, session_manager: "SessionManager | None" = None):
+    def __init__(
+        self,
+        config: Config,
+        bus: MessageBus,
+        session_manager: "SessionManager | None" = None,
+        http_pool: "HttpClientPool | None" = None,
+    ):
         self.config = config
         self.bus = bus
         self.session_manager = session_manager
+        self.http_pool = http_pool
         self.channels: dict[str, BaseChannel] = {}
         self._dispatch_task: asyncio.Task | None = None
         
@@ -47,6 +55,7 @@ class ChannelManager:
                     self.bus,
                     groq_api_key=self.config.providers.groq.api_key,
                     session_manager=self.session_manager,
+                    http_pool=self.http_pool,
                 )
                 logger.info("Telegram channel enabled")
             except ImportError as e:
@@ -68,7 +77,7 @@ class ChannelManager:
             try:
                 from nanobot.channels.discord import DiscordChannel
                 self.channels["discord"] = DiscordChannel(
-                    self.config.channels.discord, self.bus
+                    self.config.channels.discord, self.bus, http_pool=self.http_pool
                 )
                 logger.info("Discord channel enabled")
             except ImportError as e:
@@ -136,11 +145,11 @@ class ChannelManager:
         
         while True:
             try:
-                msg = await asyncio.wait_for(
-                    self.bus.consume_outbound(),
-                    timeout=1.0
-                )
-                
+                batch = await self.bus.consume_outbound_batch()
+            except asyncio.CancelledError:
+                break
+            
+            for msg in batch:
                 channel = self.channels.get(msg.channel)
                 if channel:
                     try:
@@ -149,11 +158,6 @@ class ChannelManager:
                         logger.error(f"Error sending to {msg.channel}: {e}")
                 else:
                     logger.warning(f"Unknown channel: {msg.channel}")
-                    
-            except asyncio.TimeoutError:
-                continue
-            except asyncio.CancelledError:
-                break
     
     def get_channel(self, name: str) -> BaseChannel | None:
         """Get a channel by name."""
@@ -17,6 +17,10 @@ from nanobot.config.schema import TelegramConfig
 
 if TYPE_CHECKING:
     from nanobot.session.manager import SessionManager
+    from nanobot.utils.http import HttpClientPool
+
+# Telegram rejects messages longer than this
+MAX_MESSAGE_LENGTH = 4096
 
 
 def _markdown_to_telegram_html(text: str) -> str:
@@ -104,14 +108,17 @@ class TelegramChannel(BaseChannel):
         bus: MessageBus,
         groq_api_key: str = "",
         session_manager: SessionManager | None = None,
+        http_pool: HttpClientPool | None = None,
     ):
         super().__init__(config, bus)
         self.config: TelegramConfig = config
         self.groq_api_key = groq_api_key
         self.session_manager = session_manager
+        self.http_pool = http_pool
         self._app: Application | None = None
         self._chat_ids: dict[str, int] = {}  # Map sender_id to chat_id for replies
         self._typing_tasks: dict[str, asyncio.Task] = {}  # chat_id -> typing loop task
+        self._streams: dict[str, int] = {}  # stream_id -> message_id of the reply being streamed
     
     async def start(self) -> None:
         """Start the Telegram bot with long polling."""
@@ -183,7 +190,12 @@ class TelegramChannel(BaseChannel):
             self._app = None
     
     async def send(self, msg: OutboundMessage) -> None:
-        """Send a message through Telegram."""
+        """
+        Send a message through Telegram.
+        
+        Partial replies (see `ReplyStream`) send one message and then edit it;
+        the final reply edits that message in place.
+        """
         if not self._app:
             logger.warning("Telegram bot not running")
             return
@@ -191,28 +203,55 @@ class TelegramChannel(BaseChannel):
         # Stop typing indicator for this chat
         self._stop_typing(msg.chat_id)
         
+        stream_id = msg.metadata.get("stream_id")
+        if stream_id and msg.metadata.get("partial"):
+            await self._send_partial(msg, stream_id)
+            return
+        message_id = self._streams.pop(stream_id, None) if stream_id else None
+        
         try:
             # chat_id should be the Telegram chat ID (integer)
             chat_id = int(msg.chat_id)
             # Convert markdown to Telegram HTML
             html_content = _markdown_to_telegram_html(msg.content)
-            await self._app.bot.send_message(
-                chat_id=chat_id,
-                text=html_content,
-                parse_mode="HTML"
-            )
+            await self._deliver(chat_id, html_content, message_id, parse_mode="HTML")
         except ValueError:
             logger.error(f"Invalid chat_id: {msg.chat_id}")
         except Exception as e:
+            if "not modified" in str(e).lower():
+                return
             # Fallback to plain text if HTML parsing fails
             logger.warning(f"HTML parse failed, falling back to plain text: {e}")
             try:
-                await self._app.bot.send_message(
-                    chat_id=int(msg.chat_id),
-                    text=msg.content
-                )
+                await self._deliver(int(msg.chat_id), msg.content, message_id)
             except Exception as e2:
-                logger.error(f"Error sending Telegram message: {e2}")
+                if "not modified" not in str(e2).lower():
+                    logger.error(f"Error sending Telegram message: {e2}")
+    
+    async def _deliver(self, chat_id: int, text: str, message_id: int | None, parse_mode: str | None = None) -> None:
+        """Edit a streamed message if there is one, otherwise send a new message."""
+        if message_id is None:
+            await self._app.bot.send_message(chat_id=chat_id, text=text, parse_mode=parse_mode)
+        else:
+            await self._app.bot.edit_message_text(
+                chat_id=chat_id, message_id=message_id, text=text, parse_mode=parse_mode
+            )
+    
+    async def _send_partial(self, msg: OutboundMessage, stream_id: str) -> None:
+        """Show a partial reply as plain text (its markdown may be unbalanced)."""
+        text = msg.content
+        if len(text) > MAX_MESSAGE_LENGTH:
+            text = text[:MAX_MESSAGE_LENGTH - 1] + "…"
+        try:
+            chat_id = int(msg.chat_id)
+            if stream_id in self._streams:
+                await self._deliver(chat_id, text, self._streams[stream_id])
+            else:
+                sent = await self._app.bot.send_message(chat_id=chat_id, text=text)
+                self._streams[stream_id] = sent.message_id
+        except Exception as e:
+            # A skipped edit is harmless: the next snapshot or the final reply catches up
+            logger.debug(f"Telegram partial reply not shown: {e}")
     
     async def _on_start(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
         """Handle /start command."""
@@ -235,14 +274,17 @@ class TelegramChannel(BaseChannel):
         session_key = f"{self.name}:{chat_id}"
         
         if self.session_manager is None:
-            logger.warning("/reset called but session_manager is not available")
-            await update.message.reply_text("⚠️ Session management is not available.")
+            # Sessions live in the agent workers (gateway --workers / --role front):
+            # send the reset over the bus to the worker owning this session
+            user = update.effective_user
+            sender_id = f"{user.id}|{user.username}" if user.username else str(user.id)
+            await self._handle_message(sender_id, chat_id, "/reset", metadata={"command": "reset"})
             return
         
         session = self.session_manager.get_or_create(session_key)
         msg_count = len(session.messages)
         session.clear()
-        self.session_manager.save(session)
+        await self.session_manager.save_async(session)
         
         logger.info(f"Session reset for {session_key} (cleared {msg_count} messages)")
         await update.message.reply_text("🔄 Conversation history cleared. Let's start fresh!")
@@ -324,7 +366,7 @@ class TelegramChannel(BaseChannel):
                 # Handle voice transcription
                 if media_type == "voice" or media_type == "audio":
                     from nanobot.providers.transcription import GroqTranscriptionProvider
-                    transcriber = GroqTranscriptionProvider(api_key=self.groq_api_key)
+                    transcriber = GroqTranscriptionProvider(api_key=self.groq_api_key, http_pool=self.http_pool)
                     transcription = await transcriber.transcribe(file_path)
                     if transcription:
                         logger.info(f"Transcribed {media_type}: {transcription[:50]}...")
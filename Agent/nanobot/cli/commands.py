@@ -1,6 +1,7 @@
 """CLI commands for nanobot."""
 
 import asyncio
+import os
 from pathlib import Path
 
 import typer
@@ -150,6 +151,8 @@ This file stores important information that should persist across sessions.
 def _make_provider(config):
     """Create LiteLLMProvider from config. Exits if no API key found."""
     from nanobot.providers.litellm_provider import LiteLLMProvider
+    from nanobot.providers.admission import AdmissionController
+    from nanobot.providers.resilience import ModelRoute, RetryPolicy
     p = config.get_provider()
     model = config.agents.defaults.model
     if not (p and p.api_key) and not model.startswith("bedrock/"):
@@ -161,6 +164,21 @@ def _make_provider(config):
         api_base=config.get_api_base(),
         default_model=model,
         extra_headers=p.extra_headers if p else None,
+        fallbacks=[ModelRoute.from_config(config, m) for m in config.agents.defaults.fallback_models],
+        retry=RetryPolicy.from_config(config.resilience),
+        admission=AdmissionController.from_config(config.admission),
+    )
+
+
+def _make_session_manager(config):
+    """Create the SessionManager for the configured session store."""
+    from nanobot.session.manager import SessionManager
+    return SessionManager(
+        config.workspace_path,
+        history_tail=config.sessions.history_tail,
+        max_sessions=config.sessions.max_cached,
+        idle_ttl=config.sessions.idle_ttl,
+        backend=config.sessions.backend,
     )
 
 
@@ -173,31 +191,84 @@ def _make_provider(config):
 def gateway(
     port: int = typer.Option(18790, "--port", "-p", help="Gateway port"),
     verbose: bool = typer.Option(False, "--verbose", "-v", help="Verbose output"),
+    role: str = typer.Option(
+        "all", "--role",
+        help="all: channels and agent in one process; front: channels only; worker: agent only (needs bus.transport=redis)",
+    ),
+    shard: list[int] = typer.Option(None, "--shard", help="Inbound shard(s) a worker owns; required when bus.shards > 1 (default: all)"),
+    workers: int = typer.Option(1, "--workers", "-w", help="Agent worker processes, each owning a shard of the sessions"),
 ):
     """Start the nanobot gateway."""
-    from nanobot.config.loader import load_config, get_data_dir
+    from nanobot.config.loader import load_config
     from nanobot.bus.queue import MessageBus
-    from nanobot.agent.loop import AgentLoop
-    from nanobot.channels.manager import ChannelManager
-    from nanobot.session.manager import SessionManager
-    from nanobot.cron.service import CronService
-    from nanobot.cron.types import CronJob
-    from nanobot.heartbeat.service import HeartbeatService
+    from nanobot.bus.bridge import BusBridge
+    from nanobot.bus.transport import create_transport
     
     if verbose:
         import logging
         logging.basicConfig(level=logging.DEBUG)
     
-    console.print(f"{__logo__} Starting nanobot gateway on port {port}...")
+    if role not in ("all", "front", "worker"):
+        console.print(f"[red]Unknown role: {role}[/red]")
+        raise typer.Exit(1)
+    if workers > 1 and role != "all":
+        console.print("[red]--workers starts its own front and workers; it can't be combined with --role[/red]")
+        raise typer.Exit(1)
     
     config = load_config()
-    bus = MessageBus()
+    if role != "all" and config.bus.transport == "local":
+        console.print("[red]--role front/worker needs a shared bus: set bus.transport to \"redis\"[/red]")
+        raise typer.Exit(1)
+    if role == "worker" and not shard and config.bus.shards > 1:
+        # Two workers on one shard would split a session's messages between processes
+        console.print(f"[red]--role worker needs --shard: run one worker per shard (0-{config.bus.shards - 1})[/red]")
+        raise typer.Exit(1)
+    
+    console.print(f"{__logo__} Starting nanobot gateway ({role}) on port {port}...")
+    
+    if workers > 1:
+        _run_with_workers(config, workers, verbose)
+        return
+    
+    bus = MessageBus.from_config(config.bus)
+    bridge = None
+    if role != "all":
+        transport = create_transport(config.bus, consumer=f"{role}-{os.getpid()}")
+        bridge = BusBridge(bus, transport, "front" if role == "front" else "worker", shards=shard or None)
+    
+    if role == "front":
+        _run_front(config, bus, bridge)
+    else:
+        _run_agent(config, bus, bridge)
+
+
+def _run_agent(config, bus, bridge) -> None:
+    """
+    Run the agent, plus the channels unless `bridge` connects it to a front
+    process as a worker.
+    """
+    from nanobot.config.loader import get_data_dir
+    from nanobot.agent.loop import AgentLoop
+    from nanobot.channels.manager import ChannelManager
+    from nanobot.cron.service import CronService
+    from nanobot.cron.types import CronJob
+    from nanobot.heartbeat.service import HeartbeatService
+    from nanobot.utils.extract import ExtractionPool
+    from nanobot.agent.tools.web import WebCache
+    from nanobot.providers.admission import Priority, request_priority
+    from nanobot.utils.http import HttpClientPool
+    
     provider = _make_provider(config)
-    session_manager = SessionManager(config.workspace_path)
+    session_manager = _make_session_manager(config)
+    http_pool = HttpClientPool.from_config(config.http)
+    web_extractor = ExtractionPool.from_config(config.tools.web.extract)
     
     # Create cron service first (callback set after agent creation)
+    # With several workers, only the one owning shard 0 runs scheduled jobs. The
+    # others still add jobs to the shared store, which that one re-reads.
+    schedule = bridge is None or 0 in bridge.shards
     cron_store_path = get_data_dir() / "cron" / "jobs.json"
-    cron = CronService(cron_store_path)
+    cron = CronService(cron_store_path, watch_interval=30 if bridge and schedule else None)
     
     # Create agent with cron service
     agent = AgentLoop(
@@ -206,22 +277,32 @@ def gateway(
         workspace=config.workspace_path,
         model=config.agents.defaults.model,
         max_iterations=config.agents.defaults.max_tool_iterations,
+        max_tokens=config.agents.defaults.max_tokens,
+        temperature=config.agents.defaults.temperature,
         brave_api_key=config.tools.web.search.api_key or None,
         exec_config=config.tools.exec,
         cron_service=cron,
         restrict_to_workspace=config.tools.restrict_to_workspace,
         session_manager=session_manager,
+        max_concurrent_sessions=config.agents.defaults.max_concurrent_sessions,
+        max_parallel_tools=config.agents.defaults.max_parallel_tools,
+        summary_model=config.agents.defaults.summary_model,
+        summary_threshold=config.agents.defaults.summary_threshold,
+        http_pool=http_pool,
+        web_cache=WebCache.from_config(config.tools.web.cache),
+        web_extractor=web_extractor,
     )
     
     # Set cron callback (needs agent)
     async def on_cron_job(job: CronJob) -> str | None:
         """Execute a cron job through the agent."""
-        response = await agent.process_direct(
-            job.payload.message,
-            session_key=f"cron:{job.id}",
-            channel=job.payload.channel or "cli",
-            chat_id=job.payload.to or "direct",
-        )
+        with request_priority(Priority.SCHEDULED):
+            response = await agent.process_direct(
+                job.payload.message,
+                session_key=f"cron:{job.id}",
+                channel=job.payload.channel or "cli",
+                chat_id=job.payload.to or "direct",
+            )
         if job.payload.deliver and job.payload.to:
             from nanobot.bus.events import OutboundMessage
             await bus.publish_outbound(OutboundMessage(
@@ -235,7 +316,8 @@ def gateway(
     # Create heartbeat service
     async def on_heartbeat(prompt: str) -> str:
         """Execute heartbeat through the agent."""
-        return await agent.process_direct(prompt, session_key="heartbeat")
+        with request_priority(Priority.SCHEDULED):
+            return await agent.process_direct(prompt, session_key="heartbeat")
     
     heartbeat = HeartbeatService(
         workspace=config.workspace_path,
@@ -244,38 +326,185 @@ def gateway(
         enabled=True
     )
     
-    # Create channel manager
-    channels = ChannelManager(config, bus, session_manager=session_manager)
-    
-    if channels.enabled_channels:
-        console.print(f"[green]✓[/green] Channels enabled: {', '.join(channels.enabled_channels)}")
+    # Create channel manager (workers leave the channels to the front process)
+    channels = None
+    if bridge is None:
+        channels = ChannelManager(config, bus, session_manager=session_manager, http_pool=http_pool)
+        if channels.enabled_channels:
+            console.print(f"[green]✓[/green] Channels enabled: {', '.join(channels.enabled_channels)}")
+        else:
+            console.print("[yellow]Warning: No channels enabled[/yellow]")
     else:
-        console.print("[yellow]Warning: No channels enabled[/yellow]")
+        console.print(f"[green]✓[/green] Worker for shards {bridge.shards} of {bridge.transport.shards}")
     
-    cron_status = cron.status()
-    if cron_status["jobs"] > 0:
-        console.print(f"[green]✓[/green] Cron: {cron_status['jobs']} scheduled jobs")
-    
-    console.print(f"[green]✓[/green] Heartbeat: every 30m")
+    if schedule:
+        cron_status = cron.status()
+        if cron_status["jobs"] > 0:
+            console.print(f"[green]✓[/green] Cron: {cron_status['jobs']} scheduled jobs")
+        console.print(f"[green]✓[/green] Heartbeat: every 30m")
     
     async def run():
         try:
-            await cron.start()
-            await heartbeat.start()
+            if schedule:
+                await cron.start()
+                await heartbeat.start()
             await asyncio.gather(
                 agent.run(),
-                channels.start_all(),
+                channels.start_all() if channels else bridge.run(),
             )
         except KeyboardInterrupt:
             console.print("\nShutting down...")
+        finally:
             heartbeat.stop()
             cron.stop()
             agent.stop()
+            if channels:
+                await channels.stop_all()
+            if bridge:
+                bridge.stop()
+                await bridge.transport.close()
+            await http_pool.aclose()
+            web_extractor.shutdown()
+            # Flush queued session appends and sidecar updates
+            session_manager.close()
+    
+    asyncio.run(run())
+
+
+def _run_front(config, bus, bridge, supervise=None) -> None:
+    """
+    Run the channels and forward their messages to agent workers over the bus
+    transport. `supervise`, if given, is a coroutine function run alongside
+    that ends the front by raising.
+    """
+    from nanobot.channels.manager import ChannelManager
+    from nanobot.utils.http import HttpClientPool
+    
+    http_pool = HttpClientPool.from_config(config.http)
+    # Sessions belong to the workers; channels send commands like /reset to them over the bus
+    channels = ChannelManager(config, bus, http_pool=http_pool)
+    if channels.enabled_channels:
+        console.print(f"[green]✓[/green] Channels enabled: {', '.join(channels.enabled_channels)}")
+    else:
+        console.print("[yellow]Warning: No channels enabled[/yellow]")
+    console.print(f"[green]✓[/green] Forwarding to {bridge.transport.shards} shard(s) via {type(bridge.transport).__name__}")
+    
+    async def run():
+        try:
+            await asyncio.gather(bridge.run(), channels.start_all(), *([supervise()] if supervise else []))
+        except KeyboardInterrupt:
+            console.print("\nShutting down...")
+        finally:
+            bridge.stop()
             await channels.stop_all()
+            await bridge.transport.close()
+            await http_pool.aclose()
     
     asyncio.run(run())
 
 
+def _run_with_workers(config, workers: int, verbose: bool) -> None:
+    """
+    Run the channels here and the agent in `workers` child processes.
+    
+    Sessions are sharded over the workers by consistent hash of the session
+    key, so each worker owns its sessions (and its own SessionManager and
+    caches) and a session's messages stay in order. Messages travel over
+    multiprocessing queues. Admission limits apply per worker.
+    """
+    import multiprocessing
+    from nanobot.bus.queue import MessageBus
+    from nanobot.bus.bridge import BusBridge
+    from nanobot.bus.transport import IpcTransport
+    
+    _make_provider(config)  # Fail on a missing API key here rather than in every worker
+    
+    ctx = multiprocessing.get_context("spawn")
+    transport = IpcTransport(shards=workers, context=ctx)
+    processes = [_start_worker(ctx, transport, shard, verbose) for shard in range(workers)]
+    console.print(f"[green]✓[/green] Started {workers} agent workers")
+    
+    async def supervise() -> None:
+        await _supervise_workers(ctx, transport, processes, verbose)
+    
+    bus = MessageBus.from_config(config.bus)
+    try:
+        _run_front(config, bus, BusBridge(bus, transport, "front"), supervise)
+    except KeyboardInterrupt:
+        pass
+    except RuntimeError as e:
+        console.print(f"[red]{e}[/red]")
+        raise typer.Exit(1)
+    finally:
+        for process in processes:
+            process.join(timeout=10)
+            if process.is_alive():
+                process.terminate()
+
+
+def _start_worker(ctx, transport, shard: int, verbose: bool):
+    process = ctx.Process(target=_gateway_worker, args=(transport, shard, verbose), name=f"nanobot-worker-{shard}")
+    process.start()
+    return process
+
+
+async def _supervise_workers(ctx, transport, processes: list, verbose: bool, min_uptime: float = 30.0) -> None:
+    """
+    Restart agent workers that crash, so their shard doesn't silently stall.
+    
+    Waits on the process sentinels in a thread with
+    `multiprocessing.connection.wait` (no polling, and it works on every
+    platform's event loop). A worker that exits cleanly (e.g. on Ctrl-C) is
+    not restarted; one that crashes again within `min_uptime` seconds of
+    starting stops the gateway with RuntimeError.
+    """
+    import multiprocessing
+    import time
+    from multiprocessing.connection import wait
+    from loguru import logger
+    
+    started = [time.monotonic()] * len(processes)
+    watching = set(range(len(processes)))
+    wake, waker = multiprocessing.Pipe(duplex=False)  # Frees the waiting thread when we're cancelled
+    try:
+        while True:
+            sentinels = {processes[shard].sentinel: shard for shard in watching}
+            ready = await asyncio.to_thread(wait, [*sentinels, wake])
+            for shard in sorted(sentinels[r] for r in ready if r in sentinels):
+                process = processes[shard]
+                process.join()
+                if process.exitcode == 0:
+                    watching.discard(shard)
+                    logger.warning(f"Agent worker {shard} exited; its sessions get no replies until the gateway restarts")
+                    continue
+                logger.error(f"Agent worker {shard} crashed (exit code {process.exitcode})")
+                if time.monotonic() - started[shard] < min_uptime:
+                    raise RuntimeError(f"Agent worker {shard} keeps crashing; stopping the gateway")
+                processes[shard] = _start_worker(ctx, transport, shard, verbose)
+                started[shard] = time.monotonic()
+                logger.warning(f"Restarted agent worker {shard}; messages it was handling are lost")
+    finally:
+        waker.send(None)
+
+
+def _gateway_worker(transport, shard: int, verbose: bool) -> None:
+    """Entry point of a `gateway --workers` child process."""
+    from nanobot.config.loader import load_config
+    from nanobot.bus.queue import MessageBus
+    from nanobot.bus.bridge import BusBridge
+    
+    if verbose:
+        import logging
+        logging.basicConfig(level=logging.DEBUG)
+    
+    config = load_config()
+    bus = MessageBus.from_config(config.bus)
+    try:
+        _run_agent(config, bus, BusBridge(bus, transport, "worker", shards=[shard]))
+    except KeyboardInterrupt:
+        pass
+
+
 
 
 # ============================================================================
@@ -292,10 +521,12 @@ def agent(
     from nanobot.config.loader import load_config
     from nanobot.bus.queue import MessageBus
     from nanobot.agent.loop import AgentLoop
+    from nanobot.utils.extract import ExtractionPool
+    from nanobot.agent.tools.web import WebCache
     
     config = load_config()
     
-    bus = MessageBus()
+    bus = MessageBus.from_config(config.bus)
     provider = _make_provider(config)
     
     agent_loop = AgentLoop(
@@ -303,8 +534,11 @@ def agent(
         provider=provider,
         workspace=config.workspace_path,
         brave_api_key=config.tools.web.search.api_key or None,
+        web_cache=WebCache.from_config(config.tools.web.cache),
+        web_extractor=ExtractionPool.from_config(config.tools.web.extract),
         exec_config=config.tools.exec,
         restrict_to_workspace=config.tools.restrict_to_workspace,
+        session_manager=_make_session_manager(config),
     )
     
     if message:
@@ -314,6 +548,7 @@ def agent(
             console.print(f"\n{__logo__} {response}")
         
         asyncio.run(run_once())
+        agent_loop.sessions.close()
     else:
         # Interactive mode
         console.print(f"{__logo__} Interactive mode (Ctrl+C to exit)\n")
@@ -332,6 +567,7 @@ def agent(
                     break
         
         asyncio.run(run_interactive())
+        agent_loop.sessions.close()
 
 
 # ============================================================================
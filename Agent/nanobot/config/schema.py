@@ -18,6 +18,7 @@ class TelegramConfig(BaseModel):
     token: str = ""  # Bot token from @BotFather
     allow_from: list[str] = Field(default_factory=list)  # Allowed user IDs or usernames
     proxy: str | None = None  # HTTP/SOCKS5 proxy URL, e.g. "http://127.0.0.1:7890" or "socks5://127.0.0.1:1080"
+    stream_interval: float = 1.0  # Seconds between edits of a reply as it streams in (0 = send only the final reply)
 
 
 class FeishuConfig(BaseModel):
@@ -37,6 +38,7 @@ class DiscordConfig(BaseModel):
     allow_from: list[str] = Field(default_factory=list)  # Allowed user IDs
     gateway_url: str = "wss://gateway.discord.gg/?v=10&encoding=json"
     intents: int = 37377  # GUILDS + GUILD_MESSAGES + DIRECT_MESSAGES + MESSAGE_CONTENT
+    stream_interval: float = 1.0  # Seconds between edits of a reply as it streams in (0 = send only the final reply)
 
 
 class ChannelsConfig(BaseModel):
@@ -54,6 +56,11 @@ class AgentDefaults(BaseModel):
     max_tokens: int = 8192
     temperature: float = 0.7
     max_tool_iterations: int = 20
+    max_concurrent_sessions: int = 4  # Sessions processed in parallel by the gateway
+    max_parallel_tools: int = 4  # Tool calls from one LLM turn run in parallel (1 = sequential)
+    summary_model: str | None = None  # Model for rolling history summaries (defaults to model)
+    summary_threshold: int = 16000  # Unsummarized history tokens before old turns are summarized (0 = off)
+    fallback_models: list[str] = Field(default_factory=list)  # Tried in order when the model keeps failing
 
 
 class AgentsConfig(BaseModel):
@@ -95,9 +102,27 @@ class WebSearchConfig(BaseModel):
     max_results: int = 5
 
 
+class WebCacheConfig(BaseModel):
+    """Cache for web_fetch / web_search results."""
+    enabled: bool = True
+    max_entries: int = 256  # In-memory LRU size
+    ttl: int = 300  # Seconds a fetched page is reused when it sends no Cache-Control max-age
+    search_ttl: int = 600  # Seconds a search result is reused
+    disk: bool = False  # Also persist entries under ~/.nanobot/cache/web
+    max_disk_entries: int = 2000
+
+
+class WebExtractConfig(BaseModel):
+    """Where web_fetch parses pages, off the event loop."""
+    executor: str = "thread"  # "thread" or "process"
+    max_workers: int = 2
+
+
 class WebToolsConfig(BaseModel):
     """Web tools configuration."""
     search: WebSearchConfig = Field(default_factory=WebSearchConfig)
+    cache: WebCacheConfig = Field(default_factory=WebCacheConfig)
+    extract: WebExtractConfig = Field(default_factory=WebExtractConfig)
 
 
 class ExecToolConfig(BaseModel):
@@ -112,6 +137,59 @@ class ToolsConfig(BaseModel):
     restrict_to_workspace: bool = False  # If true, restrict all tool access to workspace directory
 
 
+class HttpConfig(BaseModel):
+    """Shared HTTP client pool configuration."""
+    timeout: float = 30.0  # Default request timeout (seconds)
+    connect_timeout: float = 10.0
+    max_connections: int = 100
+    max_keepalive_connections: int = 20
+    keepalive_expiry: float = 30.0  # Seconds an idle connection is kept open
+    per_host_limit: int = 8  # Requests in flight per host
+    http2: bool = True  # Used when the h2 package is installed
+
+
+class ResilienceConfig(BaseModel):
+    """Retries and failover for LLM calls."""
+    max_retries: int = 2  # Retries per model for timeouts, 429 and 5xx, before falling back
+    base_delay: float = 0.5  # First backoff step (seconds), doubled per retry, with jitter
+    max_delay: float = 20.0  # Longest wait; a longer Retry-After falls back right away
+    timeout: float = 120.0  # Per-request timeout (seconds)
+    breaker_threshold: int = 5  # Consecutive failures before a model is skipped
+    breaker_reset: float = 30.0  # Seconds before a skipped model is tried again
+
+
+class ModelLimitsConfig(BaseModel):
+    """Admission limits for one model (0 = unlimited)."""
+    max_concurrent: int = 8  # LLM requests in flight
+    requests_per_minute: int = 0
+    tokens_per_minute: int = 0
+
+
+class AdmissionConfig(ModelLimitsConfig):
+    """Limits applied to every model before requests reach the provider."""
+    models: dict[str, ModelLimitsConfig] = Field(default_factory=dict)  # Per-model overrides, keyed by model name
+
+
+class BusConfig(BaseModel):
+    """Message bus queue limits and the transport between gateway processes."""
+    inbound_maxsize: int = 1000  # Pending channel messages (0 = unbounded)
+    outbound_maxsize: int = 1000  # Pending replies (0 = unbounded)
+    inbound_overflow: str = "block"  # When full: "block", "drop_oldest" or "reject" (the sender is told to retry)
+    outbound_overflow: str = "block"
+    transport: str = "local"  # "local" (one process) or "redis" (gateway --role front/worker)
+    redis_url: str = "redis://localhost:6379/0"
+    stream_prefix: str = "nanobot"  # Redis stream key prefix
+    shards: int = 1  # Inbound shards; sessions are spread over them by key, one worker per shard
+
+
+class SessionsConfig(BaseModel):
+    """Session storage configuration."""
+    backend: str = "jsonl"  # "jsonl" (one file per session) or "sqlite"
+    history_tail: int = 200  # Messages read from disk when a session is loaded (0 = whole transcript)
+    max_cached: int = 1000  # Sessions kept in memory (0 = unbounded)
+    idle_ttl: int = 3600  # Seconds before an idle session is dropped from memory (0 = never)
+
+
 class Config(BaseSettings):
     """Root configuration for nanobot."""
     agents: AgentsConfig = Field(default_factory=AgentsConfig)
@@ -119,6 +197,11 @@ class Config(BaseSettings):
     providers: ProvidersConfig = Field(default_factory=ProvidersConfig)
     gateway: GatewayConfig = Field(default_factory=GatewayConfig)
     tools: ToolsConfig = Field(default_factory=ToolsConfig)
+    sessions: SessionsConfig = Field(default_factory=SessionsConfig)
+    http: HttpConfig = Field(default_factory=HttpConfig)
+    resilience: ResilienceConfig = Field(default_factory=ResilienceConfig)
+    admission: AdmissionConfig = Field(default_factory=AdmissionConfig)
+    bus: BusConfig = Field(default_factory=BusConfig)
     
     @property
     def workspace_path(self) -> Path:
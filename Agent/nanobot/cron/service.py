@@ -2,10 +2,18 @@
 
 import asyncio
 import json
+import os
 import time
 import uuid
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Any, Callable, Coroutine
+from typing import Any, Callable, Coroutine, Iterator
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
 
 from loguru import logger
 
@@ -40,25 +48,64 @@ def _compute_next_run(schedule: CronSchedule, now_ms: int) -> int | None:
 
 
 class CronService:
-    """Service for managing and executing scheduled jobs."""
+    """
+    Service for managing and executing scheduled jobs.
+    
+    The store is re-read whenever the jobs file changes on disk, so several
+    processes can share it (e.g. `gateway --workers`, where only one of them
+    runs the scheduler). Every change is a load-mutate-save under a lock
+    file, and the jobs file is replaced atomically, so concurrent writers
+    don't lose each other's updates. Set `watch_interval` on the scheduling
+    instance to notice jobs added elsewhere while it has nothing due.
+    """
     
     def __init__(
         self,
         store_path: Path,
-        on_job: Callable[[CronJob], Coroutine[Any, Any, str | None]] | None = None
+        on_job: Callable[[CronJob], Coroutine[Any, Any, str | None]] | None = None,
+        watch_interval: float | None = None,
     ):
         self.store_path = store_path
         self.on_job = on_job  # Callback to execute job, returns response text
+        self.watch_interval = watch_interval
         self._store: CronStore | None = None
+        self._store_mtime: int | None = None
+        self._store_unreadable = False
         self._timer_task: asyncio.Task | None = None
         self._running = False
     
+    @contextmanager
+    def _locked(self) -> Iterator[None]:
+        """Hold the store's lock file, excluding other processes' changes."""
+        self.store_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.store_path.with_suffix(".lock"), "a+b") as f:
+            if fcntl:
+                fcntl.flock(f, fcntl.LOCK_EX)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+            try:
+                yield
+            finally:
+                if fcntl:
+                    fcntl.flock(f, fcntl.LOCK_UN)
+                else:
+                    f.seek(0)
+                    msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+    
+    def _file_mtime(self) -> int | None:
+        try:
+            return self.store_path.stat().st_mtime_ns
+        except OSError:
+            return None
+    
     def _load_store(self) -> CronStore:
-        """Load jobs from disk."""
-        if self._store:
+        """Load jobs from disk (again, if another process changed the file)."""
+        mtime = self._file_mtime()
+        if self._store and mtime == self._store_mtime:
             return self._store
         
-        if self.store_path.exists():
+        if mtime is not None:
             try:
                 data = json.loads(self.store_path.read_text())
                 jobs = []
@@ -92,18 +139,28 @@ class CronService:
                         delete_after_run=j.get("deleteAfterRun", False),
                     ))
                 self._store = CronStore(jobs=jobs)
+                self._store_unreadable = False
             except Exception as e:
+                # Keep what we had and retry next time; never save over a file we couldn't read
                 logger.warning(f"Failed to load cron store: {e}")
-                self._store = CronStore()
+                self._store_unreadable = True
+                if self._store is None:
+                    self._store = CronStore()
+                return self._store
         else:
             self._store = CronStore()
+            self._store_unreadable = False
         
+        self._store_mtime = mtime
         return self._store
     
     def _save_store(self) -> None:
-        """Save jobs to disk."""
+        """Save jobs to disk, replacing the file atomically. Call with the lock held."""
         if not self._store:
             return
+        if self._store_unreadable:
+            logger.warning(f"Cron store {self.store_path} is unreadable, not saving over it")
+            return
         
         self.store_path.parent.mkdir(parents=True, exist_ok=True)
         
@@ -142,14 +199,18 @@ class CronService:
             ]
         }
         
-        self.store_path.write_text(json.dumps(data, indent=2))
+        tmp = self.store_path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(data, indent=2))
+        os.replace(tmp, self.store_path)
+        self._store_mtime = self._file_mtime()
     
     async def start(self) -> None:
         """Start the cron service."""
         self._running = True
-        self._load_store()
-        self._recompute_next_runs()
-        self._save_store()
+        with self._locked():
+            self._load_store()
+            self._recompute_next_runs()
+            self._save_store()
         self._arm_timer()
         logger.info(f"Cron service started with {len(self._store.jobs if self._store else [])} jobs")
     
@@ -182,13 +243,18 @@ class CronService:
         if self._timer_task:
             self._timer_task.cancel()
         
+        if not self._running:
+            return
         next_wake = self._get_next_wake_ms()
-        if not next_wake or not self._running:
+        if next_wake:
+            delay_s = max(0, next_wake - _now_ms()) / 1000
+            if self.watch_interval:
+                delay_s = min(delay_s, self.watch_interval)
+        elif self.watch_interval:
+            delay_s = self.watch_interval  # Check the store for jobs added elsewhere
+        else:
             return
         
-        delay_ms = max(0, next_wake - _now_ms())
-        delay_s = delay_ms / 1000
-        
         async def tick():
             await asyncio.sleep(delay_s)
             if self._running:
@@ -198,8 +264,8 @@ class CronService:
     
     async def _on_timer(self) -> None:
         """Handle timer tick - run due jobs."""
-        if not self._store:
-            return
+        with self._locked():
+            self._load_store()
         
         now = _now_ms()
         due_jobs = [
@@ -210,11 +276,10 @@ class CronService:
         for job in due_jobs:
             await self._execute_job(job)
         
-        self._save_store()
         self._arm_timer()
     
     async def _execute_job(self, job: CronJob) -> None:
-        """Execute a single job."""
+        """Execute a single job, then record its run in the store."""
         start_ms = _now_ms()
         logger.info(f"Cron: executing job '{job.name}' ({job.id})")
         
@@ -232,19 +297,29 @@ class CronService:
             job.state.last_error = str(e)
             logger.error(f"Cron: job '{job.name}' failed: {e}")
         
-        job.state.last_run_at_ms = start_ms
-        job.updated_at_ms = _now_ms()
-        
-        # Handle one-shot jobs
-        if job.schedule.kind == "at":
-            if job.delete_after_run:
-                self._store.jobs = [j for j in self._store.jobs if j.id != job.id]
+        # The job ran without the lock: apply its outcome to the store as it is now
+        with self._locked():
+            current = next((j for j in self._load_store().jobs if j.id == job.id), None)
+            if current is None:
+                return  # Removed meanwhile
+            current.state.last_status = job.state.last_status
+            current.state.last_error = job.state.last_error
+            job = current
+            
+            job.state.last_run_at_ms = start_ms
+            job.updated_at_ms = _now_ms()
+            
+            # Handle one-shot jobs
+            if job.schedule.kind == "at":
+                if job.delete_after_run:
+                    self._store.jobs = [j for j in self._store.jobs if j.id != job.id]
+                else:
+                    job.enabled = False
+                    job.state.next_run_at_ms = None
             else:
-                job.enabled = False
-                job.state.next_run_at_ms = None
-        else:
-            # Compute next run
-            job.state.next_run_at_ms = _compute_next_run(job.schedule, _now_ms())
+                # Compute next run
+                job.state.next_run_at_ms = _compute_next_run(job.schedule, _now_ms())
+            self._save_store()
     
     # ========== Public API ==========
     
@@ -265,7 +340,6 @@ class CronService:
         delete_after_run: bool = False,
     ) -> CronJob:
         """Add a new job."""
-        store = self._load_store()
         now = _now_ms()
         
         job = CronJob(
@@ -286,8 +360,9 @@ class CronService:
             delete_after_run=delete_after_run,
         )
         
-        store.jobs.append(job)
-        self._save_store()
+        with self._locked():
+            self._load_store().jobs.append(job)
+            self._save_store()
         self._arm_timer()
         
         logger.info(f"Cron: added job '{name}' ({job.id})")
@@ -295,13 +370,15 @@ class CronService:
     
     def remove_job(self, job_id: str) -> bool:
         """Remove a job by ID."""
-        store = self._load_store()
-        before = len(store.jobs)
-        store.jobs = [j for j in store.jobs if j.id != job_id]
-        removed = len(store.jobs) < before
+        with self._locked():
+            store = self._load_store()
+            before = len(store.jobs)
+            store.jobs = [j for j in store.jobs if j.id != job_id]
+            removed = len(store.jobs) < before
+            if removed:
+                self._save_store()
         
         if removed:
-            self._save_store()
             self._arm_timer()
             logger.info(f"Cron: removed job {job_id}")
         
@@ -309,19 +386,19 @@ class CronService:
     
     def enable_job(self, job_id: str, enabled: bool = True) -> CronJob | None:
         """Enable or disable a job."""
-        store = self._load_store()
-        for job in store.jobs:
-            if job.id == job_id:
-                job.enabled = enabled
-                job.updated_at_ms = _now_ms()
-                if enabled:
-                    job.state.next_run_at_ms = _compute_next_run(job.schedule, _now_ms())
-                else:
-                    job.state.next_run_at_ms = None
-                self._save_store()
-                self._arm_timer()
-                return job
-        return None
+        with self._locked():
+            job = next((j for j in self._load_store().jobs if j.id == job_id), None)
+            if job is None:
+                return None
+            job.enabled = enabled
+            job.updated_at_ms = _now_ms()
+            if enabled:
+                job.state.next_run_at_ms = _compute_next_run(job.schedule, _now_ms())
+            else:
+                job.state.next_run_at_ms = None
+            self._save_store()
+        self._arm_timer()
+        return job
     
     async def run_job(self, job_id: str, force: bool = False) -> bool:
         """Manually run a job."""
@@ -331,7 +408,6 @@ class CronService:
                 if not force and not job.enabled:
                     return False
                 await self._execute_job(job)
-                self._save_store()
                 self._arm_timer()
                 return True
         return False
@@ -0,0 +1,233 @@
+"""Admission control for LLM requests: concurrency, rate limits and priorities."""
+
+import asyncio
+import heapq
+import itertools
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from enum import IntEnum
+from typing import TYPE_CHECKING, Any, Iterator
+
+if TYPE_CHECKING:
+    from nanobot.config.schema import AdmissionConfig
+
+
+class Priority(IntEnum):
+    """Who a request is for; lower values are admitted first."""
+
+    INTERACTIVE = 0  # A user waiting on a channel or the API
+    SCHEDULED = 1  # Cron jobs and heartbeats
+    BACKGROUND = 2  # Subagents and history summaries
+
+
+_priority: ContextVar[Priority] = ContextVar("llm_priority", default=Priority.INTERACTIVE)
+
+
+@contextmanager
+def request_priority(level: Priority) -> Iterator[None]:
+    """Run LLM calls made inside the block (and tasks it starts) at `level`."""
+    token = _priority.set(level)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+def set_request_priority(level: Priority) -> None:
+    """Set the priority for the rest of the current task."""
+    _priority.set(level)
+
+
+def estimate_tokens(messages: list[dict[str, Any]]) -> int:
+    """Cheap prompt size estimate (~4 characters per token); usage corrects it afterwards."""
+    return sum(len(str(m.get("content") or "")) // 4 + 4 for m in messages)
+
+
+class TokenBucket:
+    """A refilling budget of `per_minute` units, allowed to burst up to a minute's worth."""
+
+    def __init__(self, per_minute: float):
+        self.capacity = per_minute
+        self.rate = per_minute / 60
+        self.level = per_minute
+        self._updated = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.level = min(self.capacity, self.level + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def wait_time(self, amount: float) -> float:
+        """Seconds until `amount` can be taken (requests larger than the bucket need it full)."""
+        self._refill()
+        missing = min(amount, self.capacity) - self.level
+        return max(0.0, missing / self.rate)
+
+    def take(self, amount: float) -> None:
+        self._refill()
+        self.level -= amount
+
+    def give_back(self, amount: float) -> None:
+        """Correct an earlier estimate (negative to charge more)."""
+        self._refill()
+        self.level = min(self.capacity, self.level + amount)
+
+
+@dataclass
+class Limits:
+    """Admission limits for one model; 0 means unlimited."""
+
+    max_concurrent: int = 8
+    requests_per_minute: int = 0
+    tokens_per_minute: int = 0
+
+
+class Ticket:
+    """An admitted request. Release it when the call finishes."""
+
+    def __init__(self, lane: "_Lane", tokens: int):
+        self._lane = lane
+        self.tokens = tokens
+        self._released = False
+
+    def release(self, used_tokens: int | None = None) -> None:
+        """Free the slot and settle the token estimate against actual usage."""
+        if self._released:
+            return
+        self._released = True
+        self._lane.release(self, used_tokens)
+
+
+class _Lane:
+    """The queue and budgets for one model."""
+
+    def __init__(self, limits: Limits):
+        self.limits = limits
+        self.rpm = TokenBucket(limits.requests_per_minute) if limits.requests_per_minute else None
+        self.tpm = TokenBucket(limits.tokens_per_minute) if limits.tokens_per_minute else None
+        self.in_flight = 0
+        self.paused_until = 0.0
+        self._waiters: list[tuple[int, int, int, asyncio.Future[None]]] = []
+        self._order = itertools.count()
+        self._timer: asyncio.TimerHandle | None = None
+        self.admitted = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    async def acquire(self, priority: Priority, tokens: int) -> Ticket:
+        future: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._order), tokens, future))
+        started = time.monotonic()
+        self._pump()
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                self.release(Ticket(self, tokens), 0)  # Admitted just as we were cancelled
+            else:
+                self._waiters = [w for w in self._waiters if w[3] is not future]
+                heapq.heapify(self._waiters)
+            raise
+        waited = time.monotonic() - started
+        self.admitted += 1
+        self.wait_total += waited
+        self.wait_max = max(self.wait_max, waited)
+        return Ticket(self, tokens)
+
+    def release(self, ticket: Ticket, used_tokens: int | None) -> None:
+        self.in_flight -= 1
+        if self.tpm and used_tokens is not None:
+            self.tpm.give_back(ticket.tokens - used_tokens)
+        self._pump()
+
+    def pause(self, seconds: float) -> None:
+        """Hold back new requests, e.g. after the provider answered 429."""
+        self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+        self._pump()
+
+    def _pump(self) -> None:
+        """Admit waiters in priority order while slots and budgets allow."""
+        max_concurrent = self.limits.max_concurrent
+        while self._waiters and (not max_concurrent or self.in_flight < max_concurrent):
+            _, _, tokens, future = self._waiters[0]
+            if future.done():
+                heapq.heappop(self._waiters)
+                continue
+            wait = max(
+                self.paused_until - time.monotonic(),
+                self.rpm.wait_time(1) if self.rpm else 0.0,
+                self.tpm.wait_time(tokens) if self.tpm else 0.0,
+            )
+            if wait > 0:
+                self._schedule(wait)
+                return
+            heapq.heappop(self._waiters)
+            if self.rpm:
+                self.rpm.take(1)
+            if self.tpm:
+                self.tpm.take(tokens)
+            self.in_flight += 1
+            future.set_result(None)
+
+    def _schedule(self, delay: float) -> None:
+        if self._timer is not None and not self._timer.cancelled():
+            self._timer.cancel()
+        self._timer = asyncio.get_running_loop().call_later(delay, self._pump)
+
+    def stats(self) -> dict[str, Any]:
+        queued: dict[str, int] = {}
+        for priority, _, _, future in self._waiters:
+            if not future.done():
+                name = Priority(priority).name.lower()
+                queued[name] = queued.get(name, 0) + 1
+        return {
+            "in_flight": self.in_flight,
+            "queued": sum(queued.values()),
+            "queued_by_priority": queued,
+            "admitted": self.admitted,
+            "avg_wait": round(self.wait_total / self.admitted, 4) if self.admitted else 0.0,
+            "max_wait": round(self.wait_max, 4),
+        }
+
+
+class AdmissionController:
+    """
+    Gates LLM requests per model before they reach the provider.
+
+    Each model gets a lane with a concurrency limit and optional
+    requests/min and tokens/min token buckets. Token use is charged from a
+    prompt estimate and settled against the response's usage. Waiting
+    requests are admitted by priority (see `Priority` and
+    `request_priority`), then in arrival order.
+    """
+
+    def __init__(self, default: Limits | None = None, models: dict[str, Limits] | None = None):
+        self.default = default or Limits()
+        self.models = models or {}
+        self._lanes: dict[str, _Lane] = {}
+
+    @classmethod
+    def from_config(cls, config: "AdmissionConfig") -> "AdmissionController":
+        """Create a controller from the `admission` config section."""
+        def limits(c: Any) -> Limits:
+            return Limits(c.max_concurrent, c.requests_per_minute, c.tokens_per_minute)
+        return cls(limits(config), {model: limits(c) for model, c in config.models.items()})
+
+    def _lane(self, model: str) -> _Lane:
+        if model not in self._lanes:
+            self._lanes[model] = _Lane(self.models.get(model, self.default))
+        return self._lanes[model]
+
+    async def acquire(self, model: str, tokens: int = 0) -> Ticket:
+        """Wait for a slot on a model's lane at the current task's priority."""
+        return await self._lane(model).acquire(_priority.get(), tokens)
+
+    def pause(self, model: str, seconds: float) -> None:
+        """Stop admitting requests for a model for a while."""
+        self._lane(model).pause(seconds)
+
+    def stats(self) -> dict[str, Any]:
+        """Queue depth, in-flight requests and wait times per model."""
+        return {model: lane.stats() for model, lane in self._lanes.items()}
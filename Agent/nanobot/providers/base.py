@@ -2,7 +2,7 @@
 
 from abc import ABC, abstractmethod
 from dataclasses import dataclass, field
-from typing import Any
+from typing import Any, AsyncIterator, Awaitable, Callable
 
 
 @dataclass
@@ -27,6 +27,19 @@ class LLMResponse:
         return len(self.tool_calls) > 0
 
 
+@dataclass
+class StreamEvent:
+    """
+    One event from a streaming chat completion.
+    
+    Exactly one field is set: a content delta, a tool call whose arguments
+    have been fully received, or (last) the complete response with usage.
+    """
+    delta: str | None = None
+    tool_call: ToolCallRequest | None = None
+    response: LLMResponse | None = None
+
+
 class LLMProvider(ABC):
     """
     Abstract base class for LLM providers.
@@ -38,6 +51,7 @@ class LLMProvider(ABC):
     def __init__(self, api_key: str | None = None, api_base: str | None = None):
         self.api_key = api_key
         self.api_base = api_base
+        self._usage_totals: dict[str, int] = {}
     
     @abstractmethod
     async def chat(
@@ -47,6 +61,7 @@ class LLMProvider(ABC):
         model: str | None = None,
         max_tokens: int = 4096,
         temperature: float = 0.7,
+        on_delta: Callable[[str], Awaitable[None]] | None = None,
     ) -> LLMResponse:
         """
         Send a chat completion request.
@@ -57,13 +72,55 @@ class LLMProvider(ABC):
             model: Model identifier (provider-specific).
             max_tokens: Maximum tokens in response.
             temperature: Sampling temperature.
+            on_delta: Optional callback receiving content deltas as they stream in.
         
         Returns:
             LLMResponse with content and/or tool calls.
         """
         pass
     
+    async def chat_stream(
+        self,
+        messages: list[dict[str, Any]],
+        tools: list[dict[str, Any]] | None = None,
+        model: str | None = None,
+        max_tokens: int = 4096,
+        temperature: float = 0.7,
+    ) -> AsyncIterator[StreamEvent]:
+        """
+        Stream a chat completion.
+        
+        Yields content deltas as they arrive, each tool call once its
+        arguments are complete, and finally the full `LLMResponse`. Errors are
+        reported like `chat` does, as a final response with finish_reason "error".
+        
+        Providers without native streaming fall back to a single `chat` call.
+        """
+        response = await self.chat(messages, tools, model, max_tokens, temperature)
+        if response.content and response.finish_reason != "error":
+            yield StreamEvent(delta=response.content)
+        for call in response.tool_calls:
+            yield StreamEvent(tool_call=call)
+        yield StreamEvent(response=response)
+    
     @abstractmethod
     def get_default_model(self) -> str:
         """Get the default model for this provider."""
         pass
+    
+    def record_usage(self, usage: dict[str, int]) -> None:
+        """Add one response's token usage to the running totals."""
+        self._usage_totals["requests"] = self._usage_totals.get("requests", 0) + 1
+        for name, count in usage.items():
+            self._usage_totals[name] = self._usage_totals.get(name, 0) + (count or 0)
+    
+    def usage_stats(self) -> dict[str, Any]:
+        """Get token usage totals, including the prompt cache hit rate."""
+        stats: dict[str, Any] = dict(self._usage_totals)
+        prompt = stats.get("prompt_tokens", 0)
+        stats["cache_hit_rate"] = round(stats.get("cached_tokens", 0) / prompt, 4) if prompt else 0.0
+        return stats
+    
+    def get_context_window(self, model: str | None = None) -> int | None:
+        """Get the model's input context size in tokens, or None if unknown."""
+        return None
@@ -1,14 +1,21 @@
 """LiteLLM provider implementation for multi-provider support."""
 
+import asyncio
 import json
 import os
-from typing import Any
+from contextlib import aclosing
+from typing import Any, AsyncIterator, Awaitable, Callable, TypeVar
 
 import litellm
 from litellm import acompletion
+from loguru import logger
 
-from nanobot.providers.base import LLMProvider, LLMResponse, ToolCallRequest
-from nanobot.providers.registry import find_by_model, find_gateway
+from nanobot.providers.admission import AdmissionController, Ticket, estimate_tokens
+from nanobot.providers.base import LLMProvider, LLMResponse, StreamEvent, ToolCallRequest
+from nanobot.providers.registry import ProviderSpec, find_by_model, find_gateway
+from nanobot.providers.resilience import CircuitBreaker, ModelRoute, RetryPolicy, is_retryable, retry_after
+
+T = TypeVar("T")
 
 
 class LiteLLMProvider(LLMProvider):
@@ -18,6 +25,11 @@ class LiteLLMProvider(LLMProvider):
     Supports OpenRouter, Anthropic, OpenAI, Gemini, and many other providers through
     a unified interface.  Provider-specific logic is driven by the registry
     (see providers/registry.py) — no if-elif chains needed here.
+    
+    Transient failures (timeouts, 429, 5xx) are retried with backoff, then
+    the `fallbacks` routes are tried in order. A circuit breaker per route
+    skips models that keep failing. Requests pass an `AdmissionController`
+    first, which bounds concurrency and rate per model.
     """
     
     def __init__(
@@ -26,10 +38,18 @@ class LiteLLMProvider(LLMProvider):
         api_base: str | None = None,
         default_model: str = "anthropic/claude-opus-4-5",
         extra_headers: dict[str, str] | None = None,
+        fallbacks: list[ModelRoute] | None = None,
+        retry: RetryPolicy | None = None,
+        admission: AdmissionController | None = None,
     ):
         super().__init__(api_key, api_base)
         self.default_model = default_model
         self.extra_headers = extra_headers or {}
+        self.fallbacks = fallbacks or []
+        self.retry = retry or RetryPolicy()
+        self.admission = admission or AdmissionController()
+        self._context_windows: dict[str, int | None] = {}
+        self._breakers: dict[str, CircuitBreaker] = {}
         
         # Detect gateway / local deployment from api_key and api_base
         self._gateway = find_gateway(api_key, api_base)
@@ -69,12 +89,13 @@ class LiteLLMProvider(LLMProvider):
                 resolved = resolved.replace("{api_base}", effective_base)
                 os.environ.setdefault(env_name, resolved)
     
-    def _resolve_model(self, model: str) -> str:
+    def _resolve_model(self, model: str, route: ModelRoute | None = None) -> str:
         """Resolve model name by applying provider/gateway prefixes."""
-        if self._gateway:
+        gateway = self._route_gateway(route)
+        if gateway:
             # Gateway mode: apply gateway prefix, skip provider-specific prefixes
-            prefix = self._gateway.litellm_prefix
-            if self._gateway.strip_model_prefix:
+            prefix = gateway.litellm_prefix
+            if gateway.strip_model_prefix:
                 model = model.split("/")[-1]
             if prefix and not model.startswith(f"{prefix}/"):
                 model = f"{prefix}/{model}"
@@ -88,6 +109,40 @@ class LiteLLMProvider(LLMProvider):
         
         return model
     
+    def _route_gateway(self, route: ModelRoute | None) -> ProviderSpec | None:
+        """The gateway a route goes through (the primary provider's if no route is given)."""
+        return route.gateway if route else self._gateway
+    
+    def _supports_prompt_caching(self, model: str, route: ModelRoute | None = None) -> bool:
+        """Check whether the model (and gateway, if any) accepts cache_control breakpoints."""
+        gateway = self._route_gateway(route)
+        if gateway and not gateway.supports_prompt_caching:
+            return False
+        spec = find_by_model(model)
+        return bool(spec and spec.supports_prompt_caching)
+    
+    @staticmethod
+    def _apply_cache_hints(kwargs: dict[str, Any]) -> None:
+        """
+        Add cache_control breakpoints after the tool definitions and the
+        system prompt. Copies are made so the caller's messages stay untouched.
+        """
+        cache_control = {"type": "ephemeral"}
+        
+        tools = kwargs.get("tools")
+        if tools:
+            kwargs["tools"] = tools[:-1] + [{**tools[-1], "cache_control": cache_control}]
+        
+        messages = list(kwargs["messages"])
+        for i, msg in enumerate(messages):
+            if msg["role"] == "system" and isinstance(msg["content"], str):
+                messages[i] = {
+                    **msg,
+                    "content": [{"type": "text", "text": msg["content"], "cache_control": cache_control}],
+                }
+                break
+        kwargs["messages"] = messages
+    
     def _apply_model_overrides(self, model: str, kwargs: dict[str, Any]) -> None:
         """Apply model-specific parameter overrides from the registry."""
         model_lower = model.lower()
@@ -98,6 +153,120 @@ class LiteLLMProvider(LLMProvider):
                     kwargs.update(overrides)
                     return
     
+    def _build_kwargs(
+        self,
+        messages: list[dict[str, Any]],
+        tools: list[dict[str, Any]] | None,
+        route: ModelRoute,
+        max_tokens: int,
+        temperature: float,
+    ) -> dict[str, Any]:
+        """Build the LiteLLM completion arguments for a request on one route."""
+        model = self._resolve_model(route.model, route)
+        
+        kwargs: dict[str, Any] = {
+            "model": model,
+            "messages": messages,
+            "max_tokens": max_tokens,
+            "temperature": temperature,
+            "timeout": self.retry.timeout,
+        }
+        
+        # Apply model-specific overrides (e.g. kimi-k2.5 temperature)
+        self._apply_model_overrides(model, kwargs)
+        
+        # Pass api_base (custom endpoints, vLLM...), extra headers (e.g. APP-Code
+        # for AiHubMix) and, for fallback providers, their API key
+        kwargs.update(route.kwargs())
+        
+        if tools:
+            kwargs["tools"] = tools
+            kwargs["tool_choice"] = "auto"
+        
+        # Mark the stable prefix (tools + system prompt) as cacheable
+        if self._supports_prompt_caching(model, route):
+            self._apply_cache_hints(kwargs)
+        
+        return kwargs
+    
+    def _routes(self, model: str | None) -> list[ModelRoute]:
+        """The requested model on the primary provider, then the fallbacks."""
+        primary = ModelRoute(
+            model=model or self.default_model,
+            api_base=self.api_base,
+            extra_headers=self.extra_headers,
+        )
+        primary.gateway = self._gateway
+        return [primary] + [r for r in self.fallbacks if r.key != primary.key]
+    
+    async def _with_failover(
+        self,
+        messages: list[dict[str, Any]],
+        tools: list[dict[str, Any]] | None,
+        model: str | None,
+        max_tokens: int,
+        temperature: float,
+        call: Callable[[dict[str, Any]], Awaitable[T]],
+        stream: bool = False,
+    ) -> tuple[T, Ticket]:
+        """
+        Run `call` with retries on each route in turn.
+        
+        Transient errors are retried with backoff (honouring Retry-After) up
+        to `retry.max_retries` times before moving to the next route; other
+        errors move on immediately. Routes with an open circuit are skipped.
+        Every attempt waits for admission on its model first.
+        
+        Returns:
+            The result, and the admission ticket the caller must release
+            (with the tokens used) once the response is consumed.
+        
+        Raises:
+            The last error if every route failed.
+        """
+        error: BaseException | None = None
+        tokens = estimate_tokens(messages)
+        for route in self._routes(model):
+            breaker = self._breakers.setdefault(
+                route.key, CircuitBreaker(self.retry.breaker_threshold, self.retry.breaker_reset)
+            )
+            if not breaker.allow():
+                logger.debug(f"Skipping {route.model}: circuit open")
+                continue
+            
+            kwargs = self._build_kwargs(messages, tools, route, max_tokens, temperature)
+            if stream:
+                kwargs["stream"] = True
+                kwargs["stream_options"] = {"include_usage": True}
+            
+            for attempt in range(self.retry.max_retries + 1):
+                ticket = await self.admission.acquire(route.model, tokens)
+                try:
+                    result = await asyncio.wait_for(call(kwargs), timeout=self.retry.timeout)
+                except BaseException as e:
+                    ticket.release(0)
+                    if not isinstance(e, Exception):
+                        raise  # Cancelled
+                    error = e
+                    if (wait := retry_after(e)) and getattr(e, "status_code", None) == 429:
+                        # Hold back everyone else queued for this model too
+                        self.admission.pause(route.model, wait)
+                    if not is_retryable(e):
+                        breaker.record_success()  # The model answered; the request was bad
+                        break
+                    breaker.record_failure()
+                    delay = self.retry.delay(attempt, e)
+                    if attempt == self.retry.max_retries or delay is None or not breaker.allow():
+                        break
+                    logger.warning(f"LLM call to {route.model} failed ({e}), retrying in {delay:.1f}s")
+                    await asyncio.sleep(delay)
+                else:
+                    breaker.record_success()
+                    return result, ticket
+            logger.warning(f"Giving up on {route.model}: {error}")
+        
+        raise error or RuntimeError("No model available: all circuits are open")
+    
     async def chat(
         self,
         messages: list[dict[str, Any]],
@@ -105,6 +274,7 @@ class LiteLLMProvider(LLMProvider):
         model: str | None = None,
         max_tokens: int = 4096,
         temperature: float = 0.7,
+        on_delta: Callable[[str], Awaitable[None]] | None = None,
     ) -> LLMResponse:
         """
         Send a chat completion request via LiteLLM.
@@ -115,43 +285,163 @@ class LiteLLMProvider(LLMProvider):
             model: Model identifier (e.g., 'anthropic/claude-sonnet-4-5').
             max_tokens: Maximum tokens in response.
             temperature: Sampling temperature.
+            on_delta: Optional callback for content deltas. When set, the request
+                is streamed through `chat_stream`.
         
         Returns:
-            LLMResponse with content and/or tool calls.
+            LLMResponse with content and/or tool calls. If every attempt
+            failed, finish_reason is "error" and content describes the error.
         """
-        model = self._resolve_model(model or self.default_model)
+        if on_delta:
+            # Closed on early return, so the stream's connection is released right away
+            async with aclosing(self.chat_stream(messages, tools, model, max_tokens, temperature)) as events:
+                async for event in events:
+                    if event.delta:
+                        await on_delta(event.delta)
+                    elif event.response:
+                        return event.response
         
-        kwargs: dict[str, Any] = {
-            "model": model,
-            "messages": messages,
-            "max_tokens": max_tokens,
-            "temperature": temperature,
-        }
-        
-        # Apply model-specific overrides (e.g. kimi-k2.5 temperature)
-        self._apply_model_overrides(model, kwargs)
+        try:
+            response, ticket = await self._with_failover(
+                messages, tools, model, max_tokens, temperature, lambda kwargs: acompletion(**kwargs)
+            )
+            parsed = self._parse_response(response)
+            ticket.release(parsed.usage.get("total_tokens"))
+            return parsed
+        except Exception as e:
+            # Return error as content for graceful handling
+            return LLMResponse(
+                content=f"Error calling LLM: {str(e)}",
+                finish_reason="error",
+            )
+    
+    @staticmethod
+    async def _open_stream(kwargs: dict[str, Any]) -> tuple[Any, AsyncIterator[Any]]:
+        """Start a stream and wait for its first chunk, so early failures can be retried."""
+        chunks = (await acompletion(**kwargs)).__aiter__()
+        try:
+            first = await chunks.__anext__()
+        except StopAsyncIteration:
+            first = None
+        return first, chunks
+    
+    async def chat_stream(
+        self,
+        messages: list[dict[str, Any]],
+        tools: list[dict[str, Any]] | None = None,
+        model: str | None = None,
+        max_tokens: int = 4096,
+        temperature: float = 0.7,
+    ) -> AsyncIterator[StreamEvent]:
+        """
+        Stream a chat completion via LiteLLM.
         
-        # Pass api_base directly for custom endpoints (vLLM, etc.)
-        if self.api_base:
-            kwargs["api_base"] = self.api_base
+        Content deltas are yielded as they arrive. Tool call fragments are
+        assembled per index (or per call id, for providers that omit the
+        index), and each call is yielded as soon as the next one starts (or
+        the stream ends), so it can be dispatched early.
         
-        # Pass extra headers (e.g. APP-Code for AiHubMix)
-        if self.extra_headers:
-            kwargs["extra_headers"] = self.extra_headers
+        Failures before the first chunk are retried and fail over like `chat`;
+        a stream that breaks midway ends with an error response.
+        """
+        content: list[str] = []
+        calls: dict[int, dict[str, Any]] = {}  # index -> {"id", "name", "arguments": [fragments]}
+        call_ids: dict[str, int] = {}  # id -> index
+        finished: set[int] = set()
+        finish_reason = "stop"
+        usage = None
         
-        if tools:
-            kwargs["tools"] = tools
-            kwargs["tool_choice"] = "auto"
+        async def all_chunks(first: Any, rest: AsyncIterator[Any]) -> AsyncIterator[Any]:
+            if first is not None:
+                yield first
+            async for chunk in rest:
+                yield chunk
         
+        ticket: Ticket | None = None
+        rest: AsyncIterator[Any] | None = None
         try:
-            response = await acompletion(**kwargs)
-            return self._parse_response(response)
+            (first, rest), ticket = await self._with_failover(
+                messages, tools, model, max_tokens, temperature, self._open_stream, stream=True
+            )
+            async for chunk in all_chunks(first, rest):
+                if getattr(chunk, "usage", None):
+                    usage = chunk.usage
+                if not chunk.choices:
+                    continue
+                choice = chunk.choices[0]
+                delta = choice.delta
+                if choice.finish_reason:
+                    finish_reason = choice.finish_reason
+                
+                if text := getattr(delta, "content", None):
+                    content.append(text)
+                    yield StreamEvent(delta=text)
+                
+                for tc in getattr(delta, "tool_calls", None) or []:
+                    index = getattr(tc, "index", None)
+                    if index is None:
+                        # No index: match the call by id, else continue the latest call
+                        if tc.id:
+                            index = call_ids.get(tc.id, max(calls, default=-1) + 1)
+                        else:
+                            index = max(calls, default=0)
+                    if index not in calls:
+                        # A new call starts: the previous ones are complete
+                        for done in sorted(set(calls) - finished):
+                            finished.add(done)
+                            yield StreamEvent(tool_call=self._build_tool_call(calls[done]))
+                        calls[index] = {"id": None, "name": "", "arguments": []}
+                    call = calls[index]
+                    if tc.id and not call["id"]:
+                        call["id"] = tc.id
+                        call_ids[tc.id] = index
+                    if tc.function:
+                        name = tc.function.name or ""
+                        if name.startswith(call["name"]):
+                            call["name"] = name  # The full name (some providers repeat it in every chunk)
+                        else:
+                            call["name"] += name
+                        call["arguments"].append(tc.function.arguments or "")
         except Exception as e:
-            # Return error as content for graceful handling
-            return LLMResponse(
+            yield StreamEvent(response=LLMResponse(
                 content=f"Error calling LLM: {str(e)}",
                 finish_reason="error",
-            )
+            ))
+            return
+        finally:
+            if ticket:
+                ticket.release(getattr(usage, "total_tokens", None))
+            if rest is not None and hasattr(rest, "aclose"):
+                await rest.aclose()  # Releases the connection when we stop early
+        
+        for done in sorted(set(calls) - finished):
+            yield StreamEvent(tool_call=self._build_tool_call(calls[done]))
+        
+        yield StreamEvent(response=LLMResponse(
+            content="".join(content) or None,
+            tool_calls=[self._build_tool_call(calls[i]) for i in sorted(calls)],
+            finish_reason=finish_reason,
+            usage=self._parse_usage(usage),
+        ))
+    
+    @staticmethod
+    def _build_tool_call(call: dict[str, Any]) -> ToolCallRequest:
+        """Build a tool call from streamed fragments."""
+        return ToolCallRequest(
+            id=call["id"] or "",
+            name=call["name"],
+            arguments=LiteLLMProvider._parse_arguments("".join(call["arguments"])),
+        )
+    
+    @staticmethod
+    def _parse_arguments(args: Any) -> dict[str, Any]:
+        """Parse tool call arguments from a JSON string if needed."""
+        if isinstance(args, str):
+            try:
+                return json.loads(args) if args.strip() else {}
+            except json.JSONDecodeError:
+                return {"raw": args}
+        return args
     
     def _parse_response(self, response: Any) -> LLMResponse:
         """Parse LiteLLM response into our standard format."""
@@ -161,35 +451,56 @@ class LiteLLMProvider(LLMProvider):
         tool_calls = []
         if hasattr(message, "tool_calls") and message.tool_calls:
             for tc in message.tool_calls:
-                # Parse arguments from JSON string if needed
-                args = tc.function.arguments
-                if isinstance(args, str):
-                    try:
-                        args = json.loads(args)
-                    except json.JSONDecodeError:
-                        args = {"raw": args}
-                
                 tool_calls.append(ToolCallRequest(
                     id=tc.id,
                     name=tc.function.name,
-                    arguments=args,
+                    arguments=self._parse_arguments(tc.function.arguments),
                 ))
         
-        usage = {}
-        if hasattr(response, "usage") and response.usage:
-            usage = {
-                "prompt_tokens": response.usage.prompt_tokens,
-                "completion_tokens": response.usage.completion_tokens,
-                "total_tokens": response.usage.total_tokens,
-            }
-        
         return LLMResponse(
             content=message.content,
             tool_calls=tool_calls,
             finish_reason=choice.finish_reason or "stop",
-            usage=usage,
+            usage=self._parse_usage(getattr(response, "usage", None)),
         )
     
+    def _parse_usage(self, usage: Any) -> dict[str, int]:
+        """Convert LiteLLM usage to a dict and add it to the running totals."""
+        if not usage:
+            return {}
+        parsed = {
+            "prompt_tokens": usage.prompt_tokens,
+            "completion_tokens": usage.completion_tokens,
+            "total_tokens": usage.total_tokens,
+            **self._parse_cache_usage(usage),
+        }
+        self.record_usage(parsed)
+        if parsed["cached_tokens"] or parsed["cache_creation_tokens"]:
+            logger.debug(
+                f"Prompt cache: {parsed['cached_tokens']}/{parsed['prompt_tokens']} prompt tokens read, "
+                f"{parsed['cache_creation_tokens']} written"
+            )
+        return parsed
+    
+    @staticmethod
+    def _parse_cache_usage(usage: Any) -> dict[str, int]:
+        """Extract prompt cache reads/writes (OpenAI-style details or Anthropic fields)."""
+        details = getattr(usage, "prompt_tokens_details", None)
+        cached = getattr(details, "cached_tokens", None) or getattr(usage, "cache_read_input_tokens", None)
+        created = getattr(usage, "cache_creation_input_tokens", None)
+        return {"cached_tokens": cached or 0, "cache_creation_tokens": created or 0}
+    
     def get_default_model(self) -> str:
         """Get the default model."""
         return self.default_model
+    
+    def get_context_window(self, model: str | None = None) -> int | None:
+        """Look up the model's input context size in LiteLLM's model map."""
+        model = self._resolve_model(model or self.default_model)
+        if model not in self._context_windows:
+            try:
+                info = litellm.get_model_info(model)
+                self._context_windows[model] = info.get("max_input_tokens") or info.get("max_tokens")
+            except Exception:
+                self._context_windows[model] = None
+        return self._context_windows[model]
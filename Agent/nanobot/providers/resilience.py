@@ -0,0 +1,167 @@
+"""Retries, circuit breaking and fallback routes for LLM calls."""
+
+import asyncio
+import random
+import time
+from dataclasses import dataclass, field
+from email.utils import parsedate_to_datetime
+from typing import TYPE_CHECKING, Any
+
+from nanobot.providers.registry import ProviderSpec, find_gateway
+
+if TYPE_CHECKING:
+    from nanobot.config.schema import Config, ResilienceConfig
+
+# HTTP statuses worth retrying: timeouts, conflicts, rate limits, server errors, overload
+RETRYABLE_STATUS = {408, 409, 425, 429, 500, 502, 503, 504, 529}
+
+
+def is_retryable(exc: BaseException) -> bool:
+    """Check whether an LLM call error is transient."""
+    if isinstance(exc, (asyncio.TimeoutError, TimeoutError, ConnectionError)):
+        return True
+    return getattr(exc, "status_code", None) in RETRYABLE_STATUS
+
+
+def retry_after(exc: BaseException) -> float | None:
+    """Seconds the server asked us to wait (Retry-After / retry-after-ms), if any."""
+    response = getattr(exc, "response", None)
+    headers = getattr(response, "headers", None) or getattr(exc, "litellm_response_headers", None) or {}
+    try:
+        if value := headers.get("retry-after-ms"):
+            return float(value) / 1000
+        if value := headers.get("retry-after"):
+            try:
+                return float(value)
+            except ValueError:
+                return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError, AttributeError):
+        pass
+    return None
+
+
+@dataclass
+class RetryPolicy:
+    """How LLM calls are timed out, retried and circuit-broken."""
+
+    max_retries: int = 2  # Retries per model before falling back to the next
+    base_delay: float = 0.5  # First backoff step (seconds); doubles per retry
+    max_delay: float = 20.0  # Longest wait; a longer Retry-After moves on to the next model
+    timeout: float = 120.0  # Per-request timeout (seconds)
+    breaker_threshold: int = 5  # Consecutive failures that open a model's circuit
+    breaker_reset: float = 30.0  # Seconds before an open circuit lets a probe through
+
+    @classmethod
+    def from_config(cls, config: "ResilienceConfig") -> "RetryPolicy":
+        """Create a policy from the `resilience` config section."""
+        return cls(
+            max_retries=config.max_retries,
+            base_delay=config.base_delay,
+            max_delay=config.max_delay,
+            timeout=config.timeout,
+            breaker_threshold=config.breaker_threshold,
+            breaker_reset=config.breaker_reset,
+        )
+
+    def delay(self, attempt: int, exc: BaseException) -> float | None:
+        """
+        Seconds to wait before retry number `attempt` (0-based), or None if
+        the server asked for a longer pause than `max_delay`.
+
+        Uses exponential backoff with full jitter, but never less than the
+        server's Retry-After.
+        """
+        backoff = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+        requested = retry_after(exc)
+        if requested is None:
+            return backoff
+        if requested > self.max_delay:
+            return None
+        return max(backoff, requested)
+
+
+class CircuitBreaker:
+    """
+    Stops sending requests to a model that keeps failing.
+
+    After `threshold` consecutive failures the circuit opens and calls are
+    refused; after `reset_timeout` seconds one probe request is let through
+    (half-open), and its outcome closes or re-opens the circuit.
+    """
+
+    def __init__(self, threshold: int = 5, reset_timeout: float = 30.0):
+        self.threshold = threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: float | None = None
+        self._probing = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if self._probing or time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half_open"
+        return "open"
+
+    def allow(self) -> bool:
+        """Check whether a request may be sent now."""
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "half_open" and not self._probing:
+            self._probing = True
+            return True
+        return False
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self.opened_at = None
+        self._probing = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self._probing or self.failures >= self.threshold:
+            self.opened_at = time.monotonic()
+            self._probing = False
+
+
+@dataclass
+class ModelRoute:
+    """A model plus the credentials to reach it; fallbacks are tried in order."""
+
+    model: str
+    api_key: str | None = None  # None: use the environment set up for the primary provider
+    api_base: str | None = None
+    extra_headers: dict[str, str] = field(default_factory=dict)
+    gateway: ProviderSpec | None = field(init=False, default=None)
+
+    def __post_init__(self) -> None:
+        if self.api_key or self.api_base:
+            self.gateway = find_gateway(self.api_key, self.api_base)
+
+    @classmethod
+    def from_config(cls, config: "Config", model: str) -> "ModelRoute":
+        """Build a route for a model from the matching `providers` entry."""
+        p = config.get_provider(model)
+        return cls(
+            model=model,
+            api_key=p.api_key if p else None,
+            api_base=config.get_api_base(model),
+            extra_headers=dict(p.extra_headers or {}) if p else {},
+        )
+
+    @property
+    def key(self) -> str:
+        return f"{self.model}@{self.api_base or ''}"
+
+    def kwargs(self) -> dict[str, Any]:
+        """Per-request credentials for LiteLLM."""
+        kwargs: dict[str, Any] = {}
+        if self.api_key:
+            kwargs["api_key"] = self.api_key
+        if self.api_base:
+            kwargs["api_base"] = self.api_base
+        if self.extra_headers:
+            kwargs["extra_headers"] = self.extra_headers
+        return kwargs
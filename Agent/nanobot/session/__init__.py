@@ -1,5 +1,6 @@
 """Session management module."""
 
 from nanobot.session.manager import SessionManager, Session
+from nanobot.session.store import SessionStore, JsonlSessionStore, SqliteSessionStore
 
-__all__ = ["SessionManager", "Session"]
+__all__ = ["SessionManager", "Session", "SessionStore", "JsonlSessionStore", "SqliteSessionStore"]
@@ -1,14 +1,21 @@
 """Session management for conversation history."""
 
-import json
+import asyncio
+import time
+import weakref
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
 from dataclasses import dataclass, field
 from datetime import datetime
-from typing import Any
+from functools import partial
+from typing import Any, Callable
 
 from loguru import logger
 
-from nanobot.utils.helpers import ensure_dir, safe_filename
+from nanobot.session.store import JsonlSessionStore, SessionStore, SessionWrite, SqliteSessionStore
+from nanobot.utils.helpers import ensure_dir
+from nanobot.utils.tokens import message_tokens
 
 
 @dataclass
@@ -25,55 +32,136 @@ class Session:
     updated_at: datetime = field(default_factory=datetime.now)
     metadata: dict[str, Any] = field(default_factory=dict)
     
+    # Persistence bookkeeping (managed by SessionManager)
+    _persisted: int = field(default=0, init=False, repr=False)  # Messages already on disk
+    _rewrite: bool = field(default=False, init=False, repr=False)  # Disk copy must be rewritten
+    _compact: bool = field(default=False, init=False, repr=False)  # Drop the legacy header on next save
+    _truncated: bool = field(default=False, init=False, repr=False)  # Older messages left on disk
+    _generation: int = field(default=0, init=False, repr=False)  # Bumped by clear()
+    
+    @property
+    def generation(self) -> int:
+        """Changes whenever the session is cleared, so background work can tell it's stale."""
+        return self._generation
+    
     def add_message(self, role: str, content: str, **kwargs: Any) -> None:
-        """Add a message to the session."""
+        """Add a message to the session, numbered after the previous one."""
+        if self.messages:
+            # Messages saved before numbering existed count as older than any numbered one
+            seq = self.messages[-1].get("seq", len(self.messages) - 1) + 1
+        else:
+            seq = 0
         msg = {
             "role": role,
             "content": content,
             "timestamp": datetime.now().isoformat(),
+            "seq": seq,
             **kwargs
         }
+        message_tokens(msg)  # Stored with the message so it's counted once
         self.messages.append(msg)
         self.updated_at = datetime.now()
     
-    def get_history(self, max_messages: int = 50) -> list[dict[str, Any]]:
+    def get_history(self, max_messages: int | None = 50, max_tokens: int | None = None) -> list[dict[str, Any]]:
         """
         Get message history for LLM context.
         
         Args:
-            max_messages: Maximum messages to return.
+            max_messages: Maximum messages to return (None = no limit).
+            max_tokens: Token budget; the newest messages that fit are returned.
         
         Returns:
             List of messages in LLM format.
         """
-        # Get recent messages
-        recent = self.messages[-max_messages:] if len(self.messages) > max_messages else self.messages
+        # Get recent messages (turns folded into the summary are left out)
+        messages = self.unsummarized()
+        recent = messages[-max_messages:] if max_messages and len(messages) > max_messages else messages
+        
+        if max_tokens is not None:
+            # Walk back from the newest message until the budget is used up
+            used = 0
+            start = len(recent)
+            while start > 0:
+                used += message_tokens(recent[start - 1])
+                if used > max_tokens:
+                    break
+                start -= 1
+            recent = recent[start:]
         
         # Convert to LLM format (just role and content)
         return [{"role": m["role"], "content": m["content"]} for m in recent]
     
+    def unsummarized(self) -> list[dict[str, Any]]:
+        """Get the messages after the last one folded into the rolling summary, if any."""
+        summary_seq = self.metadata.get("summary_seq")
+        if summary_seq is not None:
+            return [m for m in self.messages if m.get("seq", -1) > summary_seq]
+        until = self.metadata.get("summary_until")  # Timestamp cutoff written by older versions
+        if not until:
+            return self.messages
+        return [m for m in self.messages if m.get("timestamp", "") > until]
+    
     def clear(self) -> None:
         """Clear all messages in the session."""
         self.messages = []
+        self.metadata.pop("summary", None)
+        self.metadata.pop("summary_until", None)
+        self.metadata.pop("summary_seq", None)
         self.updated_at = datetime.now()
+        self._generation += 1
+        self._rewrite = True
+        self._truncated = False
 
 
 class SessionManager:
     """
     Manages conversation sessions.
     
-    Sessions are stored as JSONL files in the sessions directory.
+    Sessions are persisted through a `SessionStore`: JSONL files in the
+    sessions directory by default, or a SQLite database. Saving only appends
+    the messages added since the last save; stored history is replaced only
+    when it was cleared. All writes run on a single background writer thread,
+    so they keep their order and never block the event loop.
+    
+    Only the last `history_tail` messages are read when a session is loaded;
+    use `load_full` to get the whole transcript.
+    
+    Loaded sessions are kept in an LRU cache of at most `max_sessions`
+    entries; sessions idle for longer than `idle_ttl` seconds are evicted,
+    and unsaved messages are written out on eviction.
     """
     
-    def __init__(self, workspace: Path):
+    def __init__(
+        self,
+        workspace: Path,
+        history_tail: int = 200,
+        max_sessions: int = 1000,
+        idle_ttl: float = 3600,
+        backend: str = "jsonl",
+        store: SessionStore | None = None,
+    ):
         self.workspace = workspace
+        self.history_tail = history_tail
+        self.max_sessions = max_sessions
+        self.idle_ttl = idle_ttl
         self.sessions_dir = ensure_dir(Path.home() / ".nanobot" / "sessions")
-        self._cache: dict[str, Session] = {}
+        self.store = store or self._create_store(backend)
+        self._cache: OrderedDict[str, tuple[Session, float]] = OrderedDict()  # key -> (session, last used)
+        # Evicted sessions still referenced elsewhere (e.g. a turn in progress),
+        # so a reload never creates a second copy of a live session
+        self._evicted: weakref.WeakValueDictionary[str, Session] = weakref.WeakValueDictionary()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="session-writer")
     
-    def _get_session_path(self, key: str) -> Path:
-        """Get the file path for a session."""
-        safe_key = safe_filename(key.replace(":", "_"))
-        return self.sessions_dir / f"{safe_key}.jsonl"
+    def _create_store(self, backend: str) -> SessionStore:
+        """Create the store for a configured backend name."""
+        if backend == "jsonl":
+            return JsonlSessionStore(self.sessions_dir)
+        if backend == "sqlite":
+            return SqliteSessionStore(self.sessions_dir / "sessions.db")
+        raise ValueError(f"Unknown session backend: {backend}")
     
     def get_or_create(self, key: str) -> Session:
         """
@@ -85,73 +173,146 @@ class SessionManager:
         Returns:
             The session.
         """
+        self._evict_idle()
+        
         # Check cache
-        if key in self._cache:
-            return self._cache[key]
+        entry = self._cache.get(key)
+        if entry is not None:
+            self._hits += 1
+            self._remember(entry[0])
+            return entry[0]
         
-        # Try to load from disk
-        session = self._load(key)
+        self._misses += 1
+        session = self._evicted.pop(key, None)
+        if session is None:
+            # Try to load from disk
+            session = self._load(key)
         if session is None:
             session = Session(key=key)
         
-        self._cache[key] = session
+        self._remember(session)
         return session
     
+    def cache_stats(self) -> dict[str, int]:
+        """Get session cache counters."""
+        return {
+            "size": len(self._cache),
+            "hits": self._hits,
+            "misses": self._misses,
+            "evictions": self._evictions,
+        }
+    
+    def _remember(self, session: Session) -> None:
+        """Mark a session as most recently used, evicting the LRU overflow."""
+        self._cache[session.key] = (session, time.monotonic())
+        self._cache.move_to_end(session.key)
+        while self.max_sessions > 0 and len(self._cache) > self.max_sessions:
+            self._evict(next(iter(self._cache)))
+    
+    def _evict_idle(self) -> None:
+        """Evict sessions that have not been used within the idle TTL."""
+        if self.idle_ttl <= 0:
+            return
+        cutoff = time.monotonic() - self.idle_ttl
+        while self._cache:
+            key, (_, last_used) = next(iter(self._cache.items()))
+            if last_used > cutoff:
+                break
+            self._evict(key)
+    
+    def _evict(self, key: str) -> None:
+        """Drop a session from the cache, queueing a write if it has unsaved changes."""
+        session, _ = self._cache.pop(key)
+        if session._persisted != len(session.messages) or session._rewrite or session._compact:
+            self._writer.submit(self._prepare_write(session))
+        self._evicted[key] = session
+        self._evictions += 1
+    
     def _load(self, key: str) -> Session | None:
-        """Load a session from disk."""
-        path = self._get_session_path(key)
-        
-        if not path.exists():
-            return None
-        
+        """Load a session from the store, keeping only the most recent messages."""
         try:
-            messages = []
-            metadata = {}
-            created_at = None
-            
-            with open(path) as f:
-                for line in f:
-                    line = line.strip()
-                    if not line:
-                        continue
-                    
-                    data = json.loads(line)
-                    
-                    if data.get("_type") == "metadata":
-                        metadata = data.get("metadata", {})
-                        created_at = datetime.fromisoformat(data["created_at"]) if data.get("created_at") else None
-                    else:
-                        messages.append(data)
-            
-            return Session(
-                key=key,
-                messages=messages,
-                created_at=created_at or datetime.now(),
-                metadata=metadata
-            )
+            record = self.store.load(key, tail=self.history_tail)
         except Exception as e:
             logger.warning(f"Failed to load session {key}: {e}")
             return None
+        
+        if record is None:
+            return None
+        
+        session = Session(
+            key=key,
+            messages=record.messages,
+            created_at=record.created_at or datetime.now(),
+            metadata=record.metadata
+        )
+        session._persisted = len(record.messages)
+        session._compact = record.compact
+        session._truncated = record.truncated
+        return session
+    
+    def load_full(self, session: Session) -> Session:
+        """
+        Load the complete transcript into a tail-loaded session.
+        
+        Messages added since the last save are kept after the stored ones.
+        """
+        if not session._truncated:
+            return session
+        
+        unsaved = session.messages[session._persisted:]
+        # Read on the writer thread so queued appends are already stored
+        stored = self._writer.submit(self.store.load_messages, session.key).result()
+        session.messages = stored + unsaved
+        session._persisted = len(stored)
+        session._truncated = False
+        return session
     
     def save(self, session: Session) -> None:
-        """Save a session to disk."""
-        path = self._get_session_path(session.key)
-        
-        with open(path, "w") as f:
-            # Write metadata first
-            metadata_line = {
-                "_type": "metadata",
-                "created_at": session.created_at.isoformat(),
-                "updated_at": session.updated_at.isoformat(),
-                "metadata": session.metadata
-            }
-            f.write(json.dumps(metadata_line) + "\n")
-            
-            # Write messages
-            for msg in session.messages:
-                f.write(json.dumps(msg) + "\n")
-        
-        self._cache[session.key] = session
+        """Save a session to disk, waiting for the write to finish."""
+        self._submit(session).result()
+    
+    async def save_async(self, session: Session) -> None:
+        """Save a session on the writer thread without blocking the event loop."""
+        await asyncio.wrap_future(self._submit(session))
+    
+    def flush(self) -> None:
+        """Wait until all queued writes are on disk."""
+        self._writer.submit(lambda: None).result()
+    
+    def close(self) -> None:
+        """Flush queued writes, stop the writer thread and close the store."""
+        self._writer.shutdown(wait=True)
+        self.store.close()
+    
+    def _submit(self, session: Session) -> Future:
+        """Snapshot what needs writing and queue it on the writer thread."""
+        self._remember(session)
+        job = self._prepare_write(session)
+        return self._writer.submit(job)
+    
+    def _prepare_write(self, session: Session) -> Callable[[], None]:
+        """
+        Build the write job for a session.
+        
+        The snapshot is taken on the caller's thread so later changes to the
+        session don't race with the writer.
+        """
+        # A tail-loaded session only holds part of the transcript, so trimming
+        # it in place must not be mirrored to the store
+        trimmed = session._persisted > len(session.messages) and not session._truncated
+        replace = session._rewrite or trimmed
+        change = SessionWrite(
+            key=session.key,
+            created_at=session.created_at,
+            updated_at=session.updated_at,
+            metadata=dict(session.metadata),
+            messages=list(session.messages) if replace else session.messages[session._persisted:],
+            replace=replace,
+            compact=session._compact,
+        )
+        session._persisted = len(session.messages)
+        session._rewrite = session._compact = False
+        return partial(self.store.write, change)
     
     def delete(self, key: str) -> bool:
         """
@@ -165,13 +326,10 @@ class SessionManager:
         """
         # Remove from cache
         self._cache.pop(key, None)
+        self._evicted.pop(key, None)
         
-        # Remove file
-        path = self._get_session_path(key)
-        if path.exists():
-            path.unlink()
-            return True
-        return False
+        # Runs on the writer thread so it can't race with queued writes
+        return self._writer.submit(self.store.delete, key).result()
     
     def list_sessions(self) -> list[dict[str, Any]]:
         """
@@ -180,23 +338,4 @@ class SessionManager:
         Returns:
             List of session info dicts.
         """
-        sessions = []
-        
-        for path in self.sessions_dir.glob("*.jsonl"):
-            try:
-                # Read just the metadata line
-                with open(path) as f:
-                    first_line = f.readline().strip()
-                    if first_line:
-                        data = json.loads(first_line)
-                        if data.get("_type") == "metadata":
-                            sessions.append({
-                                "key": path.stem.replace("_", ":"),
-                                "created_at": data.get("created_at"),
-                                "updated_at": data.get("updated_at"),
-                                "path": str(path)
-                            })
-            except Exception:
-                continue
-        
-        return sorted(sessions, key=lambda x: x.get("updated_at", ""), reverse=True)
+        return self.store.list_sessions()
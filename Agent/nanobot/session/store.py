@@ -0,0 +1,368 @@
+"""Session storage backends."""
+
+import json
+import os
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+
+from nanobot.utils.helpers import safe_filename
+
+
+@dataclass
+class SessionRecord:
+    """A session as read from a store."""
+
+    key: str
+    messages: list[dict[str, Any]]
+    created_at: datetime | None = None
+    metadata: dict[str, Any] = field(default_factory=dict)
+    truncated: bool = False  # Older messages were left in the store
+    compact: bool = False  # The stored copy should be compacted on next write
+
+
+@dataclass
+class SessionWrite:
+    """A snapshot of session changes to persist."""
+
+    key: str
+    created_at: datetime
+    updated_at: datetime
+    metadata: dict[str, Any]
+    messages: list[dict[str, Any]]  # New messages, or the full history if `replace`
+    replace: bool = False  # Replace the stored history instead of appending
+    compact: bool = False  # Rewrite the stored copy in the current layout
+
+
+class SessionStore(ABC):
+    """
+    Abstract base class for session storage.
+
+    Stores persist a session's messages append-only plus its metadata.
+    Writes are always issued from a single thread, in order.
+    """
+
+    @abstractmethod
+    def load(self, key: str, tail: int = 0) -> SessionRecord | None:
+        """
+        Load a session.
+
+        Args:
+            key: Session key.
+            tail: Only read the last `tail` messages (0 = all).
+
+        Returns:
+            The stored session, or None if it doesn't exist.
+        """
+        pass
+
+    @abstractmethod
+    def load_messages(self, key: str) -> list[dict[str, Any]]:
+        """Load a session's complete message history."""
+        pass
+
+    @abstractmethod
+    def write(self, change: SessionWrite) -> None:
+        """Persist a session snapshot."""
+        pass
+
+    @abstractmethod
+    def delete(self, key: str) -> bool:
+        """Delete a session. Returns True if it existed."""
+        pass
+
+    @abstractmethod
+    def list_sessions(self) -> list[dict[str, Any]]:
+        """List stored sessions, most recently updated first."""
+        pass
+
+    def close(self) -> None:
+        """Release any resources held by the store."""
+        pass
+
+
+_TAIL_BLOCK = 64 * 1024  # Bytes read per step when scanning a transcript backwards
+
+
+def _is_header(line: str) -> bool:
+    """Check whether a JSONL line is a legacy metadata header."""
+    return '"_type"' in line and json.loads(line).get("_type") == "metadata"
+
+
+def _read_tail(path: Path, count: int) -> tuple[list[str], bool]:
+    """
+    Read the last `count` non-empty lines of a file by scanning from the end.
+
+    Returns:
+        The lines, and whether the file has earlier lines that were skipped.
+    """
+    with open(path, "rb") as f:
+        pos = f.seek(0, os.SEEK_END)
+        buf = b""
+        while pos > 0 and buf.count(b"\n") <= count:
+            step = min(_TAIL_BLOCK, pos)
+            pos -= step
+            f.seek(pos)
+            buf = f.read(step) + buf
+
+    raw = buf.split(b"\n")
+    if pos > 0:
+        raw = raw[1:]  # The first line may be cut off
+    lines = [line.decode("utf-8").strip() for line in raw if line.strip()]
+    return lines[-count:], pos > 0 or len(lines) > count
+
+
+def _read_lines(path: Path) -> list[str]:
+    """Read every non-empty line of a transcript."""
+    with open(path) as f:
+        return [line.strip() for line in f if line.strip()]
+
+
+class JsonlSessionStore(SessionStore):
+    """
+    One JSONL file per session, one message per line.
+
+    Metadata lives in a small `.meta.json` sidecar so saving a turn only
+    appends lines. Files from older versions, with the metadata as the first
+    line, are still read and are migrated on their next write.
+    """
+
+    def __init__(self, sessions_dir: Path):
+        self.sessions_dir = sessions_dir
+
+    def _get_session_path(self, key: str) -> Path:
+        """Get the file path for a session."""
+        safe_key = safe_filename(key.replace(":", "_"))
+        return self.sessions_dir / f"{safe_key}.jsonl"
+
+    def _get_meta_path(self, key: str) -> Path:
+        """Get the metadata sidecar path for a session."""
+        return self._get_session_path(key).with_suffix(".meta.json")
+
+    def load(self, key: str, tail: int = 0) -> SessionRecord | None:
+        path = self._get_session_path(key)
+        if not path.exists():
+            return None
+
+        metadata = {}
+        created_at = None
+
+        # Legacy format: metadata as the first line
+        with open(path) as f:
+            first = f.readline().strip()
+        legacy_header = bool(first) and _is_header(first)
+        if legacy_header:
+            data = json.loads(first)
+            metadata = data.get("metadata", {})
+            created_at = datetime.fromisoformat(data["created_at"]) if data.get("created_at") else None
+
+        if tail > 0:
+            lines, truncated = _read_tail(path, tail + legacy_header)
+        else:
+            lines, truncated = _read_lines(path), False
+        messages = [json.loads(line) for line in lines if not _is_header(line)]
+        messages = messages[-tail:] if tail > 0 else messages
+
+        meta_path = self._get_meta_path(key)
+        if meta_path.exists():
+            meta = json.loads(meta_path.read_text(encoding="utf-8"))
+            metadata = meta.get("metadata", {})
+            created_at = datetime.fromisoformat(meta["created_at"]) if meta.get("created_at") else created_at
+
+        return SessionRecord(
+            key=key,
+            messages=messages,
+            created_at=created_at,
+            metadata=metadata,
+            truncated=truncated,
+            compact=legacy_header,
+        )
+
+    def load_messages(self, key: str) -> list[dict[str, Any]]:
+        path = self._get_session_path(key)
+        if not path.exists():
+            return []
+        return [json.loads(line) for line in _read_lines(path) if not _is_header(line)]
+
+    def write(self, change: SessionWrite) -> None:
+        path = self._get_session_path(change.key)
+        meta_path = self._get_meta_path(change.key)
+
+        if change.replace or change.compact:
+            # Compaction: replace the file atomically
+            kept = []
+            if change.compact and not change.replace and path.exists():
+                kept = [line + "\n" for line in _read_lines(path) if not _is_header(line)]
+            tmp = path.with_suffix(".jsonl.tmp")
+            with open(tmp, "w") as f:
+                f.writelines(kept)
+                f.writelines(json.dumps(msg) + "\n" for msg in change.messages)
+            os.replace(tmp, path)
+        elif change.messages or not path.exists():
+            with open(path, "a") as f:
+                f.writelines(json.dumps(msg) + "\n" for msg in change.messages)
+
+        meta = {
+            "key": change.key,
+            "created_at": change.created_at.isoformat(),
+            "updated_at": change.updated_at.isoformat(),
+            "metadata": change.metadata,
+        }
+        tmp_meta = meta_path.with_suffix(".tmp")
+        tmp_meta.write_text(json.dumps(meta), encoding="utf-8")
+        os.replace(tmp_meta, meta_path)
+
+    def delete(self, key: str) -> bool:
+        path = self._get_session_path(key)
+        self._get_meta_path(key).unlink(missing_ok=True)
+        if path.exists():
+            path.unlink()
+            return True
+        return False
+
+    def list_sessions(self) -> list[dict[str, Any]]:
+        sessions = []
+
+        for path in self.sessions_dir.glob("*.jsonl"):
+            try:
+                meta_path = path.with_suffix(".meta.json")
+                if meta_path.exists():
+                    data = json.loads(meta_path.read_text(encoding="utf-8"))
+                    key = data.get("key") or path.stem.replace("_", ":")
+                else:
+                    # Legacy format: read just the metadata line
+                    with open(path) as f:
+                        data = json.loads(f.readline().strip() or "{}")
+                    if data.get("_type") != "metadata":
+                        continue
+                    key = path.stem.replace("_", ":")
+                sessions.append({
+                    "key": key,
+                    "created_at": data.get("created_at"),
+                    "updated_at": data.get("updated_at"),
+                    "path": str(path)
+                })
+            except Exception:
+                continue
+
+        return sorted(sessions, key=lambda x: x.get("updated_at", ""), reverse=True)
+
+
+class SqliteSessionStore(SessionStore):
+    """
+    All sessions in a single SQLite database.
+
+    Runs in WAL mode so reads don't wait on writes. Sessions are indexed by
+    key and updated_at, and each save is one small transaction.
+    """
+
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS sessions (
+        key TEXT PRIMARY KEY,
+        created_at TEXT NOT NULL,
+        updated_at TEXT NOT NULL,
+        metadata TEXT NOT NULL DEFAULT '{}'
+    );
+    CREATE INDEX IF NOT EXISTS idx_sessions_updated_at ON sessions(updated_at);
+    CREATE TABLE IF NOT EXISTS messages (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        session_key TEXT NOT NULL,
+        data TEXT NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS idx_messages_session ON messages(session_key, id);
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(path), check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(self.SCHEMA)
+
+    def load(self, key: str, tail: int = 0) -> SessionRecord | None:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT created_at, metadata FROM sessions WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            if tail > 0:
+                rows = self._conn.execute(
+                    "SELECT data FROM messages WHERE session_key = ? ORDER BY id DESC LIMIT ?",
+                    (key, tail + 1),
+                ).fetchall()
+                rows.reverse()
+            else:
+                rows = self._conn.execute(
+                    "SELECT data FROM messages WHERE session_key = ? ORDER BY id", (key,)
+                ).fetchall()
+
+        truncated = tail > 0 and len(rows) > tail
+        if truncated:
+            rows = rows[1:]
+        return SessionRecord(
+            key=key,
+            messages=[json.loads(data) for (data,) in rows],
+            created_at=datetime.fromisoformat(row[0]),
+            metadata=json.loads(row[1]),
+            truncated=truncated,
+        )
+
+    def load_messages(self, key: str) -> list[dict[str, Any]]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT data FROM messages WHERE session_key = ? ORDER BY id", (key,)
+            ).fetchall()
+        return [json.loads(data) for (data,) in rows]
+
+    def write(self, change: SessionWrite) -> None:
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.execute(
+                    "INSERT INTO sessions (key, created_at, updated_at, metadata) VALUES (?, ?, ?, ?) "
+                    "ON CONFLICT(key) DO UPDATE SET updated_at = excluded.updated_at, metadata = excluded.metadata",
+                    (
+                        change.key,
+                        change.created_at.isoformat(),
+                        change.updated_at.isoformat(),
+                        json.dumps(change.metadata),
+                    ),
+                )
+                if change.replace:
+                    self._conn.execute("DELETE FROM messages WHERE session_key = ?", (change.key,))
+                self._conn.executemany(
+                    "INSERT INTO messages (session_key, data) VALUES (?, ?)",
+                    [(change.key, json.dumps(msg)) for msg in change.messages],
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def delete(self, key: str) -> bool:
+        with self._lock:
+            self._conn.execute("BEGIN")
+            self._conn.execute("DELETE FROM messages WHERE session_key = ?", (key,))
+            deleted = self._conn.execute("DELETE FROM sessions WHERE key = ?", (key,)).rowcount
+            self._conn.execute("COMMIT")
+        return deleted > 0
+
+    def list_sessions(self) -> list[dict[str, Any]]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT key, created_at, updated_at FROM sessions ORDER BY updated_at DESC"
+            ).fetchall()
+        return [
+            {"key": key, "created_at": created_at, "updated_at": updated_at, "path": str(self.path)}
+            for key, created_at, updated_at in rows
+        ]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,186 @@
+"""Web page content extraction, runnable in a thread or process pool."""
+
+import asyncio
+import json
+import multiprocessing
+import re
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from html.parser import HTMLParser
+from typing import TYPE_CHECKING
+
+from loguru import logger
+
+if TYPE_CHECKING:
+    from nanobot.config.schema import WebExtractConfig
+
+# Bodies smaller than this are extracted inline; handing them to a pool costs more than parsing them
+INLINE_BYTES = 16 * 1024
+
+_SPACES = re.compile(r"[ \t]+")
+_BLANK_LINES = re.compile(r"\n{3,}")
+_HTML_START = re.compile(r"\s*<(!doctype|html)", re.I)
+
+_SKIP_TAGS = {"script", "style", "noscript", "template"}
+_BLOCK_TAGS = {"p", "div", "section", "article", "ul", "ol", "table"}
+_LINE_TAGS = {"li", "tr", "h1", "h2", "h3", "h4", "h5", "h6"}
+_HEADINGS = {"h1": 1, "h2": 2, "h3": 3, "h4": 4, "h5": 5, "h6": 6}
+
+
+class _MarkdownConverter(HTMLParser):
+    """
+    Single-pass HTML to markdown (or plain text) converter.
+
+    Handles links, headings, list items, paragraph breaks and line breaks,
+    drops script/style content and decodes entities as it goes.
+    """
+
+    def __init__(self, markdown: bool = True):
+        super().__init__(convert_charrefs=True)
+        self.markdown = markdown
+        self._out: list[str] = []
+        self._skip = 0
+        self._links: list[str | None] = []
+
+    def handle_starttag(self, tag: str, attrs: list[tuple[str, str | None]]) -> None:
+        if tag in _SKIP_TAGS:
+            self._skip += 1
+        elif self._skip:
+            return
+        elif tag in ("br", "hr"):
+            self._out.append("\n")
+        elif not self.markdown:
+            return
+        elif tag == "a":
+            href = dict(attrs).get("href")
+            self._links.append(href)
+            if href:
+                self._out.append("[")
+        elif tag in _HEADINGS:
+            self._out.append(f"\n{'#' * _HEADINGS[tag]} ")
+        elif tag == "li":
+            self._out.append("\n- ")
+
+    def handle_endtag(self, tag: str) -> None:
+        if tag in _SKIP_TAGS:
+            self._skip = max(0, self._skip - 1)
+        elif self._skip:
+            return
+        elif tag in _BLOCK_TAGS:
+            self._out.append("\n\n")
+        elif tag in _LINE_TAGS and not (self.markdown and tag == "li"):
+            # Markdown list items already open on a new line
+            self._out.append("\n")
+        elif tag == "a" and self.markdown and self._links:
+            href = self._links.pop()
+            if href:
+                self._out.append(f"]({href})")
+
+    def handle_data(self, data: str) -> None:
+        if not self._skip:
+            self._out.append(data)
+
+    def convert(self, html: str) -> str:
+        self.feed(html)
+        self.close()
+        return normalize("".join(self._out))
+
+
+def normalize(text: str) -> str:
+    """Normalize whitespace."""
+    text = _SPACES.sub(" ", text)
+    return _BLANK_LINES.sub("\n\n", text).strip()
+
+
+def html_to_markdown(html: str) -> str:
+    """Convert HTML to markdown."""
+    return _MarkdownConverter(markdown=True).convert(html)
+
+
+def strip_tags(html: str) -> str:
+    """Remove HTML tags and decode entities."""
+    return _MarkdownConverter(markdown=False).convert(html)
+
+
+def extract_content(body: str, ctype: str, extract_mode: str) -> tuple[str, str]:
+    """
+    Turn a response body into text.
+
+    Module-level (and so picklable) to run in a process pool; this module
+    keeps its imports light so spawned workers start quickly.
+
+    Returns:
+        The text, and the name of the extractor used.
+    """
+    # JSON
+    if "application/json" in ctype:
+        try:
+            return json.dumps(json.loads(body), indent=2), "json"
+        except ValueError:
+            return body, "raw"  # Cut off at max_bytes
+    # HTML
+    if "text/html" in ctype or _HTML_START.match(body[:256]):
+        from readability import Document
+
+        doc = Document(body)
+        summary = doc.summary()
+        content = html_to_markdown(summary) if extract_mode == "markdown" else strip_tags(summary)
+        title = doc.title()
+        return (f"# {title}\n\n{content}" if title else content), "readability"
+    return body, "raw"
+
+
+class ExtractionPool:
+    """
+    Runs `extract_content` off the event loop.
+
+    `kind` is "thread" (default; lxml releases the GIL for much of the
+    parsing) or "process" (full isolation from the loop for heavy pages, at
+    the cost of pickling each body). Small bodies are extracted inline.
+    """
+
+    def __init__(self, kind: str = "thread", max_workers: int = 2):
+        if kind not in ("thread", "process"):
+            raise ValueError(f"Unknown extraction executor: {kind}")
+        self.kind = kind
+        self.max_workers = max(1, max_workers)
+        self._executor: Executor | None = None
+
+    @classmethod
+    def from_config(cls, config: "WebExtractConfig") -> "ExtractionPool":
+        """Create a pool from the `tools.web.extract` config section."""
+        return cls(kind=config.executor, max_workers=config.max_workers)
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.kind == "process":
+                # Spawn rather than fork: the parent runs threads (session writer, HTTP pool)
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="nanobot-extract"
+                )
+        return self._executor
+
+    async def extract(self, body: str, ctype: str, extract_mode: str) -> tuple[str, str]:
+        """Extract text from a body; returns (text, extractor)."""
+        if len(body) < INLINE_BYTES:
+            return extract_content(body, ctype, extract_mode)
+
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(self._get_executor(), extract_content, body, ctype, extract_mode)
+        except BrokenProcessPool:
+            # A worker died (e.g. OOM on a huge page); start a fresh pool next time
+            logger.warning("Extraction process pool broke, restarting it")
+            self._executor = None
+            raise
+
+    def shutdown(self) -> None:
+        """Stop the workers."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
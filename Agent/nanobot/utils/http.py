@@ -0,0 +1,127 @@
+"""Shared HTTP client pool."""
+
+import asyncio
+from contextlib import asynccontextmanager
+from typing import TYPE_CHECKING, Any, AsyncIterator
+from urllib.parse import urlparse
+
+import httpx
+from loguru import logger
+
+if TYPE_CHECKING:
+    from nanobot.config.schema import HttpConfig
+
+
+def _h2_available() -> bool:
+    """Check whether the optional `h2` package (HTTP/2 support) is installed."""
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+class HttpClientPool:
+    """
+    A process-wide pooled HTTP client.
+
+    Wraps one `httpx.AsyncClient` so web tools, transcription and channels
+    reuse keep-alive connections (and HTTP/2 when `h2` is installed) instead
+    of paying a TCP+TLS handshake per request. Requests to a single host are
+    capped at `per_host_limit` in flight; a host's limiter is dropped once
+    nothing is in flight or waiting for it, so arbitrary URLs don't pile up.
+
+    Create one per process, pass it to the components that need it, and
+    `aclose()` it on shutdown.
+    """
+
+    def __init__(
+        self,
+        timeout: float = 30.0,
+        connect_timeout: float = 10.0,
+        max_connections: int = 100,
+        max_keepalive_connections: int = 20,
+        keepalive_expiry: float = 30.0,
+        per_host_limit: int = 8,
+        http2: bool = True,
+        max_redirects: int = 5,
+    ):
+        self.timeout = httpx.Timeout(timeout, connect=connect_timeout)
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self.per_host_limit = per_host_limit
+        self.http2 = http2 and _h2_available()
+        self.max_redirects = max_redirects
+        self._client: httpx.AsyncClient | None = None
+        self._host_slots: dict[str, asyncio.Semaphore] = {}
+        self._host_users: dict[str, int] = {}  # Requests holding or waiting for each host's slot
+
+    @classmethod
+    def from_config(cls, config: "HttpConfig") -> "HttpClientPool":
+        """Create a pool from the `http` config section."""
+        return cls(
+            timeout=config.timeout,
+            connect_timeout=config.connect_timeout,
+            max_connections=config.max_connections,
+            max_keepalive_connections=config.max_keepalive_connections,
+            keepalive_expiry=config.keepalive_expiry,
+            per_host_limit=config.per_host_limit,
+            http2=config.http2,
+        )
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """The underlying client, created on first use."""
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                http2=self.http2,
+                limits=self.limits,
+                timeout=self.timeout,
+                max_redirects=self.max_redirects,
+            )
+        return self._client
+
+    @asynccontextmanager
+    async def _host_slot(self, url: str | httpx.URL) -> AsyncIterator[None]:
+        """Hold a request slot for a URL's host."""
+        host = urlparse(str(url)).netloc.lower()
+        slot = self._host_slots.get(host)
+        if slot is None:
+            slot = self._host_slots[host] = asyncio.Semaphore(self.per_host_limit)
+        self._host_users[host] = self._host_users.get(host, 0) + 1
+        try:
+            async with slot:
+                yield
+        finally:
+            self._host_users[host] -= 1
+            if not self._host_users[host]:
+                del self._host_users[host]
+                del self._host_slots[host]
+
+    async def request(self, method: str, url: str | httpx.URL, **kwargs: Any) -> httpx.Response:
+        """Send a request through the pool; kwargs are passed to httpx."""
+        async with self._host_slot(url):
+            return await self.client.request(method, url, **kwargs)
+
+    async def get(self, url: str | httpx.URL, **kwargs: Any) -> httpx.Response:
+        return await self.request("GET", url, **kwargs)
+
+    async def post(self, url: str | httpx.URL, **kwargs: Any) -> httpx.Response:
+        return await self.request("POST", url, **kwargs)
+
+    @asynccontextmanager
+    async def stream(self, method: str, url: str | httpx.URL, **kwargs: Any) -> AsyncIterator[httpx.Response]:
+        """Stream a response body; the host slot is held until the block exits."""
+        async with self._host_slot(url):
+            async with self.client.stream(method, url, **kwargs) as response:
+                yield response
+
+    async def aclose(self) -> None:
+        """Close all pooled connections."""
+        if self._client is not None and not self._client.is_closed:
+            await self._client.aclose()
+            logger.debug("HTTP client pool closed")
+        self._client = None
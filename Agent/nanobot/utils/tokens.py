@@ -0,0 +1,48 @@
+"""Token counting for context budgeting."""
+
+from functools import lru_cache
+from typing import Any
+
+from loguru import logger
+
+# Per-message framing overhead (role, separators) added by chat formats
+MESSAGE_OVERHEAD = 4
+
+
+@lru_cache(maxsize=1)
+def _get_encoder() -> Any:
+    """Load the tiktoken encoder once, or None if it isn't available."""
+    try:
+        import tiktoken
+        return tiktoken.get_encoding("cl100k_base")
+    except Exception as e:
+        logger.warning(f"tiktoken unavailable, estimating tokens from length: {e}")
+        return None
+
+
+def count_tokens(text: str) -> int:
+    """
+    Count the tokens in a piece of text.
+
+    Uses tiktoken's cl100k_base encoding, which is close enough for budgeting
+    across providers. Falls back to ~4 characters per token without it.
+    """
+    if not text:
+        return 0
+    encoder = _get_encoder()
+    if encoder is None:
+        return len(text) // 4 + 1
+    return len(encoder.encode(text, disallowed_special=()))
+
+
+def message_tokens(message: dict[str, Any]) -> int:
+    """
+    Get the token count of a stored message, computing and caching it on
+    first use under the message's "tokens" key.
+    """
+    tokens = message.get("tokens")
+    if tokens is None:
+        content = message.get("content")
+        text = content if isinstance(content, str) else str(content or "")
+        tokens = message["tokens"] = count_tokens(text) + MESSAGE_OVERHEAD
+    return tokens
@@ -0,0 +1,291 @@
+import asyncio
+import json
+from pathlib import Path
+from typing import Any
+
+from nanobot.agent.loop import AgentLoop
+from nanobot.bus.events import InboundMessage
+from nanobot.bus.queue import MessageBus
+from nanobot.providers.base import LLMProvider, LLMResponse
+
+
+class SlowProvider(LLMProvider):
+    """Echoes the last user message after a delay, tracking peak concurrency."""
+
+    def __init__(self, delay: float = 0.05):
+        super().__init__()
+        self.delay = delay
+        self.active = 0
+        self.peak = 0
+
+    async def chat(self, messages: list[dict[str, Any]], **kwargs: Any) -> LLMResponse:
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            await asyncio.sleep(self.delay)
+        finally:
+            self.active -= 1
+        # The user turn starts with a "[Current time: ...]" line
+        text = messages[-1]["content"].split("\n\n", 1)[-1]
+        return LLMResponse(content=f"echo:{text}")
+
+    def get_default_model(self) -> str:
+        return "fake"
+
+
+def _make_loop(tmp_path: Path, monkeypatch, provider: LLMProvider, **kwargs: Any) -> AgentLoop:
+    monkeypatch.setenv("HOME", str(tmp_path))
+    return AgentLoop(bus=MessageBus(), provider=provider, workspace=tmp_path / "ws", **kwargs)
+
+
+async def _collect(loop: AgentLoop, count: int) -> list[str]:
+    replies = []
+    for _ in range(count):
+        msg = await asyncio.wait_for(loop.bus.consume_outbound(), timeout=5)
+        replies.append(f"{msg.chat_id}:{msg.content}")
+    return replies
+
+
+async def test_sessions_run_concurrently_but_stay_ordered(tmp_path, monkeypatch) -> None:
+    provider = SlowProvider()
+    loop = _make_loop(tmp_path, monkeypatch, provider, max_concurrent_sessions=4)
+    runner = asyncio.create_task(loop.run())
+    try:
+        for i in range(3):
+            for chat in ("a", "b"):
+                await loop.bus.publish_inbound(InboundMessage("test", "u", chat, f"{chat}{i}"))
+        replies = await _collect(loop, 6)
+    finally:
+        loop.stop()
+        await runner
+
+    assert provider.peak == 2
+    assert [r for r in replies if r.startswith("a:")] == ["a:echo:a0", "a:echo:a1", "a:echo:a2"]
+    assert [r for r in replies if r.startswith("b:")] == ["b:echo:b0", "b:echo:b1", "b:echo:b2"]
+
+
+async def test_concurrency_limit_is_respected(tmp_path, monkeypatch) -> None:
+    provider = SlowProvider()
+    loop = _make_loop(tmp_path, monkeypatch, provider, max_concurrent_sessions=2)
+    runner = asyncio.create_task(loop.run())
+    try:
+        for chat in "abcde":
+            await loop.bus.publish_inbound(InboundMessage("test", "u", chat, "hi"))
+        await _collect(loop, 5)
+    finally:
+        loop.stop()
+        await runner
+
+    assert provider.peak == 2
+
+
+class BlockingProvider(SlowProvider):
+    """Never answers until released."""
+
+    def __init__(self):
+        super().__init__()
+        self.release = asyncio.Event()
+
+    async def chat(self, messages: list[dict[str, Any]], **kwargs: Any) -> LLMResponse:
+        await self.release.wait()
+        return await super().chat(messages, **kwargs)
+
+
+async def test_backlog_stays_in_the_bus_queue(tmp_path, monkeypatch) -> None:
+    provider = BlockingProvider()
+    monkeypatch.setenv("HOME", str(tmp_path))
+    bus = MessageBus(inbound_maxsize=10, inbound_overflow="reject")
+    loop = AgentLoop(bus=bus, provider=provider, workspace=tmp_path / "ws", max_concurrent_sessions=1)
+    runner = asyncio.create_task(loop.run())
+    try:
+        accepted = []
+        for i in range(50):
+            accepted.append(await bus.publish_inbound(InboundMessage("test", "u", f"c{i}", "hi")))
+            await asyncio.sleep(0)  # Let the loop take what it can
+        await asyncio.sleep(0.05)
+        stats = bus.stats()["inbound"]
+
+        assert len(loop._tasks) == 1
+        assert stats["size"] == 10 and stats["rejected"] == 39
+        assert accepted.count(True) == 11
+    finally:
+        provider.release.set()
+        loop.stop()
+        await runner
+
+
+async def test_reset_command_clears_the_session_in_the_worker(tmp_path, monkeypatch) -> None:
+    loop = _make_loop(tmp_path, monkeypatch, SlowProvider(delay=0))
+    runner = asyncio.create_task(loop.run())
+    try:
+        await loop.bus.publish_inbound(InboundMessage("telegram", "u", "1", "hello"))
+        await _collect(loop, 1)
+        await loop.bus.publish_inbound(InboundMessage("telegram", "u", "1", "/reset", metadata={"command": "reset"}))
+        reply = await _collect(loop, 1)
+    finally:
+        loop.stop()
+        await runner
+
+    assert "cleared" in reply[0]
+    assert loop.sessions.get_or_create("telegram:1").messages == []
+
+
+def test_history_budget_counts_prompt_and_tools_once(tmp_path, monkeypatch) -> None:
+    import nanobot.agent.context as context_module
+    import nanobot.agent.tools.registry as registry_module
+
+    loop = _make_loop(tmp_path, monkeypatch, SlowProvider())
+    counted: list[int] = []
+
+    def counting(text: str) -> int:
+        counted.append(len(text))
+        return len(text) // 4
+
+    monkeypatch.setattr(context_module, "count_tokens", counting)
+    monkeypatch.setattr(registry_module, "count_tokens", counting)
+    session = loop.sessions.get_or_create("test:1")
+
+    first = loop._history_budget("hi", session)
+    assert len(counted) == 2
+    assert loop._history_budget("hi", session) == first
+    assert len(counted) == 2
+
+    (tmp_path / "ws" / "USER.md").write_text("The user likes short answers.")
+    loop._history_budget("hi", session)
+    assert len(counted) == 3  # Only the rebuilt prompt is recounted
+
+
+async def test_stop_wakes_an_idle_loop_immediately(tmp_path, monkeypatch) -> None:
+    loop = _make_loop(tmp_path, monkeypatch, SlowProvider())
+    runner = asyncio.create_task(loop.run())
+    await asyncio.sleep(0.01)
+
+    loop.stop()
+
+    await asyncio.wait_for(runner, timeout=0.1)
+    assert not runner.cancelled()
+
+
+class SummaryProvider(SlowProvider):
+    """Echo provider that also answers summary requests."""
+
+    def __init__(self):
+        super().__init__(delay=0)
+        self.summary_inputs: list[str] = []
+
+    async def chat(self, messages: list[dict[str, Any]], **kwargs: Any) -> LLMResponse:
+        if "running summary" in messages[0]["content"]:
+            self.summary_inputs.append(messages[-1]["content"])
+            return LLMResponse(content=f"summary #{len(self.summary_inputs)}")
+        self.last_messages = messages
+        return await super().chat(messages, **kwargs)
+
+
+async def test_long_sessions_are_summarized(tmp_path, monkeypatch) -> None:
+    provider = SummaryProvider()
+    loop = _make_loop(tmp_path, monkeypatch, provider, summary_threshold=200)
+    for i in range(12):
+        await loop.process_direct(f"message {i} " + "padding " * 20, session_key="test:long")
+        await asyncio.sleep(0)
+    await asyncio.gather(*loop.summarizer._running.values())
+
+    session = loop.sessions.get_or_create("test:long")
+    assert session.metadata["summary"].startswith("summary #")
+    assert "message 0" in provider.summary_inputs[0]
+    assert len(session.get_history(max_messages=None)) < len(session.messages)
+
+    await loop.process_direct("next", session_key="test:long")
+    assert session.metadata["summary"] in provider.last_messages[0]["content"]
+    assert "message 0 " not in json.dumps(provider.last_messages[1:])
+
+
+class GatedSummaryProvider(SummaryProvider):
+    """Holds summary requests until `release` is set."""
+
+    def __init__(self):
+        super().__init__()
+        self.release = asyncio.Event()
+
+    async def chat(self, messages: list[dict[str, Any]], **kwargs: Any) -> LLMResponse:
+        if "running summary" in messages[0]["content"]:
+            await self.release.wait()
+        return await super().chat(messages, **kwargs)
+
+
+async def test_summary_is_dropped_when_the_session_is_reset_meanwhile(tmp_path, monkeypatch) -> None:
+    provider = GatedSummaryProvider()
+    loop = _make_loop(tmp_path, monkeypatch, provider, summary_threshold=200)
+    for i in range(6):
+        await loop.process_direct(f"message {i} " + "padding " * 20, session_key="test:reset")
+    assert loop.summarizer._running
+
+    await loop._process_message(InboundMessage("test", "u", "reset", "/reset", metadata={"command": "reset"}))
+    provider.release.set()
+    await asyncio.gather(*loop.summarizer._running.values())
+
+    session = loop.sessions.get_or_create("test:reset")
+    assert session.messages == []
+    assert "summary" not in session.metadata
+
+
+async def test_summary_cutoff_counts_messages_not_timestamps(tmp_path, monkeypatch) -> None:
+    provider = SummaryProvider()
+    loop = _make_loop(tmp_path, monkeypatch, provider, summary_threshold=200)
+    session = loop.sessions.get_or_create("test:burst")
+    for i in range(10):
+        session.add_message("user", f"message {i} " + "padding " * 20)
+        session.add_message("assistant", f"reply {i}")
+    for msg in session.messages:
+        msg["timestamp"] = "2026-01-01T00:00:00"  # A burst saved within one clock tick
+
+    loop.summarizer.schedule(session)
+    await asyncio.gather(*loop.summarizer._running.values())
+
+    summarized = session.metadata["summary_seq"] + 1
+    assert 0 < summarized < len(session.messages)
+    assert session.unsummarized() == session.messages[summarized:]
+
+
+class StreamingProvider(LLMProvider):
+    """Streams a fixed reply one word at a time."""
+
+    async def chat(self, messages: list[dict[str, Any]], on_delta: Any = None, **kwargs: Any) -> LLMResponse:
+        words = ["Hello ", "from ", "a ", "stream"]
+        for word in words:
+            if on_delta:
+                await on_delta(word)
+        return LLMResponse(content="".join(words))
+
+    def get_default_model(self) -> str:
+        return "fake"
+
+
+async def test_streamed_replies_publish_throttled_snapshots(tmp_path, monkeypatch) -> None:
+    loop = _make_loop(tmp_path, monkeypatch, StreamingProvider())
+    msg = InboundMessage("telegram", "u", "chat", "hi", metadata={"stream_interval": 60})
+    await loop._dispatch(msg)
+
+    partial = await loop.bus.consume_outbound()
+    final = await loop.bus.consume_outbound()
+    assert loop.bus.outbound_size == 0
+    # Only the first delta goes out before the interval; the final reply completes it
+    assert (partial.content, partial.metadata["partial"]) == ("Hello ", True)
+    assert final.content == "Hello from a stream"
+    assert final.metadata["stream_id"] == partial.metadata["stream_id"]
+    assert "partial" not in final.metadata
+
+
+class FailingProvider(LLMProvider):
+    async def chat(self, messages: list[dict[str, Any]], **kwargs: Any) -> LLMResponse:
+        return LLMResponse(content="Error calling LLM: overloaded", finish_reason="error")
+
+    def get_default_model(self) -> str:
+        return "fake"
+
+
+async def test_failed_turns_are_not_saved(tmp_path, monkeypatch) -> None:
+    loop = _make_loop(tmp_path, monkeypatch, FailingProvider())
+    reply = await loop.process_direct("hi", session_key="test:fail")
+
+    assert reply == "Error calling LLM: overloaded"
+    assert loop.sessions.get_or_create("test:fail").messages == []
@@ -0,0 +1,209 @@
+import asyncio
+import itertools
+import json
+import multiprocessing
+from collections import Counter
+from datetime import datetime
+from typing import Any
+
+import pytest
+
+from nanobot.bus.bridge import BusBridge
+from nanobot.bus.events import InboundMessage, OutboundMessage
+from nanobot.bus.queue import MessageBus
+from nanobot.bus.transport import IpcTransport, LocalTransport, RedisStreamsTransport, shard_for
+
+
+class FakeStreams:
+    """In-process stand-in for the Redis Streams commands the transport uses."""
+
+    def __init__(self):
+        self.streams: dict[str, list[tuple[bytes, dict[bytes, bytes]]]] = {}
+        self.groups: dict[tuple[str, str], int] = {}
+        self.acked: list[bytes] = []
+        self._ids = itertools.count(1)
+        self._changed = asyncio.Condition()
+
+    async def xadd(self, name: str, fields: dict[str, str], maxlen: int | None = None, approximate: bool = True) -> bytes:
+        entry_id = f"{next(self._ids)}-0".encode()
+        self.streams.setdefault(name, []).append((entry_id, {k.encode(): v.encode() for k, v in fields.items()}))
+        async with self._changed:
+            self._changed.notify_all()
+        return entry_id
+
+    async def xgroup_create(self, name: str, groupname: str, id: str = "$", mkstream: bool = False) -> None:
+        if (name, groupname) in self.groups:
+            raise RuntimeError("BUSYGROUP Consumer Group name already exists")
+        self.streams.setdefault(name, [])
+        self.groups[(name, groupname)] = 0
+
+    async def xreadgroup(self, groupname: str, consumername: str, streams: dict[str, str], count: int, block: int) -> list[Any]:
+        (name, _), = streams.items()
+
+        def pending() -> bool:
+            return len(self.streams[name]) > self.groups[(name, groupname)]
+
+        async with self._changed:
+            try:
+                await asyncio.wait_for(self._changed.wait_for(pending), block / 1000)
+            except asyncio.TimeoutError:
+                return []
+        start = self.groups[(name, groupname)]
+        entries = self.streams[name][start:start + count]
+        self.groups[(name, groupname)] = start + len(entries)
+        return [[name.encode(), entries]]
+
+    async def xack(self, name: str, groupname: str, *ids: bytes) -> int:
+        self.acked.extend(ids)
+        return len(ids)
+
+
+def test_shards_are_stable_and_spread() -> None:
+    keys = [f"telegram:{i}" for i in range(1000)]
+    counts = Counter(shard_for(k, 4) for k in keys)
+
+    assert all(shard_for(k, 4) == shard_for(k, 4) for k in keys)
+    assert set(counts) == {0, 1, 2, 3} and min(counts.values()) > 150
+    # Growing from 4 to 5 shards only moves sessions onto the new shard
+    moved = [k for k in keys if shard_for(k, 5) != shard_for(k, 4)]
+    assert all(shard_for(k, 5) == 4 for k in moved)
+    assert len(moved) < 300
+
+
+def test_messages_round_trip_through_dicts() -> None:
+    msg = InboundMessage("telegram", "u", "42", "hi", timestamp=datetime(2026, 1, 2, 3, 4, 5), metadata={"stream_interval": 1.0})
+    reply = OutboundMessage("telegram", "42", "hello", metadata={"stream_id": "abc", "partial": True})
+
+    assert InboundMessage.from_dict(msg.to_dict()) == msg
+    assert OutboundMessage.from_dict(reply.to_dict()) == reply
+
+
+async def _echo_worker(bus: MessageBus) -> None:
+    """Stand-in for an AgentLoop: answer every message on the worker's local bus."""
+    while True:
+        for msg in await bus.consume_inbound_batch():
+            await bus.publish_outbound(OutboundMessage(msg.channel, msg.chat_id, f"echo:{msg.content}"))
+
+
+async def _run_worker(transport, shard: int) -> None:
+    bus = MessageBus()
+    await asyncio.gather(BusBridge(bus, transport, "worker", shards=[shard]).run(), _echo_worker(bus))
+
+
+def _worker_process(transport: IpcTransport, shard: int) -> None:
+    asyncio.run(_run_worker(transport, shard))
+
+
+async def _round_trip(transport_for_worker, front_transport, shards: int | None) -> list[str]:
+    """Send 3 messages each for 4 chats through a front bridge; `shards=None` if workers run elsewhere."""
+    front_bus = MessageBus()
+    tasks = [asyncio.create_task(BusBridge(front_bus, front_transport, "front").run())]
+    for shard in range(shards or 0):
+        tasks.append(asyncio.create_task(_run_worker(transport_for_worker(), shard)))
+    try:
+        for i in range(3):
+            for chat in ("a", "b", "c", "d"):
+                await front_bus.publish_inbound(InboundMessage("telegram", "u", chat, f"{chat}{i}"))
+        replies = []
+        for _ in range(12):
+            msg = await asyncio.wait_for(front_bus.consume_outbound(), timeout=30)
+            replies.append(f"{msg.chat_id}:{msg.content}")
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+    return replies
+
+
+def test_worker_must_name_its_shards_when_there_are_several() -> None:
+    with pytest.raises(ValueError):
+        BusBridge(MessageBus(), LocalTransport(shards=2), "worker")
+    assert BusBridge(MessageBus(), LocalTransport(shards=1), "worker").shards == [0]
+    assert BusBridge(MessageBus(), LocalTransport(shards=2), "front").shards == [0, 1]
+
+
+async def test_front_and_workers_over_local_transport_keep_session_order() -> None:
+    transport = LocalTransport(shards=2)
+
+    replies = await _round_trip(lambda: transport, transport, shards=2)
+
+    for chat in "abcd":
+        assert [r for r in replies if r.startswith(f"{chat}:")] == [f"{chat}:echo:{chat}{i}" for i in range(3)]
+
+
+async def test_redis_streams_transport_shards_by_session() -> None:
+    client = FakeStreams()
+
+    def transport() -> RedisStreamsTransport:
+        return RedisStreamsTransport(client, shards=2, prefix="t", block_ms=50)
+
+    replies = await _round_trip(transport, transport(), shards=2)
+
+    assert sorted(replies) == sorted(f"{c}:echo:{c}{i}" for c in "abcd" for i in range(3))
+    for shard in range(2):
+        chats = {json.loads(f[b"data"])["chat_id"] for _, f in client.streams[f"t:inbound:{shard}"]}
+        assert chats == {c for c in "abcd" if shard_for(f"telegram:{c}", 2) == shard}
+    assert len(client.acked) == 24  # 12 inbound + 12 outbound entries
+
+
+def test_worker_processes_over_ipc_keep_session_order() -> None:
+    ctx = multiprocessing.get_context("spawn")
+    transport = IpcTransport(shards=2, context=ctx)
+    processes = [ctx.Process(target=_worker_process, args=(transport, shard), daemon=True) for shard in range(2)]
+    for process in processes:
+        process.start()
+    try:
+        replies = asyncio.run(_round_trip(None, transport, shards=None))
+    finally:
+        for process in processes:
+            process.terminate()
+            process.join()
+
+    for chat in "abcd":
+        assert [r for r in replies if r.startswith(f"{chat}:")] == [f"{chat}:echo:{chat}{i}" for i in range(3)]
+
+
+def _exit_with(code: int) -> None:
+    raise SystemExit(code)
+
+
+def _sleep(seconds: float) -> None:
+    import time
+    time.sleep(seconds)
+
+
+async def test_supervisor_restarts_crashed_workers_and_gives_up_on_crash_loops(monkeypatch) -> None:
+    from nanobot.cli import commands
+
+    ctx = multiprocessing.get_context("spawn")
+    restarted = []
+
+    def start_worker(ctx, transport, shard, verbose):
+        process = ctx.Process(target=_sleep, args=(30,), daemon=True)
+        process.start()
+        restarted.append(process)
+        return process
+
+    monkeypatch.setattr(commands, "_start_worker", start_worker)
+    processes = [ctx.Process(target=_exit_with, args=(3,), daemon=True)]
+    processes[0].start()
+    supervisor = asyncio.create_task(commands._supervise_workers(ctx, None, processes, False, min_uptime=0))
+    try:
+        for _ in range(100):
+            if restarted:
+                break
+            await asyncio.sleep(0.05)
+        assert processes == restarted
+        assert processes[0].is_alive()
+    finally:
+        supervisor.cancel()
+        for process in restarted:
+            process.terminate()
+
+    crashing = [ctx.Process(target=_exit_with, args=(3,), daemon=True)]
+    crashing[0].start()
+    try:
+        await asyncio.wait_for(commands._supervise_workers(ctx, None, crashing, False, min_uptime=60), timeout=10)
+        raise AssertionError("A crash loop should stop the gateway")
+    except RuntimeError as e:
+        assert "keeps crashing" in str(e)
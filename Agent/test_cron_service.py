@@ -0,0 +1,64 @@
+import asyncio
+import threading
+
+from nanobot.cron.service import CronService
+from nanobot.cron.types import CronSchedule
+
+
+async def test_jobs_added_by_another_process_are_kept_and_run(tmp_path) -> None:
+    path = tmp_path / "jobs.json"
+    ran = []
+
+    async def on_job(job) -> str:
+        ran.append(job.name)
+        return "ok"
+
+    scheduler = CronService(path, on_job=on_job, watch_interval=0.05)
+    other = CronService(path)  # A worker that doesn't run the scheduler
+    await scheduler.start()
+    try:
+        scheduler.add_job("mine", CronSchedule(kind="every", every_ms=3_600_000), "hourly")
+        other.list_jobs()  # Cache the store before the next change
+        scheduler.add_job("also-mine", CronSchedule(kind="every", every_ms=3_600_000), "hourly")
+        other.add_job("theirs", CronSchedule(kind="every", every_ms=100), "soon")
+
+        await asyncio.sleep(0.4)
+        names = {j.name for j in scheduler.list_jobs()}
+    finally:
+        scheduler.stop()
+
+    assert names == {"mine", "also-mine", "theirs"}
+    assert {j.name for j in CronService(path).list_jobs()} == names
+    assert "theirs" in ran
+
+
+def test_concurrent_writers_keep_every_job(tmp_path) -> None:
+    path = tmp_path / "jobs.json"
+
+    def add_jobs(prefix: str) -> None:
+        service = CronService(path)  # One per writer, like separate worker processes
+        for i in range(20):
+            service.add_job(f"{prefix}-{i}", CronSchedule(kind="every", every_ms=60_000), "tick")
+
+    threads = [threading.Thread(target=add_jobs, args=(name,)) for name in ("a", "b", "c")]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(CronService(path).list_jobs()) == 60
+
+
+def test_unreadable_store_is_not_overwritten(tmp_path) -> None:
+    path = tmp_path / "jobs.json"
+    service = CronService(path)
+    service.add_job("kept", CronSchedule(kind="every", every_ms=60_000), "tick")
+    good = path.read_text()
+
+    path.write_text(good[: len(good) // 2])  # A half-written file
+    assert [j.name for j in service.list_jobs()] == ["kept"]
+    service.add_job("lost", CronSchedule(kind="every", every_ms=60_000), "tick")
+    assert path.read_text() == good[: len(good) // 2]
+
+    path.write_text(good)
+    assert [j.name for j in CronService(path).list_jobs()] == ["kept"]
@@ -0,0 +1,112 @@
+import asyncio
+
+import pytest
+
+from nanobot.bus.events import InboundMessage, OutboundMessage
+from nanobot.bus.fair import FairQueue
+from nanobot.bus.queue import BUSY_NOTICE, MessageBus
+
+
+def _msg(chat_id: str, content: str = "hi", channel: str = "telegram") -> InboundMessage:
+    return InboundMessage(channel=channel, sender_id="u", chat_id=chat_id, content=content)
+
+
+def _drain(queue: FairQueue) -> list:
+    items = []
+    while not queue.empty():
+        items.append(queue.get_nowait())
+    return items
+
+
+async def test_sessions_are_served_round_robin() -> None:
+    bus = MessageBus()
+    for i in range(3):
+        await bus.publish_inbound(_msg("flood", f"f{i}"))
+    await bus.publish_inbound(_msg("quiet", "q0"))
+
+    order = [(m.chat_id, m.content) for m in _drain(bus.inbound)]
+
+    assert order == [("flood", "f0"), ("quiet", "q0"), ("flood", "f1"), ("flood", "f2")]
+
+
+async def test_reject_policy_notifies_sender() -> None:
+    bus = MessageBus(inbound_maxsize=2, inbound_overflow="reject")
+    assert await bus.publish_inbound(_msg("a"))
+    assert await bus.publish_inbound(_msg("b"))
+
+    assert not await bus.publish_inbound(_msg("c"))
+    notice = await bus.consume_outbound()
+
+    assert notice.chat_id == "c" and notice.content == BUSY_NOTICE
+    assert bus.stats()["inbound"]["rejected"] == 1
+    assert bus.inbound_size == 2
+
+
+async def test_drop_oldest_evicts_from_the_flooding_session() -> None:
+    queue: FairQueue[InboundMessage] = FairQueue(key=lambda m: m.session_key, maxsize=3, overflow="drop_oldest")
+    for item in (_msg("flood", "f0"), _msg("quiet", "q0"), _msg("flood", "f1"), _msg("flood", "f2")):
+        assert await queue.put(item)
+
+    assert [m.content for m in _drain(queue)] == ["f1", "q0", "f2"]
+    assert queue.stats()["dropped"] == 1
+
+
+async def test_block_policy_waits_for_room() -> None:
+    queue: FairQueue[str] = FairQueue(key=lambda s: s, maxsize=1)
+    await queue.put("a")
+    putter = asyncio.create_task(queue.put("b"))
+    await asyncio.sleep(0.01)
+    assert not putter.done()
+
+    assert await queue.get() == "a"
+    assert await putter
+    assert await queue.get() == "b"
+
+
+async def test_stats_report_depth_and_oldest_age() -> None:
+    queue: FairQueue[str] = FairQueue(key=lambda s: s)
+    assert queue.stats()["oldest_age"] == 0.0
+    await queue.put("a")
+    await asyncio.sleep(0.02)
+    await queue.put("b")
+
+    stats = queue.stats()
+
+    assert stats["size"] == 2 and stats["keys"] == 2
+    assert stats["oldest_age"] >= 0.02
+
+
+def test_unknown_overflow_policy_is_rejected() -> None:
+    with pytest.raises(ValueError):
+        FairQueue(key=str, overflow="spill")
+
+
+async def test_batch_drains_a_burst_in_fair_order() -> None:
+    bus = MessageBus()
+    for content in ("a0", "a1", "a2"):
+        await bus.publish_inbound(_msg("a", content))
+    await bus.publish_inbound(_msg("b", "b0"))
+
+    first = await bus.consume_inbound_batch(max_items=3)
+    rest = await bus.consume_inbound_batch()
+
+    assert [m.content for m in first] == ["a0", "b0", "a1"]
+    assert [m.content for m in rest] == ["a2"]
+
+
+async def test_outbound_dispatcher_delivers_and_stops_without_polling() -> None:
+    bus = MessageBus()
+    delivered = []
+
+    async def deliver(msg: OutboundMessage) -> None:
+        delivered.append(msg.content)
+
+    bus.subscribe_outbound("telegram", deliver)
+    dispatcher = asyncio.create_task(bus.dispatch_outbound())
+    await bus.publish_outbound(OutboundMessage(channel="telegram", chat_id="1", content="hello"))
+    await asyncio.sleep(0.01)
+
+    bus.stop()
+
+    await asyncio.wait_for(dispatcher, timeout=0.1)
+    assert delivered == ["hello"]
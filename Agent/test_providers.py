@@ -0,0 +1,201 @@
+import asyncio
+from types import SimpleNamespace as NS
+from typing import Any
+
+import pytest
+
+from nanobot.providers import litellm_provider
+from nanobot.providers.admission import AdmissionController, Limits, Priority, request_priority
+from nanobot.providers.litellm_provider import LiteLLMProvider
+from nanobot.providers.resilience import CircuitBreaker, ModelRoute, RetryPolicy
+
+
+def _chunk(content: str | None = None, tool_calls: list[Any] | None = None,
+           finish_reason: str | None = None, usage: Any = None) -> NS:
+    delta = NS(content=content, tool_calls=tool_calls)
+    return NS(choices=[NS(delta=delta, finish_reason=finish_reason)], usage=usage)
+
+
+def _tool_delta(index: int | None, id: str | None = None, name: str | None = None, arguments: str = "") -> NS:
+    return NS(index=index, id=id, function=NS(name=name, arguments=arguments))
+
+
+async def test_chat_stream_assembles_deltas_and_tool_calls(monkeypatch: pytest.MonkeyPatch) -> None:
+    chunks = [
+        _chunk("Let me "),
+        _chunk("check."),
+        _chunk(tool_calls=[_tool_delta(0, "call_1", "read_file", '{"pa')]),
+        _chunk(tool_calls=[_tool_delta(0, arguments='th": "a.txt"}')]),
+        _chunk(tool_calls=[_tool_delta(1, "call_2", "list_dir", '{"path": "."}')]),
+        _chunk(finish_reason="tool_calls"),
+        NS(choices=[], usage=NS(prompt_tokens=10, completion_tokens=5, total_tokens=15)),
+    ]
+
+    async def fake_acompletion(**kwargs: Any) -> Any:
+        assert kwargs["stream"] is True
+
+        async def gen():
+            for chunk in chunks:
+                yield chunk
+        return gen()
+
+    monkeypatch.setattr(litellm_provider, "acompletion", fake_acompletion)
+    provider = LiteLLMProvider(default_model="openai/gpt-4o-mini")
+
+    events = [e async for e in provider.chat_stream([{"role": "user", "content": "hi"}])]
+    kinds = [("delta" if e.delta else "tool" if e.tool_call else "response") for e in events]
+    assert kinds == ["delta", "delta", "tool", "tool", "response"]
+    assert events[2].tool_call.arguments == {"path": "a.txt"}
+
+    response = events[-1].response
+    assert response.content == "Let me check."
+    assert [c.name for c in response.tool_calls] == ["read_file", "list_dir"]
+    assert response.finish_reason == "tool_calls"
+    assert response.usage["total_tokens"] == 15
+    assert provider.usage_stats()["requests"] == 1
+
+    deltas: list[str] = []
+
+    async def on_delta(text: str) -> None:
+        deltas.append(text)
+
+    response = await provider.chat([{"role": "user", "content": "hi"}], on_delta=on_delta)
+    assert deltas == ["Let me ", "check."]
+    assert response.tool_calls[1].id == "call_2"
+
+
+async def test_chat_stream_without_indexes_keeps_parallel_calls_apart(monkeypatch: pytest.MonkeyPatch) -> None:
+    chunks = [
+        # No index, and the full name repeated in every chunk
+        _chunk(tool_calls=[_tool_delta(None, "call_1", "read_file", '{"path": ')]),
+        _chunk(tool_calls=[_tool_delta(None, "call_2", "list_dir", '{"path": "."}')]),
+        _chunk(tool_calls=[_tool_delta(None, "call_1", "read_file", '"a.txt"}')]),
+        _chunk(finish_reason="tool_calls"),
+    ]
+    closed = []
+
+    async def fake_acompletion(**kwargs: Any) -> Any:
+        async def gen():
+            try:
+                for chunk in chunks:
+                    yield chunk
+            finally:
+                closed.append(True)
+        return gen()
+
+    monkeypatch.setattr(litellm_provider, "acompletion", fake_acompletion)
+    provider = LiteLLMProvider(default_model="openai/gpt-4o-mini")
+
+    async def on_delta(text: str) -> None:
+        pass
+
+    response = await provider.chat([{"role": "user", "content": "hi"}], on_delta=on_delta)
+    assert [(c.id, c.name, c.arguments) for c in response.tool_calls] == [
+        ("call_1", "read_file", {"path": "a.txt"}),
+        ("call_2", "list_dir", {"path": "."}),
+    ]
+
+    async def client_gone(text: str) -> None:
+        raise ConnectionError("client disconnected")
+
+    chunks.insert(0, _chunk("Reading..."))
+    with pytest.raises(ConnectionError):
+        await provider.chat([{"role": "user", "content": "hi"}], on_delta=client_gone)
+    assert closed == [True, True]  # The abandoned stream was closed, not left to the garbage collector
+
+
+class FakeStatusError(Exception):
+    def __init__(self, status_code: int, retry_after: str | None = None):
+        super().__init__(f"status {status_code}")
+        self.status_code = status_code
+        self.response = NS(headers={"retry-after": retry_after} if retry_after else {})
+
+
+def _response(text: str) -> NS:
+    message = NS(content=text, tool_calls=None)
+    return NS(choices=[NS(message=message, finish_reason="stop")], usage=None)
+
+
+async def test_chat_retries_then_fails_over(monkeypatch: pytest.MonkeyPatch) -> None:
+    calls: list[str] = []
+    sleeps: list[float] = []
+    failures = {"openai/gpt-4o-mini": [FakeStatusError(429, "0.2"), FakeStatusError(503)] * 5}
+
+    async def fake_acompletion(**kwargs: Any) -> Any:
+        calls.append(kwargs["model"])
+        pending = failures.get(kwargs["model"])
+        if pending:
+            raise pending.pop(0)
+        return _response(f"from {kwargs['model']}")
+
+    async def fake_sleep(delay: float) -> None:
+        sleeps.append(delay)
+
+    monkeypatch.setattr(litellm_provider, "acompletion", fake_acompletion)
+    monkeypatch.setattr(litellm_provider.asyncio, "sleep", fake_sleep)
+    provider = LiteLLMProvider(
+        default_model="openai/gpt-4o-mini",
+        fallbacks=[ModelRoute("deepseek/deepseek-chat", api_key="sk-test")],
+        retry=RetryPolicy(max_retries=2, base_delay=0.01, breaker_threshold=3),
+    )
+
+    response = await provider.chat([{"role": "user", "content": "hi"}])
+    assert response.content == "from deepseek/deepseek-chat"
+    assert calls == ["openai/gpt-4o-mini"] * 3 + ["deepseek/deepseek-chat"]
+    assert sleeps[0] >= 0.2  # Retry-After is honoured
+
+    # Three straight failures opened the primary's circuit: it is skipped now
+    calls.clear()
+    response = await provider.chat([{"role": "user", "content": "hi"}])
+    assert calls == ["deepseek/deepseek-chat"]
+
+    # Non-transient errors are not retried and end up as an error response
+    failures["deepseek/deepseek-chat"] = [FakeStatusError(400)]
+    calls.clear()
+    response = await provider.chat([{"role": "user", "content": "hi"}])
+    assert response.finish_reason == "error" and calls == ["deepseek/deepseek-chat"]
+
+
+def test_circuit_breaker_half_opens_after_reset() -> None:
+    breaker = CircuitBreaker(threshold=2, reset_timeout=0.0)
+    breaker.record_failure()
+    assert breaker.state == "closed"
+    breaker.record_failure()
+    assert breaker.allow() and not breaker.allow()  # One probe at a time
+    breaker.record_success()
+    assert breaker.state == "closed"
+
+
+async def test_admission_orders_by_priority_and_limits_concurrency() -> None:
+    admission = AdmissionController(Limits(max_concurrent=1))
+    first = await admission.acquire("m")
+    order: list[str] = []
+
+    async def request(name: str, level: Priority) -> None:
+        with request_priority(level):
+            ticket = await admission.acquire("m")
+        order.append(name)
+        ticket.release()
+
+    waiting = [
+        asyncio.create_task(request("subagent", Priority.BACKGROUND)),
+        asyncio.create_task(request("cron", Priority.SCHEDULED)),
+        asyncio.create_task(request("user", Priority.INTERACTIVE)),
+    ]
+    await asyncio.sleep(0)
+    stats = admission.stats()["m"]
+    assert (stats["in_flight"], stats["queued"]) == (1, 3)
+
+    first.release()
+    await asyncio.gather(*waiting)
+    assert order == ["user", "cron", "subagent"]
+    assert admission.stats()["m"]["admitted"] == 4
+
+
+async def test_admission_token_bucket_settles_on_usage() -> None:
+    admission = AdmissionController(Limits(max_concurrent=0, tokens_per_minute=6000))
+    ticket = await admission.acquire("m", tokens=5000)
+    ticket.release(used_tokens=1000)  # The estimate was high: the rest is given back
+
+    # 5000 tokens fit again right away
+    await asyncio.wait_for(admission.acquire("m", tokens=5000), timeout=0.1)
@@ -0,0 +1,135 @@
+import json
+import time
+from pathlib import Path
+
+from nanobot.session.manager import Session, SessionManager
+
+
+def _make_manager(tmp_path: Path, monkeypatch) -> SessionManager:
+    monkeypatch.setenv("HOME", str(tmp_path))
+    return SessionManager(tmp_path / "ws")
+
+
+async def test_save_appends_only_new_messages(tmp_path, monkeypatch) -> None:
+    manager = _make_manager(tmp_path, monkeypatch)
+    session = manager.get_or_create("test:chat")
+    session.add_message("user", "hello")
+    await manager.save_async(session)
+    path = manager.store._get_session_path("test:chat")
+    first = path.read_text()
+
+    session.add_message("assistant", "hi")
+    await manager.save_async(session)
+
+    assert path.read_text().startswith(first)
+    assert len(path.read_text().splitlines()) == 2
+    assert json.loads(manager.store._get_meta_path("test:chat").read_text())["key"] == "test:chat"
+
+    session.clear()
+    session.add_message("user", "again")
+    manager.save(session)
+    manager.close()
+
+    reloaded = _make_manager(tmp_path, monkeypatch).get_or_create("test:chat")
+    assert [m["content"] for m in reloaded.messages] == ["again"]
+
+
+def test_legacy_file_is_migrated(tmp_path, monkeypatch) -> None:
+    manager = _make_manager(tmp_path, monkeypatch)
+    path = manager.store._get_session_path("test:old")
+    header = {"_type": "metadata", "created_at": "2024-01-01T00:00:00", "updated_at": "2024-01-01T00:00:00", "metadata": {"x": 1}}
+    path.write_text(json.dumps(header) + "\n" + json.dumps({"role": "user", "content": "old"}) + "\n")
+
+    assert manager.list_sessions()[0]["key"] == "test:old"
+    session = manager.get_or_create("test:old")
+    assert session.metadata == {"x": 1}
+    session.add_message("user", "new")
+    manager.save(session)
+
+    lines = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [m["content"] for m in lines] == ["old", "new"]
+    assert manager.list_sessions()[0]["created_at"] == "2024-01-01T00:00:00"
+
+
+def test_load_reads_only_the_tail(tmp_path, monkeypatch) -> None:
+    manager = _make_manager(tmp_path, monkeypatch)
+    manager.history_tail = 3
+    path = manager.store._get_session_path("test:long")
+    path.write_text("".join(json.dumps({"role": "user", "content": "é" * 5000 + str(i)}) + "\n" for i in range(100)))
+
+    session = manager.get_or_create("test:long")
+    assert [m["content"][-2:] for m in session.messages] == ["97", "98", "99"]
+
+    session.add_message("user", "new")
+    manager.save(session)
+    manager.load_full(session)
+    assert len(session.messages) == 101
+    assert session.messages[-1]["content"] == "new"
+
+
+def test_cache_evicts_least_recently_used(tmp_path, monkeypatch) -> None:
+    manager = _make_manager(tmp_path, monkeypatch)
+    manager.max_sessions = 2
+    a = manager.get_or_create("test:a")
+    a.add_message("user", "unsaved")
+    manager.get_or_create("test:b")
+    del a
+    manager.get_or_create("test:c")
+    manager.flush()
+
+    assert manager.cache_stats() == {"size": 2, "hits": 0, "misses": 3, "evictions": 1}
+    assert manager.store._get_session_path("test:a").exists()
+    assert manager.get_or_create("test:a").messages[0]["content"] == "unsaved"
+    manager.get_or_create("test:a")
+    assert manager.cache_stats()["hits"] == 1
+
+
+def test_live_session_survives_eviction(tmp_path, monkeypatch) -> None:
+    manager = _make_manager(tmp_path, monkeypatch)
+    manager.idle_ttl = 0.01
+    session = manager.get_or_create("test:live")
+    time.sleep(0.02)
+    manager.get_or_create("test:other")
+
+    assert manager.cache_stats()["evictions"] == 1
+    assert manager.get_or_create("test:live") is session
+
+
+def test_sqlite_backend_round_trip(tmp_path, monkeypatch) -> None:
+    monkeypatch.setenv("HOME", str(tmp_path))
+    manager = SessionManager(tmp_path / "ws", history_tail=2, backend="sqlite")
+    session = manager.get_or_create("test:db")
+    for i in range(3):
+        session.add_message("user", f"m{i}")
+    session.metadata["x"] = 1
+    manager.save(session)
+    session.add_message("assistant", "m3")
+    manager.save(session)
+    manager.close()
+
+    manager = SessionManager(tmp_path / "ws", history_tail=2, backend="sqlite")
+    assert [s["key"] for s in manager.list_sessions()] == ["test:db"]
+    session = manager.get_or_create("test:db")
+    assert [m["content"] for m in session.messages] == ["m2", "m3"]
+    assert session.metadata == {"x": 1}
+    assert len(manager.load_full(session).messages) == 4
+
+    session.clear()
+    manager.save(session)
+    assert manager.store.load_messages("test:db") == []
+    assert manager.delete("test:db")
+    assert manager.list_sessions() == []
+
+
+def test_history_respects_token_budget() -> None:
+    session = Session(key="test:budget")
+    session.add_message("user", "word " * 400)
+    for i in range(6):
+        session.add_message("user", f"short {i}")
+    assert all("tokens" in m for m in session.messages)
+
+    small = sum(m["tokens"] for m in session.messages[1:])
+    history = session.get_history(max_messages=None, max_tokens=small)
+    assert [m["content"] for m in history] == [f"short {i}" for i in range(6)]
+    assert len(session.get_history(max_messages=None, max_tokens=small + session.messages[0]["tokens"])) == 7
+    assert session.get_history(max_messages=3, max_tokens=10_000)[0]["content"] == "short 3"
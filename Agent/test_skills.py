@@ -0,0 +1,51 @@
+import os
+from pathlib import Path
+
+import nanobot.agent.skills as skills_module
+from nanobot.agent.skills import SkillsLoader
+
+SKILL = """---
+name: {name}
+description: {name} skill
+metadata: {{"nanobot": {{"requires": {{"bins": ["{binary}"]}}}}}}
+---
+
+Use it.
+"""
+
+
+def _write_skill(root: Path, name: str, binary: str = "sh") -> None:
+    (root / name).mkdir(parents=True, exist_ok=True)
+    (root / name / "SKILL.md").write_text(SKILL.format(name=name, binary=binary))
+
+
+def test_skill_md_added_to_an_existing_dir_is_indexed(tmp_path) -> None:
+    root = tmp_path / "skills"
+    (root / "later").mkdir(parents=True)
+    root_mtime = root.stat().st_mtime_ns
+    loader = SkillsLoader(tmp_path, builtin_skills_dir=tmp_path / "none")
+    assert loader.list_skills() == []
+
+    _write_skill(root, "later")
+    os.utime(root, ns=(root_mtime, root_mtime))  # Only the skill dir itself changed
+
+    assert [s["name"] for s in loader.list_skills()] == ["later"]
+
+
+def test_availability_is_rechecked_after_installing_a_binary(tmp_path, monkeypatch) -> None:
+    monkeypatch.setattr(skills_module, "AVAILABILITY_TTL", 0.0)
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    monkeypatch.setenv("PATH", str(bin_dir))
+    _write_skill(tmp_path / "skills", "tool", binary="nanobot-test-tool")
+    loader = SkillsLoader(tmp_path, builtin_skills_dir=tmp_path / "none")
+
+    assert 'available="false"' in loader.build_skills_summary()
+    version = loader.version
+
+    binary = bin_dir / "nanobot-test-tool"
+    binary.write_text("#!/bin/sh\n")
+    binary.chmod(0o755)
+
+    assert 'available="true"' in loader.build_skills_summary()
+    assert loader.version > version  # So the cached system prompt is rebuilt
@@ -1,7 +1,18 @@
+import asyncio
+import json
+import time
+from pathlib import Path
 from typing import Any
 
+import httpx
+
 from nanobot.agent.tools.base import Tool
+from nanobot.agent.tools.filesystem import WriteFileTool
 from nanobot.agent.tools.registry import ToolRegistry
+from nanobot.agent.tools.shell import ExecTool
+from nanobot.agent.tools.web import WebCache, WebFetchTool
+from nanobot.utils.extract import html_to_markdown, strip_tags
+from nanobot.utils.http import HttpClientPool
 
 
 class SampleTool(Tool):
@@ -86,3 +97,166 @@ async def test_registry_returns_validation_error() -> None:
     reg.register(SampleTool())
     result = await reg.execute("sample", {"query": "hi"})
     assert "Invalid parameters" in result
+
+
+class SleepTool(Tool):
+    def __init__(self) -> None:
+        self.log: list[str] = []
+        self.active = 0
+        self.peak = 0
+
+    @property
+    def name(self) -> str:
+        return "sleep"
+
+    @property
+    def description(self) -> str:
+        return "sleep tool"
+
+    @property
+    def parameters(self) -> dict[str, Any]:
+        return {
+            "type": "object",
+            "properties": {"id": {"type": "string"}, "delay": {"type": "number"}, "lock": {"type": "string"}},
+            "required": ["id", "delay"],
+        }
+
+    def concurrency_key(self, params: dict[str, Any]) -> str | None:
+        return params.get("lock")
+
+    async def execute(self, **kwargs: Any) -> str:
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        await asyncio.sleep(kwargs["delay"])
+        self.active -= 1
+        self.log.append(kwargs["id"])
+        return kwargs["id"]
+
+
+async def test_execute_many_preserves_call_order() -> None:
+    reg = ToolRegistry()
+    tool = SleepTool()
+    reg.register(tool)
+    calls = [("sleep", {"id": str(i), "delay": 0.03 - i * 0.01}) for i in range(3)]
+    results = await reg.execute_many(calls, max_concurrency=4)
+    assert results == ["0", "1", "2"]
+    assert tool.log == ["2", "1", "0"]
+    assert tool.peak == 3
+
+
+async def test_execute_many_serialises_shared_keys_and_bounds_concurrency() -> None:
+    reg = ToolRegistry()
+    tool = SleepTool()
+    reg.register(tool)
+    calls = [
+        ("sleep", {"id": "a", "delay": 0.02, "lock": "f"}),
+        ("sleep", {"id": "b", "delay": 0.0, "lock": "f"}),
+        ("sleep", {"id": "c", "delay": 0.01}),
+        ("sleep", {"id": "d", "delay": 0.01}),
+    ]
+    results = await reg.execute_many(calls, max_concurrency=2)
+    assert results == ["a", "b", "c", "d"]
+    assert tool.log.index("a") < tool.log.index("b")
+    assert tool.peak == 2
+
+
+async def test_exec_waits_for_earlier_writes_in_the_same_turn(tmp_path) -> None:
+    reg = ToolRegistry()
+    reg.register(WriteFileTool())
+    reg.register(ExecTool(working_dir=str(tmp_path)))
+    tool = SleepTool()
+    reg.register(tool)
+    script = tmp_path / "x.py"
+    calls = [
+        ("sleep", {"id": "slow", "delay": 0.05}),
+        ("write_file", {"path": str(script), "content": "print('written')"}),
+        ("exec", {"command": f"python {script}"}),
+        ("sleep", {"id": "after", "delay": 0.0}),
+    ]
+
+    results = await reg.execute_many(calls, max_concurrency=4)
+
+    assert "written" in results[2]
+    assert tool.log == ["slow", "after"]  # The barrier held back the later call
+
+
+async def test_web_fetch_cache_hits_and_revalidates() -> None:
+    requests: list[httpx.Request] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        if request.headers.get("if-none-match") == '"v1"':
+            return httpx.Response(304, headers={"cache-control": "max-age=60"})
+        return httpx.Response(
+            200,
+            headers={"content-type": "text/plain", "cache-control": "max-age=60", "etag": '"v1"'},
+            text="hello world",
+        )
+
+    pool = HttpClientPool()
+    pool._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    cache = WebCache()
+    tool = WebFetchTool(http_pool=pool, cache=cache)
+
+    first = json.loads(await tool.execute("https://Example.com:443/page?b=2&a=1#top"))
+    second = json.loads(await tool.execute("https://example.com/page?a=1&b=2", maxChars=100))
+    assert first["text"] == second["text"] == "hello world"
+    assert len(requests) == 1
+
+    for entry in cache._memory.values():
+        entry.expires_at = time.time() - 1
+    third = json.loads(await tool.execute("https://example.com/page?a=1&b=2"))
+    assert third["text"] == "hello world"
+    assert len(requests) == 2 and requests[1].headers["if-none-match"] == '"v1"'
+    assert cache.stats()["hits"] == 1 and cache.stats()["revalidated"] == 1
+    await pool.aclose()
+
+
+async def test_http_pool_drops_idle_host_limiters() -> None:
+    pool = HttpClientPool()
+    pool._client = httpx.AsyncClient(transport=httpx.MockTransport(lambda request: httpx.Response(200)))
+
+    async with pool.stream("GET", "https://a.example/"):
+        await asyncio.gather(*(pool.get(f"https://{host}.example/") for host in "bcd"))
+        assert list(pool._host_slots) == ["a.example"]
+    assert pool._host_slots == {} and pool._host_users == {}
+    await pool.aclose()
+
+
+def test_web_cache_trim_skips_files_removed_meanwhile(tmp_path, monkeypatch) -> None:
+    cache = WebCache(disk_dir=tmp_path, max_disk_entries=2)
+    for i in range(5):
+        (tmp_path / f"{i}.json").write_text("{}")
+    real_glob = Path.glob
+    # Another process deletes a file between the listing and the stat
+    monkeypatch.setattr(Path, "glob", lambda self, pattern: [*real_glob(self, pattern), tmp_path / "gone.json"])
+
+    cache._trim_disk()
+    assert len(list(real_glob(tmp_path, "*.json"))) == 2
+
+
+async def test_web_fetch_caps_size_and_skips_binary() -> None:
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path == "/doc.pdf":
+            return httpx.Response(200, headers={"content-type": "application/octet-stream"}, content=b"%PDF-1.7" + b"\0" * 100)
+        return httpx.Response(200, headers={"content-type": "text/plain"}, content=b"x" * 10_000)
+
+    pool = HttpClientPool()
+    pool._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    tool = WebFetchTool(http_pool=pool, max_bytes=1000)
+
+    skipped = json.loads(await tool.execute("https://example.com/doc.pdf"))
+    assert "Skipped non-text content" in skipped["error"]
+
+    capped = json.loads(await tool.execute("https://example.com/big.txt"))
+    assert capped["length"] == 1000 and capped["truncated"] is True
+    await pool.aclose()
+
+
+def test_html_to_markdown_single_pass() -> None:
+    page = (
+        "<h2>Title &amp; co</h2><p>Hello <a href='http://x'>link <b>bold</b></a></p>"
+        "<script>var a = '<p>no</p>';</script><ul><li>one</li><li>two</li></ul>"
+    )
+    assert html_to_markdown(page) == "## Title & co\nHello [link bold](http://x)\n\n- one\n- two"
+    assert strip_tags(page) == "Title & co\nHello link bold\n\none\ntwo"